@@ -1,2 +1,12 @@
 # these methods will be available when moltenprot is loaded interactively
-from .core import mp_from_json, mp_to_json, parse_prom_xlsx, parse_plain_csv, parse_spectrum_csv, __version__
+# NOTE they are resolved on first access, so that importing the package (e.g. for the CLI
+# entry point or moltenprot.options) does not pull in core with numpy/scipy/pandas/matplotlib
+_core_exports = ("mp_from_json", "mp_to_json", "parse_prom_xlsx", "parse_plain_csv", "parse_spectrum_csv", "__version__")
+
+
+def __getattr__(name):
+    if name in _core_exports:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -27,10 +27,10 @@ import os
 import sys
 
 # deleting folders
-from shutil import rmtree
+from concurrent.futures import ThreadPoolExecutor
 
-# get the current date and time (GUI progressbar)
-import time
+# building the CLI parser only once
+from functools import lru_cache
 
 # running git queries
 # import subprocess
@@ -39,18 +39,90 @@ import time
 path = os.path.dirname(sys.modules[__name__].__file__)
 path = os.path.join(path, "..")
 sys.path.insert(0, path)
-from moltenprot import core
+
+# defaults, help strings and the citation; this module does not import numpy/scipy/pandas/matplotlib
+from moltenprot import options
+
+
+def _load_core():
+    """
+    Import moltenprot.core on first use
+
+    core pulls in numpy/scipy/pandas/matplotlib, so it is only imported once
+    a file is actually processed (--help and --citation do not need it)
+
+    Returns
+    -------
+    module
+        moltenprot.core
+    """
+    from moltenprot import core
+
+    return core
+
+
+def _fast_rmtree(path, workers=8):
+    """
+    Remove a directory tree, unlinking the files in parallel threads
+
+    Result folders from previous runs may contain thousands of images, and
+    removing them one-by-one is bound by the latency of the filesystem (esp.
+    on network mounts), not by the CPU
+
+    Parameters
+    ----------
+    path : str
+        the folder to remove
+    workers : int
+        how many threads to use for file removal
+
+    Raises
+    ------
+    OSError
+        if some file or folder cannot be removed
+    """
+    files = []
+    folders = []
+    stack = [path]
+    # walk the tree iteratively, symlinks to folders are removed as files
+    while stack:
+        current = stack.pop()
+        folders.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # NOTE list() is needed to re-raise errors from the worker threads
+        list(executor.map(os.unlink, files))
+
+    # subfolders are always recorded after their parents, so remove them bottom-up
+    for folder in reversed(folders):
+        os.rmdir(folder)
+
 
 ### Parser for CLI options
+@lru_cache(maxsize=1)
 def CLIparser():
     """
     Creates the command-line argument parser object
+
+    The parser is built once and cached, repeated calls (e.g. when main() is
+    run from a wrapper script or tests) return the same object
     
     Returns
     -------
     parser
         arparse.ArgumentParser
     """
+    # defaults and help strings are stored in options (shared with core)
+    _d = options.defaults
+    _pd = options.prep_defaults
+    _ad = options.analysis_defaults
+
     parser = argparse.ArgumentParser(
         description="A robust toolkit for assessment and optimization of  protein thermostability.",
         # required to print default values in the help
@@ -107,9 +179,9 @@ def CLIparser():
     gen_grp.add_argument(
         "-j",
         "--n_jobs",
-        default=core.defaults["j"],
+        default=_d["j"],
         type=int,
-        help=core.defaults["j_h"],
+        help=_d["j_h"],
     )
 
     # a switch to enable "verbose" version of the script
@@ -151,8 +223,8 @@ def CLIparser():
         "--exclude",
         nargs="+",
         type=str,
-        default=core.prep_defaults["exclude"],
-        help=core.prep_defaults["exclude_h"],
+        default=_pd["exclude"],
+        help=_pd["exclude_h"],
     )
 
     # argument for blank wells (can accept multiple parameters, but they're all averaged)
@@ -160,8 +232,8 @@ def CLIparser():
         "--blank",
         nargs="+",
         type=str,
-        default=core.prep_defaults["blanks"],
-        help=core.prep_defaults["blanks_h"],
+        default=_pd["blanks"],
+        help=_pd["blanks_h"],
     )
 
     ## Pre-processing options
@@ -170,47 +242,48 @@ def CLIparser():
     pre_grp.add_argument(
         "--trim_min",
         type=float,
-        default=core.prep_defaults["trim_min"],
-        help=core.prep_defaults["trim_min_h"],
+        default=_pd["trim_min"],
+        help=_pd["trim_min_h"],
     )
     pre_grp.add_argument(
         "--trim_max",
         type=float,
-        default=core.prep_defaults["trim_max"],
-        help=core.prep_defaults["trim_max_h"],
+        default=_pd["trim_max"],
+        help=_pd["trim_max_h"],
     )
     # set if the the post-transition baseline is lower than the pre-transition baseline
     pre_grp.add_argument(
         "--invert",
-        default=core.prep_defaults["invert"],
+        default=_pd["invert"],
         action="store_true",
-        help=core.prep_defaults["invert_h"],
+        help=_pd["invert_h"],
     )
     # shrinking/binning of the data
-    pre_grp.add_argument("--shrink", type=float, help=core.prep_defaults["shrink_h"])
+    pre_grp.add_argument("--shrink", type=float, help=_pd["shrink_h"])
     # median filtering
     pre_grp.add_argument(
         "--mfilt",
-        default=core.prep_defaults["mfilt"],
+        default=_pd["mfilt"],
         type=float,
-        help=core.prep_defaults["mfilt_h"],
+        help=_pd["mfilt_h"],
     )
     # SavGol filter for the derivative (only newer scipy versions)
     pre_grp.add_argument(
         "--savgol",
         type=float,
-        default=core.analysis_defaults["savgol"],
-        help=core.analysis_defaults["savgol_h"],
+        default=_ad["savgol"],
+        help=_ad["savgol_h"],
     )
 
     ## Analysis options
 
     # select the fitting equation/data processing approach
+    # NOTE the available models are only known after importing core, so the choice is checked in MoltenprotCLI;
+    # the help string lists the model names
     ana_grp.add_argument(
         "--model",
-        default=core.analysis_defaults["model"],
-        choices=core.avail_models.keys(),
-        help=core.analysis_defaults["model_h"],
+        default=_ad["model"],
+        help=_ad["model_h"],
     )
 
     # specify separate scattering options for multi-data inputs
@@ -225,15 +298,15 @@ def CLIparser():
     ana_grp.add_argument(
         "--baseline_fit",
         type=float,
-        default=core.analysis_defaults["baseline_fit"],
-        help=core.analysis_defaults["baseline_fit_h"],
+        default=_ad["baseline_fit"],
+        help=_ad["baseline_fit_h"],
     )
     # parameter bounds for baselines (computed from the pre-fitting routine)
     ana_grp.add_argument(
         "--baseline_bounds",
         type=int,
-        default=core.analysis_defaults["baseline_bounds"],
-        help=core.analysis_defaults["baseline_bounds_h"],
+        default=_ad["baseline_bounds"],
+        help=_ad["baseline_bounds_h"],
     )
 
     # heat capacity change of unfolding for all samples (per-sample heat-capacity can be specfied in the layout)
@@ -241,36 +314,28 @@ def CLIparser():
     ana_grp.add_argument(
         "--dCp",
         type=float,
-        default=core.analysis_defaults["dCp"],
-        help=core.analysis_defaults["dCp_h"],
+        default=_ad["dCp"],
+        help=_ad["dCp_h"],
     )
 
     ## CSV-specific options
 
     # separator argument
-    csv_grp.add_argument(
-        "--sep", default=core.defaults["sep"], type=str, help=core.defaults["sep_h"]
-    )
+    csv_grp.add_argument("--sep", default=_d["sep"], type=str, help=_d["sep_h"])
 
     # decimal separator argument
-    csv_grp.add_argument(
-        "--dec", default=core.defaults["dec"], type=str, help=core.defaults["dec_h"]
-    )
+    csv_grp.add_argument("--dec", default=_d["dec"], type=str, help=_d["dec_h"])
 
-    csv_grp.add_argument(
-        "--spectrum", action="store_true", help=core.defaults["spectrum_h"]
-    )
+    csv_grp.add_argument("--spectrum", action="store_true", help=_d["spectrum_h"])
 
     # for CSV input - specify with denaturant is used and type of readout
     csv_grp.add_argument(
         "-d",
         "--denaturant",
-        default=core.defaults["denaturant"],
-        help=core.defaults["denaturant_h"],
-    )
-    csv_grp.add_argument(
-        "--readout", default=core.defaults["readout"], help=core.defaults["readout_h"]
+        default=_d["denaturant"],
+        help=_d["denaturant_h"],
     )
+    csv_grp.add_argument("--readout", default=_d["readout"], help=_d["readout_h"])
 
     # no default entry needed, because it will be set to None if not a float
     csv_grp.add_argument(
@@ -300,8 +365,8 @@ def CLIparser():
     out_grp.add_argument(
         "--hm_cmap",
         type=str,
-        default=core.defaults["heatmap_cmap"],
-        help=core.defaults["heatmap_cmap_h"],
+        default=_d["heatmap_cmap"],
+        help=_d["heatmap_cmap_h"],
     )
 
     # report argument
@@ -364,9 +429,16 @@ def MoltenprotCLI(args):
     """
     # print citation and exit
     if args.citation:
-        print(core.citation["long"])
+        print(options.citation["long"])
         sys.exit(0)
 
+    core = _load_core()
+
+    if args.model not in core.avail_models:
+        CLIparser().error(
+            f"argument --model: invalid choice: {args.model!r} (choose from {', '.join(map(repr, core.avail_models))})"
+        )
+
     # print version info from core
     if args.verbose:
         core.showVersionInformation()
@@ -374,153 +446,246 @@ def MoltenprotCLI(args):
     # check if --input option is provided and the file exists
     if args.input is None:
         # NOTE this part is only required when neither --gui nor --input are supplied, but at least one other option is supplied
-        print("Fatal: Please supply at least one input file or start the GUI mode")
+        print(
+            "Fatal: Please supply at least one input file or start the GUI mode",
+            file=sys.stderr,
+        )
         sys.exit(1)
 
     # check if the user requested too many jobs:
     if args.n_jobs > 1:
-        from multiprocessing import cpu_count
-
-        if args.n_jobs > cpu_count():
+        # NOTE os.cpu_count() avoids importing multiprocessing just for this check, but it may return None
+        cpu_count = os.cpu_count() or 1
+        if args.n_jobs > cpu_count:
             print(
-                "Warning: the amount of requested jobs ({}) is higher than the amount of CPU's available ({})\nprogram execution may be slow!".format(
-                    args.n_jobs, cpu_count()
-                )
+                f"Warning: the amount of requested jobs ({args.n_jobs}) is higher than the amount of CPU's available ({cpu_count})\nprogram execution may be slow!",
+                file=sys.stderr,
             )
 
-    # if something is provided, than we have to cycle through it
-    for input_file in args.input:
-        print("Information: processing file {}".format(input_file))
-        # check file existence
-        if not os.path.exists(input_file):
-            # check if file exists, if not then break the loop
-            # and continue to the next file
-            print("Fatal: {} does not exist!".format(input_file))
-            continue
-
-        # generate output folder and file extension
-        resultfolder, file_ext = os.path.splitext(input_file)
-
-        # if -o is not supplied, create the output folder in the same folder as input file
-        # otherwise create a requested folder and dump all outputs there
-        if args.output is not None:
-            resultfolder = os.path.join(args.output, os.path.basename(resultfolder))
-
-        # check if the output folder exists and delete if necessary
-        if os.path.exists(resultfolder):
-            if args.force:
-                print("Information: Removing previously calculated results...")
+    # files are independent of each other, so with several input files and jobs
+    # the files are processed in parallel and the job budget is split between them
+    outer_jobs = min(len(args.input), args.n_jobs)
+    if outer_jobs > 1:
+        # NOTE imported here, because it loads multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        parallel_files, serial_files = _split_by_result_folder(args.input, args.output)
+        outer_jobs = min(len(parallel_files), outer_jobs)
+        inner_jobs = max(1, args.n_jobs // outer_jobs)
+        with ProcessPoolExecutor(max_workers=outer_jobs) as executor:
+            futures = [
+                (input_file, executor.submit(_process_one, input_file, args, inner_jobs))
+                for input_file in parallel_files
+            ]
+            for input_file, future in futures:
+                # a failing file is reported, the others are still processed
                 try:
-                    rmtree(resultfolder)
-                except OSError:
-                    print(
-                        "Fatal: cannot remove results file, because some other program is using it"
-                    )
-                    continue
-            else:
-                print(
-                    "Fatal: cannot create result folder, because a folder with the same name already exists!"
-                )
+                    future.result()
+                except Exception as error:
+                    print(f"Fatal: processing of {input_file} failed: {error}", file=sys.stderr)
+        for input_file in serial_files:
+            _process_one(input_file, args, args.n_jobs)
+    else:
+        # if something is provided, than we have to cycle through it
+        for input_file in args.input:
+            _process_one(input_file, args, args.n_jobs)
+
+
+def _result_folder(input_file, output):
+    """
+    Output folder and file extension for an input file
+
+    Parameters
+    ----------
+    input_file : str
+        the file to process
+    output : str or None
+        the folder supplied with -o
+
+    Returns
+    -------
+    tuple
+        (result folder, file extension)
+    """
+    resultfolder, file_ext = os.path.splitext(input_file)
+
+    # if -o is not supplied, create the output folder in the same folder as input file
+    # otherwise create a requested folder and dump all outputs there
+    if output is not None:
+        resultfolder = os.path.join(output, os.path.basename(resultfolder))
+    return resultfolder, file_ext
+
+
+def _split_by_result_folder(input_files, output):
+    """
+    Split the input files into those that can be processed in parallel and those that must wait
+
+    Inputs sharing a result folder (e.g. a.csv and a.xlsx) must not run concurrently. The
+    first input of each folder can go to the process pool; the later ones are processed
+    serially afterwards and get the usual "already exists" handling.
+
+    Parameters
+    ----------
+    input_files : list of str
+        the files to process, in the order they were supplied
+    output : str or None
+        the folder supplied with -o
+
+    Returns
+    -------
+    tuple
+        (files for the process pool, files to process serially afterwards), both in input order
+    """
+    parallel_files = []
+    serial_files = []
+    seen_folders = set()
+    for input_file in input_files:
+        resultfolder = os.path.abspath(_result_folder(input_file, output)[0])
+        if resultfolder in seen_folders:
+            serial_files.append(input_file)
+        else:
+            seen_folders.add(resultfolder)
+            parallel_files.append(input_file)
+    return parallel_files, serial_files
+
+
+def _process_one(input_file, args, n_jobs):
+    """
+    Run the complete CLI pipeline (parsing, analysis, output) for one input file
+
+    Parameters
+    ----------
+    input_file : str
+        the file to process
+    args : namespace
+        CLI paramater namespace
+    n_jobs : int
+        how many jobs can be used for processing of this file
+    """
+    # NOTE in child processes core has to be imported again
+    core = _load_core()
+
+    print(f"Information: processing file {input_file}")
+    # check file existence
+    if not os.path.exists(input_file):
+        # if the file does not exist, skip it and continue with the next one
+        print(f"Fatal: {input_file} does not exist!", file=sys.stderr)
+        return
+
+    # generate output folder and file extension
+    resultfolder, file_ext = _result_folder(input_file, args.output)
+
+    # check if the output folder exists and delete if necessary
+    if os.path.exists(resultfolder):
+        if args.force:
+            print("Information: Removing previously calculated results...")
+            try:
+                _fast_rmtree(resultfolder, workers=n_jobs)
+            except OSError:
                 print(
-                    "Information: You can specify --force option to override this error"
-                )
-                continue
-
-        # after all checks are done, the folder can be created
-        os.makedirs(resultfolder)
-
-        if file_ext == ".csv":
-            if args.spectrum:
-                data = core.parse_spectrum_csv(
-                    input_file,
-                    scan_rate=args.scan_rate,
-                    sep=args.sep,
-                    dec=args.dec,
-                    denaturant=args.denaturant,
-                    readout=args.readout,
+                    "Fatal: cannot remove results file, because some other program is using it",
+                    file=sys.stderr,
                 )
+                return
+        else:
+            print(
+                "Fatal: cannot create result folder, because a folder with the same name already exists!",
+                file=sys.stderr,
+            )
+            print(
+                "Information: You can specify --force option to override this error",
+                file=sys.stderr,
+            )
+            return
+
+    # after all checks are done, the folder can be created
+    os.makedirs(resultfolder)
+
+    if file_ext == ".csv":
+        if args.spectrum:
+            data = core.parse_spectrum_csv(
+                input_file,
+                scan_rate=args.scan_rate,
+                sep=args.sep,
+                dec=args.dec,
+                denaturant=args.denaturant,
+                readout=args.readout,
+            )
+        else:
+            data = core.parse_plain_csv(
+                input_file,
+                scan_rate=args.scan_rate,
+                sep=args.sep,
+                dec=args.dec,
+                layout=args.layout,
+                denaturant=args.denaturant,
+                readout=args.readout,
+            )
+    elif file_ext == ".xlsx":
+        if args.model == "lumry_eyring":
+            LE = True
+        else:
+            LE = False
+
+        data = core.parse_prom_xlsx(input_file, raw=args.raw, refold=args.refold, LE=LE)
+
+    elif file_ext == ".json":
+        # NOTE currently this would mean that the previous JSON session is re-analysed with new settings
+        # TODO how to auto-set the outfolder here?
+        data = core.mp_from_json(input_file)
+    else:
+        print(f'Fatal: unsupported file format "{file_ext}"', file=sys.stderr)
+        return
+
+    if args.print_readouts:
+        print("These readouts are available in the input file:")
+        print(" ".join(data.GetDatasets()))
+        return
+
+    # extract analysis-related settings in a separate dict
+    analysis_kwargs = core.analysis_kwargs(args.__dict__)
+    data.SetAnalysisOptions("all", **analysis_kwargs)
+
+    # HACK if the instance was made from JSON, let it know that LE analysis will be run
+    if file_ext == ".json" and args.model == "lumry_eyring":
+        data.__class__ = core.MoltenProtFitMultipleLE
+
+    # special settings for scattering (this give a second set-analysis message to the log)
+    # NOTE this will not affect LE mode, because the Scattering settings are hard-coded in method
+    # PrepareAndAnalyseAll
+    if "Scattering" in data.GetDatasets():
+        if args.model_sct:
+            analysis_kwargs["model"] = args.model_sct
+        data.SetAnalysisOptions("Scattering", **analysis_kwargs)
+
+    # set model to "skip" for readouts that should not be processed (the data will be still available)
+    if args.exclude_readout is not None:
+        for readout in args.exclude_readout:
+            if data.datasets.get(readout):
+                data.datasets[readout].model = "skip"
             else:
-                data = core.parse_plain_csv(
-                    input_file,
-                    scan_rate=args.scan_rate,
-                    sep=args.sep,
-                    dec=args.dec,
-                    layout=args.layout,
-                    denaturant=args.denaturant,
-                    readout=args.readout,
+                print(
+                    f"Fatal: readout {readout} not found in the input file; use --print_readouts to get available readouts",
+                    file=sys.stderr,
                 )
-        elif file_ext == ".xlsx":
-            if args.model == "lumry_eyring":
-                LE = True
-            else:
-                LE = False
+                # stop processing this file, the next one (if any) is processed independently
+                return
 
-            data = core.parse_prom_xlsx(
-                input_file, raw=args.raw, refold=args.refold, LE=LE
-            )
+    data.PrepareAndAnalyseAll(n_jobs=n_jobs)
 
-        elif file_ext == ".json":
-            # NOTE currently this would mean that the previous JSON session is re-analysed with new settings
-            # TODO how to auto-set the outfolder here?
-            data = core.mp_from_json(input_file)
-        else:
-            print('Fatal: unsupported file format "{}"'.format(file_ext))
-            continue
-
-        if args.print_readouts:
-            print("These readouts are available in the input file:")
-            print(" ".join(data.GetDatasets()))
-            continue
-
-        # extract analysis-related settings in a separate dict
-        analysis_kwargs = core.analysis_kwargs(args.__dict__)
-        data.SetAnalysisOptions("all", **analysis_kwargs)
-
-        # HACK if the instance was made from JSON, let it know that LE analysis will be run
-        if file_ext == ".json" and args.model == "lumry_eyring":
-            data.__class__ = core.MoltenProtFitMultipleLE
-
-        # special settings for scattering (this give a second set-analysis message to the log)
-        # NOTE this will not affect LE mode, because the Scattering settings are hard-coded in method
-        # PrepareAndAnalyseAll
-        if "Scattering" in data.GetDatasets():
-            if args.model_sct:
-                analysis_kwargs["model"] = args.model_sct
-            data.SetAnalysisOptions("Scattering", **analysis_kwargs)
-
-        # set model to "skip" for readouts that should not be processed (the data will be still available)
-        if args.exclude_readout is not None:
-            for readout in args.exclude_readout:
-                if data.datasets.get(readout):
-                    data.datasets[readout].model = "skip"
-                    cont = False
-                else:
-                    print(
-                        "Fatal: readout {} not found in the input file; use --print_readouts to get available readouts".format(
-                            readout
-                        )
-                    )
-                    # terminate this loop and signal to the file loop that the next file must be processed
-                    cont = True
-                    break
-            if cont:
-                continue
-
-        data.PrepareAndAnalyseAll(n_jobs=args.n_jobs)
-
-        if args.json:
-            core.mp_to_json(data, os.path.join(resultfolder, "MP_session.json"))
-        else:
-            data.WriteOutputAll(
-                outfolder=resultfolder,
-                report_format=args.report_format,
-                xlsx=args.xlsx,
-                genpics=args.genpics,
-                heatmaps=args.heatmaps,
-                n_jobs=args.n_jobs,
-                session=True,
-                heatmap_cmap=args.hm_cmap,
-            )
+    if args.json:
+        core.mp_to_json(data, os.path.join(resultfolder, "MP_session.json"))
+    else:
+        data.WriteOutputAll(
+            outfolder=resultfolder,
+            report_format=args.report_format,
+            xlsx=args.xlsx,
+            genpics=args.genpics,
+            heatmaps=args.heatmaps,
+            n_jobs=n_jobs,
+            session=True,
+            heatmap_cmap=args.hm_cmap,
+        )
 
 
 # ATTENTION!
@@ -546,7 +711,9 @@ def MoltenprotGUI(localizationStuffFlag=False):
     )
     from PyQt5.QtGui import QPixmap, QIcon
 
-    from moltenprot import gui
+    # only the compiled Qt resources are needed for the splashscreen, the gui module
+    # (and with it core, pandas and matplotlib) is imported once the splash is shown
+    from moltenprot.ui import resources
 
     """
     Some tricks for the GUI to supprot Hi-DPI displays, see below for more info:
@@ -563,14 +730,21 @@ def MoltenprotGUI(localizationStuffFlag=False):
     splash.setEnabled(False)
     # adding progress bar
     progressBar = QProgressBar(splash)
-    progressBar.setMaximum(10)
+    progressBar.setMaximum(3)
     progressBar.setGeometry(0, splashPixmap.height() - 50, splashPixmap.width(), 20)
     splash.show()
-    for i in range(1, 11):
-        progressBar.setValue(i)
-        t = time.time()
-        while time.time() < t + 0.1:
-            app.processEvents()
+
+    # the progress bar is advanced at the actual startup milestones (gui import, main
+    # window built, about to show); processEvents repaints the splash in between
+    def _advance():
+        progressBar.setValue(progressBar.value() + 1)
+        app.processEvents()
+
+    app.processEvents()
+
+    from moltenprot import gui
+
+    _advance()
 
     if localizationStuffFlag:
         # Localization stuff
@@ -607,6 +781,8 @@ def MoltenprotGUI(localizationStuffFlag=False):
     )
     # forces main window decorator on Windows
     moltenProtMainWindow.setWindowFlags(Qt.Window)
+    _advance()
+    progressBar.setValue(progressBar.maximum())
     moltenProtMainWindow.show()
     # Hide splashscreen
     splash.finish(moltenProtMainWindow)
@@ -624,7 +800,7 @@ def main():
     # check if any arguments were supplied
     if len(sys.argv[1:]) == 0:
         # if running in PyInstaller bundle, start the GUI
-        if core.from_pyinstaller:
+        if options.from_pyinstaller:
             args.gui = True
         else:
             parser.print_help()
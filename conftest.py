@@ -0,0 +1,64 @@
+"""
+Shared pytest fixtures
+
+The repository is the moltenprot package itself, so the tests import it from a copy
+named moltenprot (core also needs the VERSION file, which is not part of the tree).
+The example plate and platemap are loaded with the pyrt_cetsa helpers.
+"""
+
+import importlib.util
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent
+
+
+def _load_by_path(name, path):
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def moltenprot_dir(tmp_path_factory):
+    """Folder that contains an importable copy of the moltenprot package (it is put on sys.path)."""
+    base_dir = tmp_path_factory.mktemp("pkg")
+    pkg_dir = base_dir / "moltenprot"
+    pkg_dir.mkdir()
+    for name in ("__init__.py", "__main__.py", "core.py", "models.py", "options.py"):
+        shutil.copy(REPO_DIR / name, pkg_dir / name)
+    (pkg_dir / "VERSION").write_text("git")
+    sys.path.insert(0, str(base_dir))
+    yield base_dir
+    sys.path.remove(str(base_dir))
+
+
+@pytest.fixture(scope="session")
+def mp_core(moltenprot_dir):
+    from moltenprot import core
+
+    return core
+
+
+@pytest.fixture(scope="session")
+def pc():
+    """pyrt_cetsa loaded by path, as nparc_analysis.py does it."""
+    return _load_by_path("pc", REPO_DIR / "pyrt_cetsa.py")
+
+
+@pytest.fixture(scope="session")
+def platemap(pc):
+    return pc.load_platemap_384(REPO_DIR / "platemap.xlsx", sample_sheet=None, conc_sheet=None)
+
+
+@pytest.fixture(scope="session")
+def plate_wide_c(pc):
+    plate, _ = pc.load_plate_auto(
+        REPO_DIR / "example_plate.xlsx", t_min_c=37.0, t_max_c=90.0, matrix_sheet=None
+    )
+    return plate
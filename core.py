@@ -16,17 +16,6 @@ Copyright 2018-2021 Vadim Kotov, Thomas C. Marlovits
     You should have received a copy of the GNU General Public License
     along with MoltenProt.  If not, see <https://www.gnu.org/licenses/>.
 """
-### Citation
-# a simple dict with strings that provide different citation formatting
-citation = {
-    "long": "\nIf you found MoltenProt helpful in your work, please cite:\nKotov et al., Protein Science (2021)\ndoi: 10.1002/pro.3986\n",
-    "html": """<p>If you found MoltenProt helpful in your work, please cite: </p> 
-                      <p>Kotov et al., Protein Science (2021)</p>
-                      <p><a href="https://dx.doi.org/10.1002/pro.3986">doi: 10.1002/pro.3986</a></p>""",
-    "short": "Citation: Kotov et al., Protein Science (2021) doi: 10.1002/pro.3986",
-}
-
-
 ### Modules
 # some useful mathematical functions
 import numpy as np
@@ -76,9 +65,15 @@ import json
 # for timestamps
 from time import strftime
 
+# I/O-bound output of several datasets
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 # import the fitting models
 from . import models
 
+# citation, PyInstaller flag and the default settings with their descriptions (shared with the CLI)
+from .options import citation, from_pyinstaller, prep_defaults, analysis_defaults, defaults
+
 # A variable for reliable access to other resources of MoltenProt (e.g. report template)
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
@@ -90,13 +85,6 @@ with open(os.path.join(__location__, "VERSION"), "r") as version_file:
 # get scipy version (some methods may not be available in earlier versions)
 scipy_version = sys.modules["scipy"].__version__
 
-# check if running from a PyInstaller bundle
-if hasattr(sys, "frozen") and hasattr(sys, "_MEIPASS"):
-    # print("Running from a PyInstaller bundle")
-    from_pyinstaller = True
-else:
-    from_pyinstaller = False
-
 # for parallel processing of some for loops using joblib (may hang up)
 try:
     from joblib import Parallel, delayed
@@ -122,6 +110,12 @@ except ImportError:
     joblib_version = "None"  # only for printing version info
     parallelization = False
 
+# faster parsing of JSON sessions (optional), the json module is used as a fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # NOTE MoltenProtFit and MoltenProtFitMultiple have different parallelization approaches:
 # MoltenProtFit - can only parallelize figure plotting and n_jobs=3 works well
 # MoltenProtFitMultiple - reads and runs several MoltenProtFit instances in parallel (F330, F350 etc),
@@ -140,66 +134,8 @@ for k in ["A", "B", "C", "D", "E", "F", "G", "H"]:
 # convert index to pandas Series and set its name
 alphanumeric_index = pd.Series(data=alphanumeric_index)
 alphanumeric_index.name = "ID"
-
-# dictionary holding the default values and and their description for CLI interface/tooltips
-# dictionary key is the name of the option, each entry contains a tuple of default parameter value and its descriptions
-# NOTE for mfilt the default value is only used when the option is supplied in the CLI
-
-# default data preparation parameters
-prep_defaults = {
-    "blanks": [],
-    "blanks_h": "Input the sample ID's with buffer-only control",  # subtract blanks in prep step
-    "exclude": [],
-    "exclude_h": 'Specify the well(s) to omit during analysis; this option is intended for simple removal of some bad wells; if many samples must be excluded, use a layout and add "Ignore" to the annotation of the sample',
-    "invert": False,  # DELETE?
-    "invert_h": "Invert the curve",
-    "mfilt": None,
-    "mfilt_h": "Apply median filter with specificed window size (in temperature units) to remove spikes; 4 degrees is a good starting value",
-    "shrink": None,
-    "shrink_h": "Average the data points to a given degree step;\n may help to make trends more apparent and speeds up the computation;\n typical values 0.5-3.0",
-    "trim_max": 0,
-    "trim_max_h": "Decrease the finishing temperature by this value",
-    "trim_min": 0,
-    "trim_min_h": "Increase the starting temperature by this value",
-}
-
-# default analysis parameters
-analysis_defaults = {
-    "model": "santoro1988",
-    "model_h": "Select a model for describing the experimental data",
-    "baseline_fit": 10,
-    "baseline_fit_h": "The length of the input data (in temperature degrees) for initial estimation of pre- and post-transition baselines",
-    "baseline_bounds": 3,
-    "baseline_bounds_h": "Baseline bounds are set as multiples of stdev of baseline parameters obtained in the pre-fitting routine; this should stabilize the fit and speed up convergence; set to 0 to remove any bounds for baselines",
-    "dCp": 0,
-    "dCp_h": "Heat capacity change of unfolding for all samples (in J/mol/K), used only in equilibrium models; this value overrides the respective column in the layout",
-    "onset_threshold": 0.01,
-    "onset_threshold_h": "Percent unfolded to define the onset of unfolding",
-    "savgol": 10,
-    "savgol_h": "Set window size (in temperature units) for Savitzky-Golay filter used to calculate the derivative",
-}
-
-# all other settings for MoltenProtFit
-defaults = {
-    "debug": False,  # currently not exposed in the CLI
-    "debug_h": "Print developer information to the console",
-    "dec": ".",
-    "dec_h": "CSV decimal separator, enclosed in quotes",
-    "denaturant": "C",
-    "denaturant_h": "For plain CSV input only; specify temperature scale that drives denaturation, in K or C",
-    "j": 1,  # TODO not related to the core functions, supply to respective methods (output etc)
-    "j_h": "Number of jobs to be spawned by parallelized parts of the code; should not be higher than the amount of CPU's in the computer; for most recent laptops a value of 3 is recommended",
-    "layout": None,  # TODO should not be set in SetAnalysisOptions, but rather in __init__
-    "layout_h": "CSV file with layout",
-    "sep": ",",
-    "sep_h": "CSV separator, enclosed in quotes",
-    "readout": "Signal",
-    "readout_h": "For plain CSV input only; specify type of input signal",
-    "spectrum": False,
-    "spectrum_h": "If true, columns in the input CSV will be treated as separate wavelengths of a spectrum",
-    "heatmap_cmap": "coolwarm_r",  # a color-safe heatmap color with red being "bad" (low value)
-    "heatmap_cmap_h": "Matplotlib code for colormap that would be used to color-code heatmaps in reports or images",
-}
+# positions (row, column) of the wells in the plate: A1 -> (0, 0), H12 -> (7, 11)
+well_positions = {well: divmod(i, 12) for i, well in enumerate(alphanumeric_index)}
 
 # dictionary with avialble models
 # NOTE to be automatically identified the model has to be subclass or subsubclass of MoltenProtModel
@@ -368,6 +304,10 @@ def serialize(obj):
         if "layout" in output:
             del output["layout"]
 
+        # the cached result columns are re-computed after loading
+        if "_results_columns" in output:
+            del output["_results_columns"]
+
         output = {"MoltenProtFit": output}
         return output
     elif isinstance(obj, MoltenProtFitMultiple):
@@ -426,6 +366,20 @@ def deserialize(input_dict):
     return input_dict
 
 
+def _deserialize_tree(obj):
+    """
+    Apply deserialize to all dicts of an already parsed JSON tree,
+    starting from the innermost ones (same order as the object_hook of json.load)
+    """
+    if isinstance(obj, dict):
+        return deserialize(
+            {key: _deserialize_tree(value) for key, value in obj.items()}
+        )
+    elif isinstance(obj, list):
+        return [_deserialize_tree(i) for i in obj]
+    return obj
+
+
 ### Classes
 
 
@@ -836,10 +790,8 @@ class MoltenProtFit:
         c = heatmap_axis.pcolor(plate96, edgecolors="k", cmap=cmap, vmin=vmin, vmax=1)
 
         # cycle through all wells and write there the ID
-        for i in plate96.index:
-            for j in plate96.columns:
-                x = plate96.columns.get_loc(j)
-                y = plate96.index.get_loc(i)
+        for y, i in enumerate(plate96.index):
+            for x, j in enumerate(plate96.columns):
                 heatmap_axis.text(
                     x + 0.5,
                     y + 0.5,
@@ -1437,17 +1389,25 @@ class MoltenProtFit:
     def getResultsColumns(self):
         """
         Returns a tuple of columns from self.plate_results that are relevant for GUI
+
+        Notes
+        -----
+        The list is cached until the next ProcessData/CalculateThermodynamic run
         """
 
         if "plate_results" in self.__dict__:
-            output = [self.plate_results.iloc[:, -1].name] + self.plotlines
+            # NOTE instances from JSON may lack the cache attribute
+            if getattr(self, "_results_columns", None) is None:
+                output = [self.plate_results.iloc[:, -1].name] + self.plotlines
 
-            # BS-factor is more useful than S, but not always available
-            if "BS_factor" in self.plate_results.columns:
-                output = output + ["BS_factor"]
-            else:
-                output = output + ["S"]
-            return output
+                # BS-factor is more useful than S, but not always available
+                if "BS_factor" in self.plate_results.columns:
+                    output = output + ["BS_factor"]
+                else:
+                    output = output + ["S"]
+                self._results_columns = output
+            # return a copy, so that the cached list cannot be modified by the caller
+            return list(self._results_columns)
         else:
             self.print_message("No plate_results attribute found", "w")
             self.print_message("Please perform analysis first", "i")
@@ -1742,6 +1702,8 @@ class MoltenProtFit:
         -----
         The names for the parameters and the contents of plate_results variable are different for various methods, so they are set up based on the selected analysis
         """
+        # plate_results will change, so the cached columns must be re-computed (see getResultsColumns)
+        self._results_columns = None
 
         if self.model == "skip":
             self.print_message("Dataset was omitted from analysis", "i")
@@ -2060,6 +2022,7 @@ class MoltenProtFit:
         # for proper json i/o
         self.plate_results.index.name = "ID"
         self.plate_results_stdev.index.name = "ID"
+        self._results_columns = None
 
     def CalculateThermodynamic(self):
         """
@@ -2147,6 +2110,8 @@ class MoltenProtFit:
         self.plate_results_stdev = pd.concat(
             [self.plate_results_stdev, td_results_stdev], axis=1, sort=True
         )
+        # the last column of plate_results has changed (see getResultsColumns)
+        self._results_columns = None
 
     def CombineResults(self, tm_stdev_filt, bs_filt, merge_dup, tm_key):
         """
@@ -2963,8 +2928,9 @@ class MoltenProtFitMultiple:
         
         Parameters
         ----------
-        which : str
-            To which dataset the options are applied; all means apply same settings for all datasets
+        which : str or list
+            To which dataset the options are applied; all means apply same settings for all datasets,
+            a list of dataset names applies the same settings to each of them
         printout : bool
             print the settings
         **kwargs
@@ -3004,6 +2970,14 @@ class MoltenProtFitMultiple:
         if which == "all":
             for i, j in self.datasets.items():
                 j.SetAnalysisOptions(**kwargs)
+        elif isinstance(which, list):
+            for i in which:
+                self.datasets[i].SetAnalysisOptions(**kwargs)
+            if printout:
+                for i in which:
+                    print("Data type is {}".format(i))
+                    self.datasets[i].printAnalysisSettings()
+            return
         else:
             self.datasets[which].SetAnalysisOptions(**kwargs)
 
@@ -3232,6 +3206,8 @@ class MoltenProtFitMultiple:
         n_jobs=1,
         no_data=False,
         session=False,
+        progress_callback=None,
+        num_threads=1,
     ):
         """
         Write output to disc for all associated datasets
@@ -3257,6 +3233,11 @@ class MoltenProtFitMultiple:
             matplotlib colormap for heatmap
         session : bool
             save MP session in JSON format
+        progress_callback : callable or None
+            called with the percentage of written datasets (int) when the output of a dataset is done
+        num_threads : int
+            how many threads can write datasets concurrently when joblib is not used (only for
+            data output, figures are always created serially)
         """
         # generate and populate a dict of output settings
         output_kwargs = {}
@@ -3306,10 +3287,36 @@ class MoltenProtFitMultiple:
                     delayed(self.WriteOutputSingle)(i, outfolder, **output_kwargs)
                     for i in self.GetDatasets()
                 )
+            # parallel output is only reported once it is complete
+            if progress_callback is not None:
+                progress_callback(100)
         else:
             # resultfolder was cleaned previously or created fresh so we just have to supply a proper prefix
-            for i in self.GetDatasets():
-                self.WriteOutputSingle(i, outfolder, **output_kwargs)
+            datasets = self.GetDatasets()
+            # NOTE pyplot is not thread-safe, so threads are only used if no figures are generated
+            makes_figures = (
+                output_kwargs.get("genpics")
+                or output_kwargs.get("heatmaps")
+                or output_kwargs.get("pdf")
+            )
+            if num_threads > 1 and len(datasets) > 1 and not makes_figures:
+                with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                    futures = [
+                        executor.submit(
+                            self.WriteOutputSingle, i, outfolder, **output_kwargs
+                        )
+                        for i in datasets
+                    ]
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        # re-raise exceptions from the worker threads
+                        future.result()
+                        if progress_callback is not None:
+                            progress_callback(int(100 * done / len(datasets)))
+            else:
+                for done, i in enumerate(datasets, start=1):
+                    self.WriteOutputSingle(i, outfolder, **output_kwargs)
+                    if progress_callback is not None:
+                        progress_callback(int(100 * done / len(datasets)))
 
         # NOTE JSON dumping must be done _AFTER_ all parallelized jobs!
         if session:
@@ -3380,18 +3387,41 @@ experimental data file.
 """
 
 
-def _csv_helper(filename, sep, dec):
+def _csv_helper(filename, sep, dec, progress_callback=None, chunksize=4096):
     """
     Pre-processing steps for reading CSV files
+
+    Parameters
+    ----------
+    filename : str
+        path to csv file
+    sep,dec - csv import parameters
+    progress_callback : callable or None
+        called with the percentage of the file read so far; if provided and
+        the file is larger than 1 MB, the file is read in chunks of `chunksize` rows
+    chunksize : int
+        number of rows per chunk for the chunked reading
     
     Returns
     -------
     pd.DataFrame with Temperature as index
     """
+    read_kwargs = dict(
+        sep=sep, decimal=dec, index_col="Temperature", encoding="utf-8", engine="c"
+    )
     try:
-        data = pd.read_csv(
-            filename, sep=sep, decimal=dec, index_col="Temperature", encoding="utf-8"
-        )
+        if progress_callback is None or os.path.getsize(filename) < 1048576:
+            data = pd.read_csv(filename, **read_kwargs)
+        else:
+            # NOTE the byte position of the handle is used to estimate progress
+            total = os.path.getsize(filename)
+            chunks = []
+            with open(filename, "rb") as handle:
+                for chunk in pd.read_csv(handle, chunksize=chunksize, **read_kwargs):
+                    chunks.append(chunk)
+                    progress_callback(min(99, int(100 * handle.tell() / total)))
+            data = pd.concat(chunks)
+            progress_callback(100)
     except ValueError as e:
         print(e)
         raise ValueError(
@@ -3415,6 +3445,7 @@ def parse_plain_csv(
     denaturant=defaults["denaturant"],
     readout=defaults["readout"],
     layout=defaults["layout"],
+    progress_callback=None,
 ):
     """
     Parse a standard CSV file with columns Temperature, A1, A2, ...
@@ -3430,6 +3461,8 @@ def parse_plain_csv(
         name for the experimental technique (e.g. CD or F330), will be used as key in dataset dict
     layout : str or None
         specify a special *.csv file which defines the plate layout (i.e. what conditions are in each sample)
+    progress_callback : callable or None
+        receives the percentage of the file read (see _csv_helper)
 
     Returns
     -------
@@ -3439,7 +3472,7 @@ def parse_plain_csv(
     """
 
     # read the CSV into a DataFrame
-    data = _csv_helper(filename, sep, dec)
+    data = _csv_helper(filename, sep, dec, progress_callback)
 
     # read layout (if provided)
     if layout is not None:
@@ -3470,6 +3503,7 @@ def parse_spectrum_csv(
     sep=defaults["sep"],
     dec=defaults["dec"],
     readout=defaults["readout"],
+    progress_callback=None,
 ):
     """
     Parse CSV file with columns Temperature,wavelengths...
@@ -3483,6 +3517,8 @@ def parse_spectrum_csv(
         temperature in input file assumed to be Celsius (default value C), but could be also in K
     readout : str
         name for the experimental technique (e.g. CD or F330), will be used as key in dataset dict
+    progress_callback : callable or None
+        receives the percentage of the file read (see _csv_helper)
 
     Returns
     -------
@@ -3493,7 +3529,7 @@ def parse_spectrum_csv(
     * Temperature axis is not sorted
     * Layouts are generated automatically from column names (assumed to be respective wavelengths)
     """
-    data = _csv_helper(filename, sep, dec)
+    data = _csv_helper(filename, sep, dec, progress_callback)
 
     # if data is too big, take a random subset
     if len(data.columns) > 96:
@@ -3527,7 +3563,14 @@ def parse_spectrum_csv(
     return output
 
 
-def parse_prom_xlsx(filename, raw=False, refold=False, LE=False, deltaF=True):
+def parse_prom_xlsx(
+    filename,
+    raw=False,
+    refold=False,
+    LE=False,
+    deltaF=True,
+    progress_callback=None,
+):
     """
     Parse a processed file from Prometheus NT.48. In these files temperature
     is always in Celsius and the readouts are more or less known. Layout is read
@@ -3547,6 +3590,8 @@ def parse_prom_xlsx(filename, raw=False, refold=False, LE=False, deltaF=True):
         compute an alternative signal-enhanced readout: F350-F330 difference
         it is an extensive readout (proportional to protein conc, like F330 or F350),
         which also makes the transitions more pronounced (like Ratio)
+    progress_callback : callable or None
+        called with the percentage of the required sheets read so far
     
     Returns
     -------
@@ -3555,6 +3600,7 @@ def parse_prom_xlsx(filename, raw=False, refold=False, LE=False, deltaF=True):
     Notes
     -----
     * Parsing relies on sheet names in English
+    * Only the overview sheet and the sheets of the processed readouts are read
     * Current implementation can successfully parse raw XLSX as long as there are less than 96 data columns (which is 3 times the number of capillaries). The data will be contaminated with straight lines of temperature and time
     
     TODO
@@ -3564,8 +3610,33 @@ def parse_prom_xlsx(filename, raw=False, refold=False, LE=False, deltaF=True):
     # force the input file to have absolute path (to be stored in JSON session)
     filename = os.path.abspath(filename)
 
-    # read the whole Excel file - get an Ordered Dict
-    input_xlsx = pd.read_excel(filename, None)
+    if refold:
+        # Full list of readouts, currently only unfolding can be processed
+        # TODO add a class to process refolding data in conjunction with unfolding
+        readouts = (
+            "Ratio (Unfolding)",
+            "330nm (Unfolding)",
+            "350nm (Unfolding)",
+            "Scattering (Unfolding)",
+            "Ratio (Refolding)",
+            "330nm (Refolding)",
+            "350nm (Refolding)",
+            "Scattering (Refolding)",
+        )
+    else:
+        readouts = ("Ratio", "330nm", "350nm", "Scattering")
+
+    # read only the required sheets of the Excel file (derivatives etc are skipped) - get a dict
+    # NOTE pandas opens the workbook in the read-only (streaming) mode of openpyxl
+    with pd.ExcelFile(filename) as excel_file:
+        required_sheets = [
+            i for i in ("Overview",) + readouts if i in excel_file.sheet_names
+        ]
+        input_xlsx = {}
+        for sheet_number, sheet_name in enumerate(required_sheets):
+            input_xlsx[sheet_name] = excel_file.parse(sheet_name)
+            if progress_callback is not None:
+                progress_callback(int(100 * (sheet_number + 1) / len(required_sheets)))
 
     # parse the layout
     # layout contains 3 columns: Condition, Capillary and dCp
@@ -3598,23 +3669,9 @@ def parse_prom_xlsx(filename, raw=False, refold=False, LE=False, deltaF=True):
 
     # cycle through available readouts and add them to MPMultiple
     if refold:
-        # Full list of readouts, currently only unfolding can be processed
-        # TODO add a class to process refolding data in conjunction with unfolding
-        readouts = (
-            "Ratio (Unfolding)",
-            "330nm (Unfolding)",
-            "350nm (Unfolding)",
-            "Scattering (Unfolding)",
-            "Ratio (Refolding)",
-            "330nm (Refolding)",
-            "350nm (Refolding)",
-            "Scattering (Refolding)",
-        )
         output.print_message(
             "Currently refolding data is treated separately from unfolding data", "w"
         )
-    else:
-        readouts = ("Ratio", "330nm", "350nm", "Scattering")
 
     # NOTE to avoid multiple checks of the scan rate (temp and time scale are the same for all readouts)
     refined_scan_rate = None
@@ -3740,8 +3797,15 @@ def mp_from_json(input_file):
     BUG column ordering is messed up after JSON I/O
     """
 
-    with open(input_file, "r") as file:
-        return json.load(file, object_hook=deserialize)
+    with open(input_file, "rb") as file:
+        content = file.read()
+    if orjson is not None:
+        try:
+            return _deserialize_tree(orjson.loads(content))
+        except orjson.JSONDecodeError:
+            # NOTE orjson rejects NaN/Infinity, which can be written by json.dumps
+            pass
+    return json.loads(content, object_hook=deserialize)
 
 
 def mp_to_json(object_inst, output=None):
@@ -34,26 +34,31 @@ from . import core
 import matplotlib
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec
+from matplotlib.lines import Line2D
 from matplotlib import cm
 
 # import PyQt5
 try:
     from PyQt5.QtCore import (
-        QThread,
         QThreadPool,
         QRunnable,
         QObject,
         pyqtSignal,
         pyqtSlot,
         QAbstractTableModel,
+        QStringListModel,
         Qt,
-        QFile,
+        QResource,
+        qUncompress,
         # QTextStream,# for text logging, disabled
         QSettings,
         QEvent,
+        QEventLoop,
         QUrl,
         QFileInfo,
         QSize,
+        QTimer,
     )
     from PyQt5.QtGui import QColor, QIcon, QKeySequence, QPalette, QFont
     from PyQt5.QtWidgets import (
@@ -97,50 +102,258 @@ cfFilename = getframeinfo(cf).filename
 
 # check if core can do parallelization and set cpuCount
 if core.parallelization:
-    from multiprocessing import cpu_count
-
-    cpuCount = cpu_count()
+    cpuCount = os.cpu_count()
 else:
     cpuCount = 1
 
 # for passing clicked button ID's
 from functools import partial
 
+# caching of colormap lookups
+from functools import lru_cache
+
+# compiled .ui forms are shared between the GUI thread and the preloader
+from threading import Lock
+
+# .ui resources are parsed from memory
+from io import BytesIO
+
+# forms pre-generated with pyuic5 are optional modules
+import importlib
+
+## \brief Cache of compiled .ui form classes, see uiFormClass
+uiFormClasses = {}
+uiFormLock = Lock()
+
+
+def readResource(resource):
+    """
+    Read a compiled-in Qt resource into an in-memory file object
+
+    Parameters
+    ----------
+    resource : str
+        resource path (e.g. ":/main.ui")
+
+    Returns
+    -------
+    io.BytesIO
+    """
+    qresource = QResource(resource)
+    data = qresource.data()
+    # NOTE rcc may store the data zlib-compressed
+    if qresource.isCompressed():
+        data = bytes(qUncompress(data))
+    return BytesIO(data)
+
+
+def precompiledFormClass(resource):
+    """
+    Return the form class from a module pre-generated with pyuic5
+
+    The module must be placed in the ui subpackage and named after the .ui file,
+    e.g. for :/main.ui run "pyuic5 main.ui -o ui_main.py"
+
+    Parameters
+    ----------
+    resource : str
+        resource path of the .ui file (e.g. ":/main.ui")
+
+    Returns
+    -------
+    class with a setupUi() method or None if there is no pre-generated module
+    """
+    moduleName = "ui_" + os.path.splitext(os.path.basename(resource))[0]
+    try:
+        module = importlib.import_module(".ui." + moduleName, __package__)
+    except ImportError:
+        return None
+    for name, value in vars(module).items():
+        if name.startswith("Ui_") and hasattr(value, "setupUi"):
+            return value
+    return None
+
+
+def uiFormClass(resource):
+    """
+    Compile a Qt Designer form from the resources to a python class
+
+    A form pre-generated with pyuic5 is used if available (see precompiledFormClass),
+    then the XML does not have to be parsed at all. Otherwise the XML is parsed and
+    compiled only on the first call for each resource,
+    afterwards the cached class is returned. If the form is being compiled by
+    UiPreloader at the moment, the call waits for it instead of compiling again
+
+    Parameters
+    ----------
+    resource : str
+        resource path of the .ui file (e.g. ":/layout.ui")
+
+    Returns
+    -------
+    class with a setupUi() method
+    """
+    with uiFormLock:
+        if resource not in uiFormClasses:
+            formClass = precompiledFormClass(resource)
+            if formClass is None:
+                formClass, baseClass = uic.loadUiType(readResource(resource))
+            uiFormClasses[resource] = formClass
+        return uiFormClasses[resource]
+
+
+class UiPreloader(QRunnable):
+    """
+    Compiles .ui forms in a background thread, so that the dialogs can be created
+    from the cached classes later on
+
+    NOTE only the python classes are created here, all widgets must be still made in the GUI thread
+    """
+
+    def __init__(self, resources):
+        super(UiPreloader, self).__init__()
+        self.resources = resources
+
+    def run(self):
+        for resource in self.resources:
+            try:
+                uiFormClass(resource)
+            except:
+                # the error will be raised again when the dialog is created
+                traceback.print_exc()
+
+
+def setupUiForm(widget, resource):
+    """
+    Build the widgets of a cached form on the supplied widget
+
+    The created child widgets are available as attributes of the widget, same as
+    with uic.loadUi(uifile, widget)
+
+    Parameters
+    ----------
+    widget : QWidget
+        the widget (e.g. a dialog) to populate
+    resource : str
+        resource path of the .ui file
+
+    Returns
+    -------
+    the populated widget
+    """
+    form = uiFormClass(resource)()
+    form.setupUi(widget)
+    widget.__dict__.update(vars(form))
+    return widget
+
+
+def loadSettingsGroup(settings, group, schema=None):
+    """
+    Read all values of a settings group at once
+
+    Parameters
+    ----------
+    settings : QSettings
+        the settings object
+    group : str
+        name of the group (e.g. "analysisSettings")
+    schema : dict or None
+        setting names and their defaults; if given, only these settings are read and
+        each value is converted to the type of its default
+
+    Returns
+    -------
+    dict
+        setting names (without the group prefix) and their values
+
+    Notes
+    -----
+    Without a schema the values are returned as stored by the backend (e.g. strings in
+    INI files)
+    """
+    settings.beginGroup(group)
+    if schema is None:
+        output = {key: settings.value(key) for key in settings.allKeys()}
+    else:
+        output = {
+            key: settings.value(key, default, type=type(default))
+            for key, default in schema.items()
+        }
+    settings.endGroup()
+    return output
+
+
 showVersionInformation = False
 if showVersionInformation:
     core.showVersionInformation()
     print("PyQt5            : {}".format(PYQT_VERSION_STR))
 
-# A cycler for color-safe 8-color palette from https://jfly.uni-koeln.de/color/
-from cycler import cycler
+# endless iteration through the curve colors
+from itertools import cycle, islice
 import traceback
 
 # Color-safe 8-color palette from https://jfly.uni-koeln.de/color/
-colorsafe_cycler = cycler(
-    color=[
-        "#0077B8",
-        "#F4640D",
-        "#FAA200",
-        "#00B7EC",
-        "#00A077",
-        "#F4E635",
-        "#E37DAC",
-        "#242424",
-    ]
+# NOTE a plain tuple is cycled directly, no per-step dicts are created as with cycler
+colorsafe_colors = (
+    "#0077B8",
+    "#F4640D",
+    "#FAA200",
+    "#00B7EC",
+    "#00A077",
+    "#F4E635",
+    "#E37DAC",
+    "#242424",
 )
 
 
-class ExportThread(QThread):
-    exportThreadSignal = pyqtSignal(str)
+@lru_cache(maxsize=32)
+def getColormap(name):
+    """
+    Return the matplotlib colormap with the supplied name, the lookup is cached
+    """
+    return cm.get_cmap(name)
+
+
+def rgbaToHex(rgba):
+    """
+    Convert an array of RGBA colors (as returned by a colormap) to hex strings without alpha
+
+    Every distinct color is formatted only once
 
-    def __init__(self, parent=None):
-        QThread.__init__(self, parent)
-        print(type(parent))
+    Parameters
+    ----------
+    rgba : np.ndarray
+        array of shape (N, 4) with values from 0 to 1
 
-    def run(self):
-        for i in range(1, 21):
-            self.sleep(3)
-            self.exportThreadSignal.emit("i = %s" % i)
+    Returns
+    -------
+    np.ndarray of N hex strings (e.g. #1f77b4)
+    """
+    # NOTE same rounding as in matplotlib.colors.to_hex
+    rgb = np.round(np.asarray(rgba, dtype=float)[:, :3] * 255).astype(int)
+    packed = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+    unique, inverse = np.unique(packed, return_inverse=True)
+    hexColors = np.array(["#{:06x}".format(i) for i in unique], dtype=object)
+    return hexColors[inverse]
+
+
+@lru_cache(maxsize=512)
+def heatmapButtonStyle(color):
+    """
+    Return the style sheet for a heatmap button of the supplied color, the result is cached
+
+    Parameters
+    ----------
+    color : str or None
+        hex color (see rgbaToHex); None gives the style of a gray button without results
+    """
+    if color is None:
+        return "QPushButton {  border-width: 2px; border-color: white; background-color: gray } QPushButton:checked { border-color:  black; border-style: inset;}"
+    return (
+        "QPushButton {  border-width: 2px; border-color: white; background-color: "
+        + color
+        + "} QPushButton:checked { border-color:  black; border-style: inset;}"
+    )
 
 
 class WorkerSignals(QObject):
@@ -169,6 +382,34 @@ class WorkerSignals(QObject):
     progress = pyqtSignal(int)
 
 
+class ImageSaveWorker(QRunnable):
+    """
+    Worker thread - encodes and writes an image file
+
+    The result signal carries the file name when the image was written
+
+    :param image: QImage to save (QImage, unlike QPixmap, can be used outside of the GUI thread)
+    :param filename: the output file
+    :param fileFormat: the image format (e.g. "PNG")
+    """
+
+    def __init__(self, image, filename, fileFormat="PNG"):
+        super(ImageSaveWorker, self).__init__()
+        self.image = image
+        self.filename = filename
+        self.fileFormat = fileFormat
+        self.signals = WorkerSignals()
+
+    @pyqtSlot()
+    def run(self):
+        if self.image.save(self.filename, self.fileFormat):
+            self.signals.result.emit(self.filename)
+        else:
+            self.signals.error.emit(
+                (IOError, "Could not write {}".format(self.filename), "")
+            )
+
+
 class ExportWorker(QRunnable):
     """
     Worker thread - runs data export in a separate thread
@@ -193,7 +434,7 @@ class ExportWorker(QRunnable):
         self.signals = WorkerSignals()
 
         # Add the callback to our kwargs
-        # self.kwargs["progress_callback"] = self.signals.progress
+        self.kwargs["progress_callback"] = self.signals.progress.emit
 
     @pyqtSlot()
     def run(self):
@@ -236,7 +477,6 @@ class ExportWorker(QRunnable):
                     n_jobs=n_jobs,
                 )
             """
-            self.signals.progress.emit(1)
         except:
             traceback.print_exc()
             exctype, value = sys.exc_info()[:2]
@@ -247,6 +487,60 @@ class ExportWorker(QRunnable):
             self.signals.finished.emit()  # Done
 
 
+class HeatmapStyleWorker(QRunnable):
+    """
+    Worker thread - computes the colors and tooltips of the heatmap buttons
+
+    The result signal carries a tuple (request, colors, tooltips), where colors (hex strings) and
+    tooltips are dicts keyed by button ID; the stylesheets must be applied in the GUI thread
+
+    :param plate_results: a copy of the Condition and score columns of MoltenProtFit.plate_results
+    :param heatMapName: the score column used for coloring
+    :param colormap: the name of the matplotlib colormap
+    :param request: a number to tell the results of subsequent requests apart
+    """
+
+    def __init__(self, plate_results, heatMapName, colormap, request):
+        super(HeatmapStyleWorker, self).__init__()
+        self.plate_results = plate_results
+        self.heatMapName = heatMapName
+        self.colormap = colormap
+        self.request = request
+        self.signals = WorkerSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            # normalize the data in selected column and create colors (hex strings) with the current colormap
+            # NOTE the colormap is applied to the whole array at once rather than per value
+            cmap = getColormap(self.colormap)
+            normalized = core.normalize(self.plate_results[self.heatMapName])
+            colors = dict(
+                zip(
+                    normalized.index,
+                    rgbaToHex(cmap(normalized.to_numpy(dtype=float))),
+                )
+            )
+            tooltips = {
+                i: "{} {} {} = {}".format(
+                    i, condition, self.heatMapName, round(value, 2)
+                )
+                for i, condition, value in zip(
+                    self.plate_results.index,
+                    self.plate_results["Condition"].to_numpy(),
+                    self.plate_results[self.heatMapName].to_numpy(),
+                )
+            }
+        except:
+            traceback.print_exc()
+            exctype, value = sys.exc_info()[:2]
+            self.signals.error.emit((exctype, value, traceback.format_exc()))
+        else:
+            self.signals.result.emit((self.request, colors, tooltips))
+        finally:
+            self.signals.finished.emit()
+
+
 ##  \brief This class implements Help Dialog of MoltenProt.
 #     \details Simpliest help system. Help information should be placed in subdirectory with name "help".
 class MoltenProtHelpDialog(QDialog):
@@ -311,10 +605,7 @@ class LayoutDialog(QDialog):
 
         # self.ui = Ui_layoutDialog()
         # self.ui.setupUi(self)
-        uifile = QFile(":/layout.ui")
-        uifile.open(QFile.ReadOnly)
-        self.ui = uic.loadUi(uifile, self)
-        uifile.close()
+        self.ui = setupUiForm(self, ":/layout.ui")
         # Method myAccept will be called when user pressed Ok button
         self.ui.buttonBox.accepted.connect(self.myAccept)
         # Method myReject will be called when user pressed Ok button
@@ -322,42 +613,37 @@ class LayoutDialog(QDialog):
         self.setContextMenuPolicy(Qt.ActionsContextMenu)
 
         blankAction = QAction("Blank", self)
-        blankAction.triggered.connect(self.on_blankAction)
+        blankAction.triggered.connect(partial(self.setSelectedText, "Blank"))
         self.addAction(blankAction)
 
         """
         #NOTE not implemented in main module, currently disabled
         referenceAction = QAction("Reference", self)
-        referenceAction.triggered.connect(self.on_refAction)
+        referenceAction.triggered.connect(partial(self.setSelectedText, "Reference"))
         self.addAction(referenceAction)
         """
 
         ignoreAction = QAction("Ignore", self)
-        ignoreAction.triggered.connect(self.on_ignoreAction)
+        ignoreAction.triggered.connect(partial(self.setSelectedText, "Ignore"))
         self.addAction(ignoreAction)
 
         clearSelectedAction = QAction("Clear selected cells", self)
-        clearSelectedAction.triggered.connect(self.on_clearSelectedAction)
+        clearSelectedAction.triggered.connect(partial(self.setSelectedText, ""))
         self.addAction(clearSelectedAction)
 
-    @pyqtSlot()
-    def on_blankAction(self):
-        for currentQTableWidgetItem in self.ui.tableWidget.selectedItems():
-            currentQTableWidgetItem.setText("Blank")
-
-    @pyqtSlot()
-    def on_refAction(self):
-        for currentQTableWidgetItem in self.ui.tableWidget.selectedItems():
-            currentQTableWidgetItem.setText("Reference")
-
-    @pyqtSlot()
-    def on_ignoreAction(self):
-        for currentQTableWidgetItem in self.ui.tableWidget.selectedItems():
-            currentQTableWidgetItem.setText("Ignore")
-
-    def on_clearSelectedAction(self):
-        for currentQTableWidgetItem in self.ui.tableWidget.selectedItems():
-            currentQTableWidgetItem.setText("")
+    def setSelectedText(self, text):
+        """
+        Set the text of all selected cells (e.g. "Blank", "Ignore" or "" to clear them)
+        """
+        # NOTE signals and repaints are suspended while the items are changed,
+        # so that the table is updated once for the whole selection
+        tableWidget = self.ui.tableWidget
+        tableWidget.setUpdatesEnabled(False)
+        tableWidget.blockSignals(True)
+        for currentQTableWidgetItem in tableWidget.selectedItems():
+            currentQTableWidgetItem.setText(text)
+        tableWidget.blockSignals(False)
+        tableWidget.setUpdatesEnabled(True)
 
     @pyqtSlot()
     def myAccept(self):
@@ -375,20 +661,79 @@ class LayoutDialog(QDialog):
 
 ##  \brief This class implements export/import and the other settings toolbox dialog of MoltenProt.
 class MoltenProtToolBox(QDialog):
+    # all settings stored by the toolbox: (key in group "toolbox", widget name, widget kind, default value)
+    # NOTE the order is the same in which the values are restored
+    _settingsSchema = (
+        ("importSettingsPage/denaturantComboBoxIndex", "denaturantComboBox", "index", 0),
+        ("importSettingsPage/separatorInputText", "separatorInput", "text", ","),
+        (
+            "importSettingsPage/decimalSeparatorInputText",
+            "decimalSeparatorInput",
+            "text",
+            ".",
+        ),
+        ("importSettingsPage/scanRateSpinBoxValue", "scanRateSpinBox", "value", 1.0),
+        ("importSettingsPage/refoldingCheckBox", "refoldingCheckBox", "check", 0),
+        ("importSettingsPage/rawCheckBox", "rawCheckBox", "check", 0),
+        ("importSettingsPage/spectrumCsvCheckBox", "spectrumCsvCheckBox", "check", 0),
+        ("miscSettingsPage/parallelSpinBox", "parallelSpinBox", "value", 1),
+        (
+            "miscSettingsPage/colormapForPlotComboBoxIndex",
+            "colormapForPlotComboBox",
+            "index",
+            0,
+        ),
+        (
+            "exportSettingsPage/outputFormatComboBoxIndex",
+            "outputFormatComboBox",
+            "index",
+            0,
+        ),
+        (
+            "exportSettingsPage/outputReportComboBoxIndex",
+            "outputReportComboBox",
+            "index",
+            0,
+        ),
+        ("plotSettingsPage/curveVlinesCheckBox", "curveVlinesCheckBox", "check", 0),
+        ("plotSettingsPage/curveBaselineCheckBox", "curveBaselineCheckBox", "check", 0),
+        (
+            "plotSettingsPage/curveHeatmapColorCheckBox",
+            "curveHeatmapColorCheckBox",
+            "check",
+            0,
+        ),
+        (
+            "plotSettingsPage/curveDerivativeCheckBox",
+            "curveDerivativeCheckBox",
+            "check",
+            0,
+        ),
+        ("plotSettingsPage/curveLegendComboBox", "curveLegendComboBox", "index", 0),
+        (
+            "plotSettingsPage/curveMarkEverySpinBoxValue",
+            "curveMarkEverySpinBox",
+            "value",
+            0,
+        ),
+        ("plotSettingsPage/curveTypeComboboxIndex", "curveTypeComboBox", "index", 0),
+        ("plotSettingsPage/curveViewComboboxIndex", "curveViewComboBox", "index", 0),
+    )
+
     def __init__(self, parent=None):
         super(MoltenProtToolBox, self).__init__(parent)
         if parent == None:
             print("parent == None", cfFilename, currentframe().f_lineno)
         self.parent = parent
-        uifile = QFile(":/settings.ui")
-        uifile.open(QFile.ReadOnly)
-        self.ui = uic.loadUi(uifile, self)
-        uifile.close()
+        self.ui = setupUiForm(self, ":/settings.ui")
         self.ui.buttonBox.accepted.connect(self.myAccept)
         self.ui.buttonBox.rejected.connect(self.myReject)
         self.ui.buttonBox.clicked["QAbstractButton*"].connect(self.buttonClicked)
         self.ui.parallelSpinBox.setMaximum(cpuCount - 1)
         self.settings = QSettings()
+        ## \brief The stored toolbox settings (keys from _settingsSchema), kept in sync with self.settings
+        #   \details Other parts of the GUI can read the values from here instead of the settings backend.
+        self.settingsValues = {}
         self.restoreSettingsValues()
 
     # @pyqtSlot()
@@ -400,102 +745,22 @@ class MoltenProtToolBox(QDialog):
 
     @pyqtSlot()
     def myAccept(self):
-        self.settings.setValue(
-            "toolbox/importSettingsPage/separatorInputText",
-            self.ui.separatorInput.text(),
-        )
-        self.settings.setValue(
-            "toolbox/importSettingsPage/decimalSeparatorInputText",
-            self.ui.decimalSeparatorInput.text(),
-        )
-        self.settings.setValue(
-            "toolbox/importSettingsPage/denaturantComboBoxIndex",
-            self.ui.denaturantComboBox.currentIndex(),
-        )
-        self.settings.setValue(
-            "toolbox/importSettingsPage/scanRateSpinBoxValue",
-            self.ui.scanRateSpinBox.value(),
-        )
-
-        self.settings.setValue(
-            "toolbox/importSettingsPage/spectrumCsvCheckBox",
-            int(self.ui.spectrumCsvCheckBox.isChecked()),
-        )
-
-        self.settings.setValue(
-            "toolbox/importSettingsPage/refoldingCheckBox",
-            int(self.ui.refoldingCheckBox.isChecked()),
-        )
-
-        self.settings.setValue(
-            "toolbox/importSettingsPage/rawCheckBox",
-            int(self.ui.rawCheckBox.isChecked()),
-        )
-
-        self.settings.setValue(
-            "toolbox/exportSettingsPage/outputFormatComboBoxIndex",
-            self.ui.outputFormatComboBox.currentIndex(),
-        )
-        self.settings.setValue(
-            "toolbox/exportSettingsPage/outputReportComboBoxIndex",
-            self.ui.outputReportComboBox.currentIndex(),
-        )
-        # self.settings.setValue(
-        #    "toolbox/exportSettingsPage/genpicsCheckBox",
-        #    int(self.ui.genpicsCheckBox.isChecked()),
-        # )
-        # self.settings.setValue(
-        #    "toolbox/exportSettingsPage/heatmapCheckBox",
-        #    int(self.ui.heatmapCheckBox.isChecked()),
-        # )
-
-        self.settings.setValue(
-            "toolbox/miscSettingsPage/parallelSpinBox", self.ui.parallelSpinBox.value()
-        )
-        self.settings.setValue(
-            "toolbox/miscSettingsPage/colormapForPlotComboBoxIndex",
-            self.ui.colormapForPlotComboBox.currentIndex(),
-        )
-
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveVlinesCheckBox",
-            int(self.ui.curveVlinesCheckBox.isChecked()),
-        )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveBaselineCheckBox",
-            int(self.ui.curveBaselineCheckBox.isChecked()),
-        )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveDerivativeCheckBox",
-            int(self.ui.curveDerivativeCheckBox.isChecked()),
-        )
-
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveHeatmapColorCheckBox",
-            int(self.ui.curveHeatmapColorCheckBox.isChecked()),
-        )
-
-        # self.settings.setValue(
-        #    "toolbox/plotSettingsPage/curveLegendCheckBox",
-        #    int(self.ui.curveLegendCheckBox.isChecked()),
-        # )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveLegendComboBox",
-            self.ui.curveLegendComboBox.currentIndex(),
-        )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveMarkEverySpinBoxValue",
-            self.ui.curveMarkEverySpinBox.value(),
-        )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveTypeComboboxIndex",
-            self.ui.curveTypeComboBox.currentIndex(),
-        )
-        self.settings.setValue(
-            "toolbox/plotSettingsPage/curveViewComboboxIndex",
-            self.ui.curveViewComboBox.currentIndex(),
-        )
-
+        self.settings.beginGroup("toolbox")
+        for key, widgetName, kind, default in self._settingsSchema:
+            widget = getattr(self.ui, widgetName)
+            if kind == "text":
+                value = widget.text()
+            elif kind == "index":
+                value = widget.currentIndex()
+            elif kind == "check":
+                value = int(widget.isChecked())
+            else:
+                value = widget.value()
+            self.settings.setValue(key, value)
+            self.settingsValues[key] = value
+        self.settings.endGroup()
+        # write all values to the backend at once
+        self.settings.sync()
         self.close()
 
     @pyqtSlot()
@@ -504,104 +769,22 @@ class MoltenProtToolBox(QDialog):
         self.close()
 
     def restoreSettingsValues(self):
-        index = int(
-            self.settings.value("toolbox/importSettingsPage/denaturantComboBoxIndex", 0)
-        )
-        self.ui.denaturantComboBox.setCurrentIndex(index)
-        text = self.settings.value("toolbox/importSettingsPage/separatorInputText", ",")
-        self.ui.separatorInput.setText(text)
-        text = self.settings.value(
-            "toolbox/importSettingsPage/decimalSeparatorInputText", "."
-        )
-        self.ui.decimalSeparatorInput.setText(text)
-        value = float(
-            self.settings.value("toolbox/importSettingsPage/scanRateSpinBoxValue", 1.0)
-        )
-        self.ui.scanRateSpinBox.setValue(value)
-        isChecked = int(
-            self.settings.value("toolbox/importSettingsPage/refoldingCheckBox", 0)
-        )
-        self.ui.refoldingCheckBox.setChecked(isChecked)
-        isChecked = int(
-            self.settings.value("toolbox/importSettingsPage/rawCheckBox", 0)
-        )
-        self.ui.rawCheckBox.setChecked(isChecked)
-        isChecked = int(
-            self.settings.value("toolbox/importSettingsPage/spectrumCsvCheckBox", 0)
-        )
-        self.ui.spectrumCsvCheckBox.setChecked(isChecked)
-
-        value = int(self.settings.value("toolbox/miscSettingsPage/parallelSpinBox", 1))
-        self.ui.parallelSpinBox.setValue(value)
-        index = int(
-            self.settings.value(
-                "toolbox/miscSettingsPage/colormapForPlotComboBoxIndex", 0
-            )
-        )
-        self.ui.colormapForPlotComboBox.setCurrentIndex(index)
-
-        index = int(
-            self.settings.value(
-                "toolbox/exportSettingsPage/outputFormatComboBoxIndex", 0
-            )
-        )
-        self.ui.outputFormatComboBox.setCurrentIndex(index)
-        index = int(
-            self.settings.value(
-                "toolbox/exportSettingsPage/outputReportComboBoxIndex", 0
-            )
-        )
-        self.ui.outputReportComboBox.setCurrentIndex(index)
-        # isChecked = int(
-        #    self.settings.value("toolbox/exportSettingsPage/genpicsCheckBox", 0)
-        # )
-        # self.ui.genpicsCheckBox.setChecked(isChecked)
-        # isChecked = int(
-        #    self.settings.value("toolbox/exportSettingsPage/heatmapCheckBox", 0)
-        # )
-        # self.ui.heatmapCheckBox.setChecked(isChecked)
-
-        isChecked = int(
-            self.settings.value("toolbox/plotSettingsPage/curveVlinesCheckBox", 0)
-        )
-        self.ui.curveVlinesCheckBox.setChecked(isChecked)
-        isChecked = int(
-            self.settings.value("toolbox/plotSettingsPage/curveBaselineCheckBox", 0)
-        )
-        self.ui.curveBaselineCheckBox.setChecked(isChecked)
-        isChecked = int(
-            self.settings.value("toolbox/plotSettingsPage/curveHeatmapColorCheckBox", 0)
-        )
-        self.ui.curveHeatmapColorCheckBox.setChecked(isChecked)
-
-        isChecked = int(
-            self.settings.value("toolbox/plotSettingsPage/curveDerivativeCheckBox", 0)
-        )
-        self.ui.curveDerivativeCheckBox.setChecked(isChecked)
-        # isChecked = int(
-        # self.settings.value("toolbox/plotSettingsPage/curveLegendCheckBox", 0)
-        # )
-        # self.ui.curveLegendCheckBox.setChecked(isChecked)
-        index = int(
-            self.settings.value("toolbox/plotSettingsPage/curveLegendComboBox", 0)
-        )
-        self.ui.curveLegendComboBox.setCurrentIndex(index)
-
-        value = int(
-            self.settings.value(
-                "toolbox/plotSettingsPage/curveMarkEverySpinBoxValue", 0
-            )
-        )
-        self.ui.curveMarkEverySpinBox.setValue(value)
-
-        index = int(
-            self.settings.value("toolbox/exportSettingsPage/curveTypeComboboxIndex", 0)
-        )
-        self.ui.curveTypeComboBox.setCurrentIndex(index)
-        index = int(
-            self.settings.value("toolbox/exportSettingsPage/curveViewComboboxIndex", 0)
-        )
-        self.ui.curveViewComboBox.setCurrentIndex(index)
+        self.settings.beginGroup("toolbox")
+        for key, widgetName, kind, default in self._settingsSchema:
+            widget = getattr(self.ui, widgetName)
+            # NOTE the typed read avoids a separate conversion of the stored string
+            # for spinboxes the type of the default defines the type of the value
+            value = self.settings.value(key, default, type=type(default))
+            self.settingsValues[key] = value
+            if kind == "text":
+                widget.setText(value)
+            elif kind == "index":
+                widget.setCurrentIndex(value)
+            elif kind == "check":
+                widget.setChecked(value)
+            else:
+                widget.setValue(value)
+        self.settings.endGroup()
 
     def resetToDefaults(self):
         # print("resetToDefaults")
@@ -670,29 +853,67 @@ class MoltenProtToolBox(QDialog):
 
 
 class TableModel(QAbstractTableModel):
-    def __init__(self, data):
-        super(TableModel, self).__init__()
-        self._data = data
+    def __init__(self, data, columns=None, index=None, parent=None):
+        """
+        A table model backed by plain numpy arrays
+
+        Parameters
+        ----------
+        data : pd.DataFrame or 2D array-like
+            the values to show, if a DataFrame is supplied, its columns and index are used
+        columns, index : array-like
+            column and row labels when data is not a DataFrame (default: numeric labels)
+        parent : QObject
+            the owner of the model
+        """
+        super(TableModel, self).__init__(parent)
+        self.setTableData(data, columns, index)
+
+    def setTableData(self, data, columns=None, index=None):
+        """
+        Replace the contents of the model, the attached views are reset once
+
+        Parameters are the same as for the constructor
+        """
+        self.beginResetModel()
+        if isinstance(data, pd.DataFrame):
+            columns = data.columns
+            index = data.index
+            data = data.to_numpy(dtype=object)
+        self._values = np.array(data, dtype=object, ndmin=2)
+        if columns is None:
+            columns = range(self._values.shape[1])
+        if index is None:
+            index = range(self._values.shape[0])
+        self._columns = np.array(columns, dtype=object)
+        self._index = np.array(index, dtype=object)
+        # NOTE data() and headerData() are called by Qt for every visible cell on each repaint,
+        # so the string representations are computed once here
+        self._str_values = np.array(
+            [[str(j) for j in i] for i in self._values], dtype=object
+        ).reshape(self._values.shape)
+        self._str_columns = [str(i) for i in self._columns]
+        self._str_index = [str(i) for i in self._index]
+        self.endResetModel()
 
     def data(self, index, role):
         if role == Qt.DisplayRole:
-            value = self._data.iloc[index.row(), index.column()]
-            return str(value)
+            return self._str_values[index.row(), index.column()]
 
     def rowCount(self, index):
-        return self._data.shape[0]
+        return self._values.shape[0]
 
     def columnCount(self, index):
-        return self._data.shape[1]
+        return self._values.shape[1]
 
     def headerData(self, section, orientation, role):
         # section is the index of the column/row.
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
-                return str(self._data.columns[section])
+                return self._str_columns[section]
 
             if orientation == Qt.Vertical:
-                return str(self._data.index[section])
+                return self._str_index[section]
 
     def flags(self, index):
         if index.column() == 1:
@@ -701,7 +922,18 @@ class TableModel(QAbstractTableModel):
             return Qt.ItemIsEnabled
 
     def setData(self, index, value, role=Qt.DisplayRole):
-        self._data.iloc[index.row(), index.column()] = value
+        self._values[index.row(), index.column()] = value
+        # keep the cached string representation in sync
+        self._str_values[index.row(), index.column()] = str(value)
+        # only the edited cell has to be repainted
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        return True
+
+    def toDataFrame(self):
+        """
+        Return the current contents of the model as a DataFrame
+        """
+        return pd.DataFrame(self._values, index=self._index, columns=self._columns)
 
 
 class ComboDelegate(QItemDelegate):
@@ -713,10 +945,12 @@ class ComboDelegate(QItemDelegate):
     def __init__(self, parent, items=[]):
         QItemDelegate.__init__(self, parent)
         self.li = items
+        # the item model is shared by all editors, so that only the view is created per edit
+        self._model = QStringListModel(self.li, self)
 
     def createEditor(self, parent, option, index):
         combo = QComboBox(parent)
-        combo.addItems(self.li)
+        combo.setModel(self._model)
         combo.currentIndexChanged.connect(self.currentIndexChanged)
         return combo
 
@@ -742,10 +976,7 @@ class AnalysisDialog(QDialog):
         if parent == None:
             print("parent == None", cfFilename, currentframe().f_lineno)
         self.parent = parent
-        uifile = QFile(":/analysis.ui")
-        uifile.open(QFile.ReadOnly)
-        self.ui = uic.loadUi(uifile, self)
-        uifile.close()
+        self.ui = setupUiForm(self, ":/analysis.ui")
         self.ui.buttonBox.accepted.connect(self.myAccept)
         self.ui.buttonBox.rejected.connect(self.myReject)
         self.ui.medianFilterCheckBox.clicked.connect(
@@ -824,32 +1055,31 @@ class AnalysisDialog(QDialog):
             self.parent.prepareAnalysisTableView()
 
     def setCheckBox(self, checkBoxSettingValue, checkBox):
-        value = self.settings.value(checkBoxSettingValue)
-        if value == None:
-            value = False
-        else:
-            value = int(value)
-        if value == 1:
-            value = True
-        else:
-            value = False
-        checkBox.setChecked(value)
+        checkBox.setChecked(checkBoxSettingValue == 1)
 
     def restoreSettingsValues(self):
-        value = int(self.settings.value("analysisSettings/dCpSpinBoxValue", 0))
+        settings = loadSettingsGroup(
+            self.settings,
+            "analysisSettings",
+            {
+                "dCpSpinBoxValue": 0,
+                "medianFilterCheckBox": 0,
+                "medianFilterSpinBox": 5,
+                "shrinkCheckBox": 0,
+                "shrinkDoubleSpinBox": 5.0,
+            },
+        )
+
+        value = settings["dCpSpinBoxValue"]
         self.ui.dCpSpinBox.setValue(value)
 
-        self.setCheckBox(
-            "analysisSettings/medianFilterCheckBox", self.ui.medianFilterCheckBox
-        )
-        value = self.settings.value("analysisSettings/medianFilterSpinBox", 5)
-        value = int(value)
+        self.setCheckBox(settings["medianFilterCheckBox"], self.ui.medianFilterCheckBox)
+        value = settings["medianFilterSpinBox"]
         self.ui.medianFilterSpinBox.setValue(value)
         self.on_medianFilterCheckBoxChecked()
 
-        self.setCheckBox("analysisSettings/shrinkCheckBox", self.ui.shrinkCheckBox)
-        value = self.settings.value("analysisSettings/shrinkDoubleSpinBox", 5)
-        value = float(value)
+        self.setCheckBox(settings["shrinkCheckBox"], self.ui.shrinkCheckBox)
+        value = settings["shrinkDoubleSpinBox"]
         self.ui.shrinkDoubleSpinBox.setValue(value)
         self.on_shrinkCheckBoxChecked()
 
@@ -882,6 +1112,34 @@ class AnalysisDialog(QDialog):
             self.ui.shrinkNewdTValueLabel.hide()
 
 
+class ButtonState:
+    """
+    The state of a single heatmap button and of the curves plotted for it
+
+    Attributes
+    ----------
+    button : QPushButton
+        reference to the respective GUI button
+    color
+        matplotlib-compatible color of the button (None if the sample has no results)
+    tooltip : str
+        information displayed when mouse is over a button
+    lines : list or None
+        matplotlib objects plotted for the sample; if None, then the curve was not plotted!
+    line_color
+        the color used for the line (e.g. from colorsafe list, or the same color as the button)
+    """
+
+    __slots__ = ("button", "color", "tooltip", "lines", "line_color")
+
+    def __init__(self, button):
+        self.button = button
+        self.color = None
+        self.tooltip = None
+        self.lines = None
+        self.line_color = None
+
+
 ##  \brief This class implements QMainWindow of MoltenProt.
 #     \details
 class MoltenProtMainWindow(QMainWindow):
@@ -909,13 +1167,18 @@ class MoltenProtMainWindow(QMainWindow):
         self.setAnalysisDefaults()
         ## \brief  This attribute holds the instance of MoltenProtFit object. \sa core.MoltenProtFit
         self.moltenProtFit = None
+        # counts the requests to restyle the heatmap buttons, see setButtonsStyleAccordingToNormalizedData
+        self.buttonsStyleRequest = 0
+        # baselines of all wells evaluated at the ends of the temperature range, see getBaselines
+        self.baselineCache = {}
+        self.baselineCacheSource = None
         ## \brief  This attribute holds the instance of MoltenProtFitMultiple object. \sa core.MoltenProtFitMultiple
         self.moltenProtFitMultiple = None
         # the initial state is that data is not processed
         self.dataProcessed = False
         ## \brief  This attribute holds the instance of AxesDerivative object.
-        #   \details AxesDerivative object depicts derevative data plot under the main plot and is created in addDerivativeSublot method.
-        #   \sa addDerivativeSublot
+        #   \details AxesDerivative object depicts derevative data plot under the main plot, it is None when the subplot is hidden.
+        #   \sa arrangeSubplots
         self.axesDerivative = None
         self.axesLegend = None
         ## \brief  This attribute holds the instance of sortScoreCombBoxAction object.
@@ -924,17 +1187,36 @@ class MoltenProtMainWindow(QMainWindow):
         ## \brief This attribute holds user personal settings.
         #   \details At present moment this object holds last working directory. \sa lastDir
         self.settings = QSettings()
+        ## \brief This timer writes pending settings to disk, see acceptAnalysis, on_loadFile, on_actionFontTriggered and closeEvent
+        #   \details Restarting the timer postpones the write, so that a series of analysis runs is saved only once.
+        self.settingsSyncTimer = QTimer(self)
+        self.settingsSyncTimer.setSingleShot(True)
+        self.settingsSyncTimer.setInterval(2000)
+        self.settingsSyncTimer.timeout.connect(self.settings.sync)
+        ## \brief This timer plots the curves of the hovered button, see eventFilter and plotHoveredButton
+        #   \details Hover events arriving within one frame (~16 ms) are merged, so that quickly crossing the heatmap does not plot every button on the way.
+        self.hoverPlotTimer = QTimer(self)
+        self.hoverPlotTimer.setSingleShot(True)
+        self.hoverPlotTimer.setInterval(16)
+        self.hoverPlotTimer.timeout.connect(self.plotHoveredButton)
+        # the ID of the button under the cursor (None if no button is hovered)
+        self.lastHoverId = None
+        # all general settings are read at once
+        generalSettings = loadSettingsGroup(
+            self.settings,
+            "settings",
+            {"lastDir": ".", "analysisRunsCounter": 0, "analysisRunsThresh": 1000},
+        )
         ## \brief  This attribute holds last working directory.
-        self.lastDir = self.settings.value("settings/lastDir", ".")
+        self.lastDir = generalSettings["lastDir"]
         # print type(self.lastDir), self.lastDir, cfFilename, currentframe().f_lineno
         ## \brief  This attribute holds the number of analysis runs.
-        self.analysisRunsCounter = int(
-            self.settings.value("settings/analysisRunsCounter", 0)
-        )
+        self.analysisRunsCounter = generalSettings["analysisRunsCounter"]
         # set analysisRunsCounter threshold to display the survey request (the default starting value is 1000)
-        self.analysisRunsThresh = int(
-            self.settings.value("settings/analysisRunsThresh", 1000)
-        )
+        self.analysisRunsThresh = generalSettings["analysisRunsThresh"]
+        ## \brief This attribute holds the font settings, changes are written both here and to self.settings
+        #   \sa readFontFromSettings on_actionFontTriggered
+        self.fontSettings = loadSettingsGroup(self.settings, "fontSettings")
 
         ## Plotting-related constants
         ## \brief  This attribute controls the legend placement on the main plot.
@@ -986,6 +1268,14 @@ class MoltenProtMainWindow(QMainWindow):
         ## \brief This attribute holds the current palette.
         self.currentColorMap = self.colorMapNames[self.currentColorMapIndex]
         self.colorMapComboBoxAction = None
+        # dialogs that are only created on first use, see initDialogs
+        self._analysisDialog = None
+        self._layoutDialog = None
+        self._helpDialog = None
+        # compile the dialog forms in the background while the main window is built
+        QThreadPool.globalInstance().start(
+            UiPreloader((":/settings.ui", ":/analysis.ui", ":/layout.ui"))
+        )
         self.createMainWindow()
         self.createStatusBar()
 
@@ -1000,42 +1290,35 @@ class MoltenProtMainWindow(QMainWindow):
             "Multithreading with maximum %d threads" % self.threadpool.maxThreadCount()
         )
         self.threadIsWorking = False
+        self.threadFailed = False
+        self.threadErrorMessage = ""
 
         self.closeWithoutQuestion = False
 
         self.iconSize = 12
         self.readFontFromSettings()
 
-    def createExportThread(self):
-        self.exportThread = ExportThread(self)  # make a class instance
-        self.exportThread.started.connect(self.on_started)
-        self.exportThread.finished.connect(self.on_finished)
-        self.exportThread.exportThreadSignal.connect(
-            self.on_change, Qt.QueuedConnection
-        )
-
     def resetColorCycler(self):
         """
         Creates a fresh iterator through colors and sets the initial color
         """
-        self.curveColorCycler = colorsafe_cycler()
-        self.currentCurveColor = next(self.curveColorCycler)["color"]
-
-    def on_started(self):  # called when thread is started
-        if showVersionInformation:
-            print("on_started")
+        self.curveColorCycler = cycle(colorsafe_colors)
+        self.currentCurveColor = next(self.curveColorCycler)
 
-    def on_finished(self):  # called when thread is finished
-        if showVersionInformation:
-            print("on_finished")
-
-    def on_change(self, s):
-        # self.label.setText(s)
-        if showVersionInformation:
-            print("on_change", s)
+    def threadError(self, error):
+        # error is a tuple (exctype, value, traceback.format_exc())
+        # NOTE the message is shown in threadComplete, which is always called afterwards
+        self.threadFailed = True
+        self.threadErrorMessage = "Export failed: {}".format(error[1])
 
     def threadComplete(self):
+        # the wait cursor is kept while the worker is running
+        QApplication.restoreOverrideCursor()
         self.threadIsWorking = False
+        if self.threadFailed:
+            self.status_text.setText("Export failed!")
+            self.showMessage(self.threadErrorMessage, QMessageBox.Critical)
+            return
         QMessageBox.information(
             self, "Info", "Export complete",
         )
@@ -1212,24 +1495,23 @@ class MoltenProtMainWindow(QMainWindow):
 
         # step 2: cycle through datasets/models table and apply analysis options
         # read a pandas df representing the table of dataset/model (dm_table)
-        dm_table = self.analysisDialog.ui.analysisTableView.model()._data
+        dm_table = self.analysisDialog.ui.analysisTableView.model().toDataFrame()
 
-        # cycle through available datasets and set analysis options as in analysis_kwargs
-        for i in dm_table.index:
-            # HACK change class type if lumry_eyring model was selected in at least one dataset
-            if dm_table.Model[i] == "lumry_eyring":
-                self.moltenProtFitMultiple.__class__ = core.MoltenProtFitMultipleLE
-
-            analysis_kwargs["model"] = dm_table.Model[i]
+        # HACK change class type if lumry_eyring model was selected in at least one dataset
+        if (dm_table.Model == "lumry_eyring").any():
+            self.moltenProtFitMultiple.__class__ = core.MoltenProtFitMultipleLE
 
+        # set analysis options as in analysis_kwargs once for all datasets with the same model
+        for model, datasets in dm_table.groupby("Model", sort=False)["Dataset"]:
+            analysis_kwargs["model"] = model
             self.moltenProtFitMultiple.SetAnalysisOptions(
-                which=dm_table.Dataset[i], **analysis_kwargs
+                which=list(datasets), **analysis_kwargs
             )
 
         # step 3: prepare the canvas
         self.axisClear()
         self.on_deselectAll()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
         # step 4: run analysis
         QApplication.setOverrideCursor(Qt.WaitCursor)
@@ -1280,7 +1562,7 @@ class MoltenProtMainWindow(QMainWindow):
                     "settings/analysisRunsThresh", self.analysisRunsThresh
                 )
 
-            self.settings.sync()
+            self.settingsSyncTimer.start()
             self.status_text.setText("Data analysis complete.")
             self.mainWindow.actionExport.setVisible(True)
             # adjust subplots
@@ -1408,15 +1690,15 @@ class MoltenProtMainWindow(QMainWindow):
         # clean up the axes after plot settings are changed
         self.axisClear()
         self.on_deselectAll()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     ## \brief This method  creates toolbox dialog.
     #   \todo When toolbox appearence will be fixed, we should set fixed width and height for this dialog.
     def createToolBox(self):
         self.moltenProtToolBox = MoltenProtToolBox(self)
+        curveTypeComboBox = self.moltenProtToolBox.ui.curveTypeComboBox
         self.allItemsInCurveTypeComboBox = [
-            self.moltenProtToolBox.ui.curveTypeComboBox.itemText(i)
-            for i in range(self.moltenProtToolBox.ui.curveTypeComboBox.count())
+            curveTypeComboBox.itemText(i) for i in range(curveTypeComboBox.count())
         ]
         self.createPlotSettings()
         self.getPlotSettings()
@@ -1436,24 +1718,39 @@ class MoltenProtMainWindow(QMainWindow):
 
     ## \brief This method  creates analysis dialog
     def createAnalysisDialog(self):
-        self.analysisDialog = AnalysisDialog(self)
-        self.analysisDialog.ui.buttonBox.accepted.connect(self.acceptAnalysis)
+        self._analysisDialog = AnalysisDialog(self)
+        self._analysisDialog.ui.buttonBox.accepted.connect(self.acceptAnalysis)
+        # set tooltips for dialogs
+        self.setTooltips()
 
-    ## \brief This method creates the following dialogs: Preferences, Analysis and Layout.
+    ## \brief The Analysis dialog, it is created on first access.
+    @property
+    def analysisDialog(self):
+        if self._analysisDialog is None:
+            self.createAnalysisDialog()
+        return self._analysisDialog
+
+    ## \brief The Layout dialog, it is created on first access.
+    @property
+    def layoutDialog(self):
+        if self._layoutDialog is None:
+            self._layoutDialog = LayoutDialog()
+            self.connectButtonsFromLayoutDialog()
+        return self._layoutDialog
+
+    ## \brief The Help dialog, it is created on first access.
+    @property
+    def helpDialog(self):
+        if self._helpDialog is None:
+            self._helpDialog = MoltenProtHelpDialog("index.html")
+        return self._helpDialog
+
+    ## \brief This method creates the Preferences dialog, the other dialogs are created on first use.
+    #   \details The Preferences dialog is needed right away, because it holds the plot settings.
     #   \sa AnalysisDialog, moltenProtToolBox, LayoutDialog and HelpDialog.
     def initDialogs(self):
         self.createToolBox()
         self.createColorMapComboBox()
-        self.createAnalysisDialog()
-
-        # Create layout dialog
-        self.layoutDialog = LayoutDialog()
-        self.connectButtonsFromLayoutDialog()
-        # Create help dialog
-        self.helpDialog = MoltenProtHelpDialog("index.html")
-
-        # set tooltips for dialogs
-        self.setTooltips()
 
     ## \brief This method shows the Analysis Dialog.
     @pyqtSlot()
@@ -1527,6 +1824,10 @@ class MoltenProtMainWindow(QMainWindow):
                 use_threads = False
 
             out_kwargs["n_jobs"] = self.moltenProtToolBox.ui.parallelSpinBox.value()
+            # data output of several datasets is I/O-bound and can be done in threads,
+            # one per dataset; the size follows the GUI thread pool,
+            # where one thread is taken by the ExportWorker itself
+            out_kwargs["num_threads"] = max(1, self.threadpool.maxThreadCount() - 1)
 
             QApplication.setOverrideCursor(Qt.WaitCursor)
 
@@ -1535,18 +1836,23 @@ class MoltenProtMainWindow(QMainWindow):
                     self.moltenProtFitMultiple,
                     **out_kwargs
                 )
+                worker.signals.error.connect(self.threadError)
                 worker.signals.finished.connect(self.threadComplete)
                 worker.signals.progress.connect(self.progressFn)
                 self.threadIsWorking = True
+                self.threadFailed = False
                 # Execute
                 self.threadpool.start(worker)
+                # NOTE the GUI stays responsive, the cursor is restored and the final message is set in threadComplete
+                self.status_text.setText(
+                    "Exporting results to folder {}...".format(filename)
+                )
             else:
                 self.moltenProtFitMultiple.WriteOutputAll(**out_kwargs)
-
-            QApplication.restoreOverrideCursor()
-            self.status_text.setText(
-                "Results exported to folder {}".format(filename)
-            )
+                QApplication.restoreOverrideCursor()
+                self.status_text.setText(
+                    "Results exported to folder {}".format(filename)
+                )
 
 
     def executeThisFn(self, progress_callback):
@@ -1554,9 +1860,10 @@ class MoltenProtMainWindow(QMainWindow):
             print("executeThisFn")
         return "Done."
 
-    def progressFn(self):
+    def progressFn(self, percent):
         if showVersionInformation:
-            print("progressFn")
+            print("progressFn", percent)
+        self.status_text.setText("Exporting results... {}%".format(percent))
 
     ## \brief This SLOT is called when user clicks <b>New</b> button and  runs another instance of MoltenProt GUI application.
     @pyqtSlot()
@@ -1570,7 +1877,11 @@ class MoltenProtMainWindow(QMainWindow):
         font, ok = fontDialog.getFont()
         if ok:
             self.font = font
-            self.settings.setValue("fontSettings/currentFont", self.font.toString())
+            fontString = self.font.toString()
+            if fontString != self.fontSettings.get("currentFont"):
+                self.fontSettings["currentFont"] = fontString
+                self.settings.setValue("fontSettings/currentFont", fontString)
+                self.settingsSyncTimer.start()
             self.setNewFont(self.font)
 
     def setIconSize(self):
@@ -1586,7 +1897,7 @@ class MoltenProtMainWindow(QMainWindow):
         self.setIconSize()
 
     def readFontFromSettings(self):
-        newFontString = self.settings.value("fontSettings/currentFont")
+        newFontString = self.fontSettings.get("currentFont", "")
         newFont = QFont()
         ok = newFont.fromString(newFontString)
         if ok:
@@ -1595,15 +1906,9 @@ class MoltenProtMainWindow(QMainWindow):
             print("Failed to set font", newFont, cfFilename, currentframe().f_lineno)
 
     def setApplicationMenuFont(self):
-        QtWidgets.QApplication.setFont(self.font, "QFileDialog")
-        QtWidgets.QApplication.setFont(self.font, "QPushButton")
-        QtWidgets.QApplication.setFont(self.font, "QAction")
-        QtWidgets.QApplication.setFont(self.font, "QFontDialog")
-        QtWidgets.QApplication.setFont(self.font, "QToolBar")
-        QtWidgets.QApplication.setFont(self.font, "QMainWindow")
-        QtWidgets.QApplication.setFont(self.font, "QWidget")
-        QtWidgets.QApplication.setFont(self.font, "QTextEdit")
-        QtWidgets.QApplication.setFont(self.font, "QDialogButtonBox")
+        # NOTE the application default font is inherited by all widget classes,
+        # setting it once avoids a style update of all widgets per class
+        QtWidgets.QApplication.setFont(self.font)
         if self.canvas != None:
             self.canvas.setFont(self.font)
 
@@ -1681,16 +1986,22 @@ class MoltenProtMainWindow(QMainWindow):
             # self.analysisDialog.ui.analysisModeComboBox.insertItems(1,  analysisModeComboBoxItemsList)
 
             currentDataSetsList = list(self.moltenProtFitMultiple.GetDatasets())
-            data = pd.DataFrame(columns=("Dataset", "Model"))
-            for i in range(len(currentDataSetsList)):
-                data.loc[i] = [currentDataSetsList[i], defaultModel]
+            data = pd.DataFrame(
+                {
+                    "Dataset": currentDataSetsList,
+                    "Model": [defaultModel] * len(currentDataSetsList),
+                }
+            )
 
-        tableModel = TableModel(data)
-        self.analysisDialog.ui.analysisTableView.setModel(tableModel)
-        comboDelegate = ComboDelegate(self, analysisModeComboBoxItemsList)
-        self.analysisDialog.ui.analysisTableView.setItemDelegateForColumn(
-            1, comboDelegate
-        )
+        analysisTableView = self.analysisDialog.ui.analysisTableView
+        tableModel = analysisTableView.model()
+        if isinstance(tableModel, TableModel):
+            # re-use the model and the delegate from the previous file
+            tableModel.setTableData(data)
+        else:
+            analysisTableView.setModel(TableModel(data, parent=analysisTableView))
+            comboDelegate = ComboDelegate(self, analysisModeComboBoxItemsList)
+            analysisTableView.setItemDelegateForColumn(1, comboDelegate)
 
     def showHideSelectDeselectAll(self, show):
         self.mainWindow.actionSelectAll.setVisible(show)
@@ -1721,28 +2032,31 @@ class MoltenProtMainWindow(QMainWindow):
         if fileInfo.isReadable():
             self.lastDir = fileInfo.canonicalPath()
             self.settings.setValue("settings/lastDir", self.lastDir)
-            self.settings.sync()
+            self.settingsSyncTimer.start()
             self.resetButtons()
             if self.sortScoreCombBoxAction != None:  # TODO is this really needed here?
                 self.sortScoreCombBoxAction.setVisible(False)
             self.dataProcessed = False
 
             if self.fileLoaded == False:
-                # print("self.createMatplotlibContextMenu() has been commented.")
                 pass
             else:
                 # print("Clear previous data", cfFilename, currentframe().f_lineno)
                 self.on_deselectAll()
                 self.axisClear()
                 self.mainWindow.actionExport.setVisible(False)
+            # the method to process the file is selected by its extension
+            fileLoaders = {
+                ".csv": self.processCsv,
+                ".json": self.processJSON,
+                ".xlsx": self.processXLSX,
+            }
+            extension = os.path.splitext(filename)[1].lower()
             QApplication.setOverrideCursor(Qt.WaitCursor)
             try:
-                if filename.endswith(".csv"):
-                    self.processCsv(filename)
-                elif filename.endswith(".json"):
-                    self.processJSON(filename)
-                elif filename.endswith(".xlsx"):
-                    self.processXLSX(filename)
+                if extension not in fileLoaders:
+                    raise ValueError("Unsupported file type '{}'".format(extension))
+                fileLoaders[extension](filename)
                 self.status_text.setText("Loaded " + filename)
                 self.fileLoaded = True
             except ValueError as e:
@@ -1765,7 +2079,7 @@ class MoltenProtMainWindow(QMainWindow):
 
                 # Overwrite default analysis settings if input file was JSON and was processed
                 # for any other file type reset to defaults
-                if filename.endswith(".json"):
+                if extension == ".json":
                     self.setAnalysisOptionsFromJSON()
                 else:
                     ###TODO restore default analysis settings
@@ -1784,10 +2098,6 @@ class MoltenProtMainWindow(QMainWindow):
                     self.moltenProtToolBox.ui.colormapForPlotLabel.show()
                     self.populateAndShowSortScoreComboBox()
                     self.setButtonsStyleAccordingToNormalizedData()
-                    self.sortScoreComboBox.clear()
-                    self.sortScoreComboBox.insertItems(
-                        1, self.moltenProtFit.getResultsColumns()
-                    )
                 else:
                     self.moltenProtToolBox.ui.colormapForPlotComboBox.hide()
                     self.moltenProtToolBox.ui.colormapForPlotLabel.hide()
@@ -1826,6 +2136,7 @@ class MoltenProtMainWindow(QMainWindow):
                 sep=self.sepValue,
                 dec=self.decValue,
                 scan_rate=self.scanRateValue,
+                progress_callback=self.readProgressFn,
             )
         else:
             self.moltenProtFitMultiple = core.parse_plain_csv(
@@ -1833,11 +2144,19 @@ class MoltenProtMainWindow(QMainWindow):
                 sep=self.sepValue,
                 dec=self.decValue,
                 scan_rate=self.scanRateValue,
+                progress_callback=self.readProgressFn,
             )
         available_datasets = self.moltenProtFitMultiple.GetDatasets()
         self.moltenProtFit = self.moltenProtFitMultiple.datasets[available_datasets[0]]
         self.populateDatasetComboBox(available_datasets)
 
+    ## \brief This method reports the progress of reading an input file and keeps the GUI repainting.
+    #   \param percent - share of the file read so far.
+    def readProgressFn(self, percent):
+        self.status_text.setText("Reading input file... {}%".format(percent))
+        # NOTE user input is excluded to avoid re-entering on_actionOpenTriggered
+        QApplication.processEvents(QEventLoop.ExcludeUserInputEvents)
+
     ## \brief This method is used to process JSON file named filename
     #   \param filename - JSON file to process.
     #   \todo Debug print is used here.
@@ -1886,7 +2205,10 @@ class MoltenProtMainWindow(QMainWindow):
         refolding = self.moltenProtToolBox.ui.refoldingCheckBox.isChecked()
         is_raw = self.moltenProtToolBox.ui.rawCheckBox.isChecked()
         self.moltenProtFitMultiple = core.parse_prom_xlsx(
-            filename, raw=is_raw, refold=refolding
+            filename,
+            raw=is_raw,
+            refold=refolding,
+            progress_callback=self.readProgressFn,
         )
         available_datasets = self.moltenProtFitMultiple.GetDatasets()
         self.moltenProtFit = self.moltenProtFitMultiple.datasets[available_datasets[0]]
@@ -1950,32 +2272,34 @@ class MoltenProtMainWindow(QMainWindow):
         """
         msg.exec_()
 
-    def __layout2widget(self, input_series):
+    def __layout2widget(self, layout):
         """
-        Helper function to convert a single row of layout DataFrame into
-        a QTableWidget entry
+        Helper function to convert the layout DataFrame into QTableWidget entries
         NOTE to avoid Overflow errors, the respective DataFrame must have np.nan etc changed to 'None' string
         """
-        # Convert alphanumeric index to numeric indices:
-        # A1 -> (0, 0)
-        # H12 -> (7, 11)
-        row = "ABCDEFGH".index(input_series.name[0])
-        column = int(input_series.name[1:]) - 1
-
-        if input_series["Condition"] != "None":
-            item_value = input_series["Condition"]
-        else:
-            # default value for layout is ""
-            item_value = ""
-        self.layoutDialog.ui.tableWidget.setItem(
-            row, column, QTableWidgetItem(str(item_value))
-        )
+        tableWidget = self.layoutDialog.ui.tableWidget
+        # populate the whole table without intermediate repaints or itemChanged signals
+        tableWidget.setUpdatesEnabled(False)
+        tableWidget.blockSignals(True)
+        try:
+            for well, condition in zip(
+                layout.index.to_numpy(), layout["Condition"].to_numpy()
+            ):
+                # default value for layout is ""
+                item_value = "" if condition == "None" else str(condition)
+                # convert alphanumeric index to numeric indices
+                row, column = core.well_positions[well]
+                tableWidget.setItem(row, column, QTableWidgetItem(item_value))
+        finally:
+            tableWidget.blockSignals(False)
+            tableWidget.setUpdatesEnabled(True)
 
     ## \brief This method shows the layout from MoltenProtFitMultiple.layout in QTableWidget in LayoutDialog.
     #   \sa LayoutDialog
+    @pyqtSlot()
     def editLayout(self):
         layout = self.moltenProtFitMultiple.layout.fillna("None")
-        layout.apply(self.__layout2widget, axis=1)
+        self.__layout2widget(layout)
         self.layoutDialog.ui.tableWidget.resizeColumnsToContents()
         self.layoutDialog.ui.tableWidget.alternatingRowColors()
         self.layoutDialog.show()
@@ -1999,7 +2323,7 @@ class MoltenProtMainWindow(QMainWindow):
                 layout = pd.read_csv(
                     layoutFileName, index_col="ID", encoding="utf_8"
                 ).fillna("None")
-                layout.apply(self.__layout2widget, axis=1)
+                self.__layout2widget(layout)
                 self.layoutDialog.ui.tableWidget.resizeColumnsToContents()
                 self.layoutDialog.ui.tableWidget.alternatingRowColors()
                 self.layoutDialog.show()
@@ -2015,24 +2339,29 @@ class MoltenProtMainWindow(QMainWindow):
         # print self.layoutDialog.ui.tableWidget.rowCount()
         # print self.layoutDialog.ui.tableWidget.columnCount()
         # edit the layout of MPFM instance
-        for column in range(0, 12):
-            for row in range(0, 8):
-                item = self.layoutDialog.ui.tableWidget.item(row, column)
-                alphanumeric_index = "ABCDEFGH"[row] + str(column + 1)
-
-                # NOTE the layout is always 12x8, however, the data may have less samples
-                # do not assign layout to the data that is not present in plate_raw
-                if self.moltenProtFit.testWellID(
-                    alphanumeric_index, ignore_results=True
-                ):
-                    if item.text() != "":
-                        self.moltenProtFitMultiple.layout.loc[
-                            alphanumeric_index, "Condition"
-                        ] = item.text()
-                    else:
-                        self.moltenProtFitMultiple.layout.loc[
-                            alphanumeric_index, "Condition"
-                        ] = None
+        tableWidget = self.layoutDialog.ui.tableWidget
+        # NOTE the layout is always 12x8, however, the data may have less samples
+        # do not assign layout to the data that is not present in plate_raw
+        wells = [
+            well
+            for well in core.well_positions
+            if self.moltenProtFit.testWellID(well, ignore_results=True)
+        ]
+        conditions = np.empty(len(wells), dtype=object)
+        for i, well in enumerate(wells):
+            text = tableWidget.item(*core.well_positions[well]).text()
+            conditions[i] = text if text != "" else None
+
+        # write all conditions at once
+        layout = self.moltenProtFitMultiple.layout
+        # a layout from file may lack some wells, they are appended as new rows
+        missing = [well for well in wells if well not in layout.index]
+        if missing:
+            layout = layout.reindex(
+                layout.index.append(pd.Index(missing, name=layout.index.name))
+            )
+        layout.loc[wells, "Condition"] = conditions
+        self.moltenProtFitMultiple.layout = layout
         # apply edited layout to all datasets inside MPFM
         self.moltenProtFitMultiple.UpdateLayout()
 
@@ -2046,11 +2375,13 @@ class MoltenProtMainWindow(QMainWindow):
 
     ## \brief This SLOT (in Qt terms) is called when user changes heatmap table name.
     #   \sa createComboBoxesForActionToolBar
-    @pyqtSlot()
-    def on_changeInputTable(self):
+    #   \param inputTableName - the new dataset name as sent by currentTextChanged signal; if None, it is read from datasetComboBox
+    @pyqtSlot(str)
+    def on_changeInputTable(self, inputTableName=None):
         if self.moltenProtFit != None:
             self.on_deselectAll()
-            inputTableName = self.datasetComboBox.currentText()
+            if inputTableName is None:
+                inputTableName = self.datasetComboBox.currentText()
             if inputTableName in self.moltenProtFitMultiple.GetDatasets():
                 inputTableNameIsValid = True
                 self.moltenProtFit = self.moltenProtFitMultiple.datasets[inputTableName]
@@ -2077,49 +2408,67 @@ class MoltenProtMainWindow(QMainWindow):
             if showVersionInformation:
                 print("self.moltenProtFit == None", currentframe().f_lineno, cfFilename)
 
-    def __genTooltip(self, input_series, heatMapName):
+    def setButtonsStyleAccordingToNormalizedData(self, heatMapName=None):
         """
-        Helper function that converts a single row of MPF.plate_results to a tooltip string
-        """
-
-        output = "{} {} {} = {}".format(
-            input_series.name,
-            input_series.Condition,
-            heatMapName,
-            round(input_series[heatMapName], 2,),
-        )
-        return output
+        Request new colors and tooltips for the buttons based on a column of plate_results
 
-    def setButtonsStyleAccordingToNormalizedData(self):
+        Parameters
+        ----------
+        heatMapName
+            the column to use (as sent by currentTextChanged signal); if None, it is read from sortScoreComboBox
+        """
         if self.moltenProtFit != None:
-            heatMapName = self.sortScoreComboBox.currentText()
+            if heatMapName is None:
+                heatMapName = self.sortScoreComboBox.currentText()
             # NOTE during startup the values of the drop-down list
             # can be empty which would result in a crash
             if heatMapName in self.moltenProtFit.getResultsColumns():
-                # normalize the data in selected column and create colors (rgba tuples) with the current colormap
-                cmap = cm.get_cmap(self.currentColorMap)
-                button_colors = core.normalize(
-                    self.moltenProtFit.plate_results[heatMapName]
-                ).apply(cmap)
-                # update the Color column in the Buttons df with existing colors
-                # NOTE buttons without a color will have None
-                button_colors.name = "Color"
-                self.buttons.Color = None  # resets all colors to None
-                self.buttons.update(button_colors)
-
-                # generate tooltips
-                self.buttons.Tooltip = None  # reset all tooltips
-                tooltips = self.moltenProtFit.plate_results.apply(
-                    self.__genTooltip, heatMapName=heatMapName, axis=1
+                # colors and tooltips are computed in a worker thread, see applyButtonsStyle
+                # NOTE only the latest request is applied, older results are discarded
+                self.buttonsStyleRequest += 1
+                worker = HeatmapStyleWorker(
+                    self.moltenProtFit.plate_results[["Condition", heatMapName]].copy(),
+                    heatMapName,
+                    self.currentColorMap,
+                    self.buttonsStyleRequest,
                 )
-                tooltips.name = "Tooltip"
-                self.buttons.update(tooltips)
-
-                # apply changes to the buttons
-                self.buttons.apply(self.__setOneButtonStyle, axis=1)
+                worker.signals.result.connect(self.applyButtonsStyle)
+                self.threadpool.start(worker)
         else:
             print("self.moltenProtFit == None", currentframe().f_lineno, cfFilename)
 
+    ## \brief This SLOT applies the colors and tooltips computed by HeatmapStyleWorker to the buttons.
+    #   \param result - tuple (request, colors, tooltips) emitted by the worker.
+    @pyqtSlot(object)
+    def applyButtonsStyle(self, result):
+        request, button_colors, tooltips = result
+        if request != self.buttonsStyleRequest:
+            # a newer request is pending
+            return
+        # set colors and tooltips and apply them to the buttons in one pass
+        # NOTE buttons without a color will have None
+        recolored = False
+        for button_id, state in self.buttons.items():
+            state.color = button_colors.get(button_id)
+            state.tooltip = tooltips.get(button_id)
+            self.__setOneButtonStyle(state)
+            # curves plotted before the colors arrived still have the curve color (or the previous colormap)
+            if (
+                self.curveHeatmapColorCheckBoxIsChecked
+                and state.lines is not None
+                and state.color is not None
+            ):
+                # NOTE the "n/a" text of the derivative axes is not a curve and keeps its color
+                for line in state.lines:
+                    if isinstance(line, Line2D):
+                        line.set_color(state.color)
+                recolored = True
+        if recolored:
+            # the cached canvas image and the legend still show the old colors
+            self.canvasBackground = None
+            self.updateAxes()
+            self.canvas.draw_idle()
+
     def setAllButtons(self, action, flag):
         """
         Applies a certain boolean action to all buttons in self.buttons
@@ -2131,18 +2480,26 @@ class MoltenProtMainWindow(QMainWindow):
         flag (bool) - true or false for action
         
         """
-        for button_id in core.alphanumeric_index:
-            if action == "check":
-                # TODO add skipping of gray buttons
-                self.buttons.at[button_id, "Button"].setChecked(flag)
-            elif action == "enable":
-                self.buttons.at[button_id, "Button"].setEnabled(flag)
-            else:
-                raise ValueError("Unknown action: {}".format(action))
+        if action == "check":
+            # TODO add skipping of gray buttons
+            method = QPushButton.setChecked
+        elif action == "enable":
+            method = QPushButton.setEnabled
+        else:
+            raise ValueError("Unknown action: {}".format(action))
+        # repaint the button array only once
+        self.dockButtonsFrame.setUpdatesEnabled(False)
+        for state in self.buttons.values():
+            method(state.button, flag)
+        self.dockButtonsFrame.setUpdatesEnabled(True)
 
     def resetButtons(self):
-        for button_id in core.alphanumeric_index:
-            self.buttons.at[button_id, "Button"].setStyleSheet(self.buttonStyleString)
+        # discard the results of heatmap style workers that are still running
+        self.buttonsStyleRequest += 1
+        self.dockButtonsFrame.setUpdatesEnabled(False)
+        for state in self.buttons.values():
+            state.button.setStyleSheet(self.buttonStyleString)
+        self.dockButtonsFrame.setUpdatesEnabled(True)
 
     @pyqtSlot()
     def on_selectAll(self):
@@ -2150,15 +2507,24 @@ class MoltenProtMainWindow(QMainWindow):
         Cycles through all buttons, checks valid buttons and updates plots and table
         """
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        for button_id in self.buttons.index:
-            if self.moltenProtFit.testWellID(button_id):
-                self.buttons.at[button_id, "Button"].setChecked(True)
-                self.updateTable(button_id)
-                self.plotFigAny(button_id)
-                self.currentCurveColor = next(self.curveColorCycler)["color"]
+        validButtons = [
+            (button_id, state.button)
+            for button_id, state in self.buttons.items()
+            if self.moltenProtFit.testWellID(button_id)
+        ]
+        # the first color is the current one, the rest is taken from the cycler
+        colors = [self.currentCurveColor] + list(
+            islice(self.curveColorCycler, len(validButtons))
+        )
+        self.addTableRows([button_id for button_id, button in validButtons])
+        for (button_id, button), color in zip(validButtons, colors):
+            button.setChecked(True)
+            # NOTE axes limits and legend are updated only once after all curves are added
+            self.plotFigAny(button_id, color=color, update_axes=False)
+        self.updateAxes()
         # re-initialize colors
         self.resetColorCycler()
-        self.canvas.draw()
+        self.canvas.draw_idle()
         QApplication.restoreOverrideCursor()
 
     @pyqtSlot()
@@ -2167,12 +2533,13 @@ class MoltenProtMainWindow(QMainWindow):
         self.axisClear()
         self.setAllButtons("check", False)
         self.resetTable()
-        for button_id in core.alphanumeric_index:
-            # NOTE draw_canvas=False makes the removal faster
-            self.removeButtonLine2D(button_id, draw_canvas=False)
+        # NOTE axisClear has already removed all curves from the axes,
+        # so they only have to be deregistered (see removeButtonLine2D)
+        for state in self.buttons.values():
+            state.lines = None
         # re-initialize colors
         self.resetColorCycler()
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
     @pyqtSlot()
     def on_show(self, button_id):
@@ -2200,38 +2567,41 @@ class MoltenProtMainWindow(QMainWindow):
         ------------
         * if a button that was already clicked is unclicked, the color cycle doesn't go back. This means that upon unclicking the color used in the line of the unclicked button will not become the current color. Visually, it is somewhat inconsistent, however, one would need to somehow track the previous color and check if the button was previously clicked or not. For instance, one can keep two copies of curve cyclers, where one is one step ahead of the other
         """
-        btn = self.buttons.at[button_id, "Button"]
+        btn = self.buttons[button_id].button
         if btn.isChecked():
             self.updateTable(button_id)
             # line has already been already plotted by the hover function, but need to change the color for plotting
-            self.currentCurveColor = next(self.curveColorCycler)["color"]
+            self.currentCurveColor = next(self.curveColorCycler)
         else:
             self.removeButtonLine2D(button_id)
-            # remove respective entry from the table - scan all rows of the first column to find the button_id
-            for row in range(self.tableWidget.rowCount()):
-                # id in the table
-                item = self.tableWidget.item(row, 0)
-                if item is not None:
-                    table_id = self.tableWidget.item(row, 0).text()
-                    if table_id == button_id:
-                        self.tableWidget.removeRow(row)
-                        # only one table_id should exist, stop the cycle when found
-                        break
-        self.canvas.draw()
+            # the cursor is still on the button, let the next hover event plot its curves again
+            if button_id == self.lastHoverId:
+                self.lastHoverId = None
+            # remove respective entry from the table
+            # NOTE the ID item is tracked instead of the row number, because the user can re-sort the table
+            item = self.tableItemsById.pop(button_id, None)
+            if item is not None:
+                self.tableWidget.removeRow(item.row())
+        self.canvas.draw_idle()
 
     def removeButtonLine2D(self, button_id, draw_canvas=True):
         """
         Removes lines associated with a button
         """
-        lines = self.buttons.at[button_id, "Line2D"]
-        if lines is not np.nan:
+        state = self.buttons[button_id]
+        lines = state.lines
+        # deregisters the line list
+        state.lines = None
+        if lines is not None:
+            # the cached canvas image may contain the lines, it will be renewed by the next full draw
+            self.canvasBackground = None
             for line in lines:
                 line.remove()
-            self.buttons.at[button_id, "Line2D"] = np.nan  # deregisters the line list
         if draw_canvas:
             # NOTE this updates the plot and may be a slow step
             # if this step is omitted then the changes to the plot will not be updated on the screen
-            self.canvas.draw()
+            # draw_idle only schedules the repaint, so that several requests (e.g. fast hovering) are merged
+            self.canvas.draw_idle()
 
     def resetTable(self):
         """
@@ -2239,6 +2609,19 @@ class MoltenProtMainWindow(QMainWindow):
         """
         self.tableWidget.clearContents()
         self.tableWidget.setRowCount(0)
+        self.tableItemsById.clear()
+
+    def initializeTable(self):
+        """
+        Configure the results table, this is done only once before the table is shown for the first time
+        """
+        tableWidget = self.tableWidget
+        header = tableWidget.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        tableWidget.setSortingEnabled(True)
+        tableWidget.setAlternatingRowColors(True)
+        tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableInitialized = True
 
     def updateTable(self, button_id):
         """
@@ -2247,51 +2630,77 @@ class MoltenProtMainWindow(QMainWindow):
         Notes
         -----
         * Table widget will be made visible when the method is called for the first time
+        * see addTableRows for adding many samples at once
+        """
+        self.addTableRows([button_id])
+
+    def addTableRows(self, button_ids):
+        """
+        Add table rows for several samples, the table is updated and repainted only once
+
+        Parameters
+        ----------
+        button_ids
+            a list of alphanumeric codes of the samples
         """
 
         if self.dataProcessed:
             plateResults = self.moltenProtFit.plate_results
             # create a dictionary to map column ID's in GUI to column names from getResultsColumns
             column_labels = ["ID", "Condition"] + self.moltenProtFit.getResultsColumns()
-            column_dict = {}
-            for i in range(len(column_labels)):
-                column_dict[i] = column_labels[i]
-            # set the number of columns in the table
-            self.tableWidget.setColumnCount(len(column_dict))
+            column_dict = dict(enumerate(column_labels))
+            # set the number and titles of the columns only when they change (e.g. new dataset or model)
+            if column_labels != self.tableColumnLabels:
+                self.tableWidget.setColumnCount(len(column_labels))
+                self.tableWidget.setHorizontalHeaderLabels(column_labels)
+                self.tableColumnLabels = column_labels
 
             if self.tableWidget.isVisible() == False:
+                if not self.tableInitialized:
+                    self.initializeTable()
                 self.tableWidget.show()
                 self.tableDockWidget.show()
 
             # temporarily disable sorting to allow proper insertion of new rows (see QTableWidget docs)
             self.tableWidget.setSortingEnabled(False)
+            self.tableWidget.setUpdatesEnabled(False)
+            self.tableWidget.blockSignals(True)
 
-            rowPosition = self.tableWidget.rowCount()
-            self.tableWidget.insertRow(rowPosition)
-            for column_pos, column_name in column_dict.items():
-                if column_name == "ID":
-                    table_string = button_id
-                elif column_name == "Condition":
-                    table_string = plateResults.loc[button_id, column_name]
-                    if table_string is np.nan:
-                        # NOTE prevents QTableWidgetItem Overflow error
-                        table_string = "n/a"
-                    else:
-                        table_string = str(table_string)
-                elif column_name == "S":
-                    # NOTE for S formatting to two last decimals is not always working
-                    table_string = str(plateResults.loc[button_id, column_name])
-                else:
-                    table_string = "{:10.2f}".format(
-                        plateResults.loc[button_id, column_name]
-                    )
-                item = QTableWidgetItem(table_string)
-                item.setTextAlignment(Qt.AlignCenter)
-                self.tableWidget.setItem(rowPosition, column_pos, item)
-            # set table widget titles accordingly
-            self.tableWidget.setHorizontalHeaderLabels(column_labels)
-            # restore sorting functionality
-            self.tableWidget.setSortingEnabled(True)
+            # NOTE the numbers are padded to a fixed width on purpose: the table is sorted by item text,
+            # and padding makes the text order follow the numeric order
+            formatNumber = "{:10.2f}".format
+            try:
+                firstRow = self.tableWidget.rowCount()
+                self.tableWidget.setRowCount(firstRow + len(button_ids))
+                for rowPosition, button_id in enumerate(button_ids, start=firstRow):
+                    # fetch all results of the sample at once
+                    resultsRow = plateResults.loc[button_id]
+                    for column_pos, column_name in column_dict.items():
+                        if column_name == "ID":
+                            table_string = button_id
+                        elif column_name == "Condition":
+                            table_string = resultsRow[column_name]
+                            if pd.isna(table_string):
+                                # NOTE prevents QTableWidgetItem Overflow error
+                                table_string = "n/a"
+                            else:
+                                table_string = str(table_string)
+                        elif column_name == "S":
+                            # NOTE for S formatting to two last decimals is not always working
+                            table_string = str(resultsRow[column_name])
+                        else:
+                            table_string = formatNumber(resultsRow[column_name])
+                        # the prototype already has the centered alignment
+                        item = self.tableItemPrototype.clone()
+                        item.setText(table_string)
+                        self.tableWidget.setItem(rowPosition, column_pos, item)
+                        if column_name == "ID":
+                            self.tableItemsById[button_id] = item
+            finally:
+                # restore signals, painting and sorting functionality
+                self.tableWidget.blockSignals(False)
+                self.tableWidget.setUpdatesEnabled(True)
+                self.tableWidget.setSortingEnabled(True)
         else:
             # TODO can use this section to show sample information before analysis
             # print("Warning: cannot create table because data is not processed")
@@ -2311,58 +2720,45 @@ class MoltenProtMainWindow(QMainWindow):
         This is not equivalent to self.fig.clear, which would remove everything from the plot window
         """
         # NOTE the very last ax is reserved for legend and nothing should be cleared here
+        self.canvasBackground = None
         self.axes.clear()
         self.axes.grid(True)
-        if self.axesDerivative != None:
-            self.axesDerivative.clear()
-            self.axesDerivative.grid(True)
+        # NOTE the derivative subplot is also cleared when hidden, so that it shows no stale curves later
+        self.derivativeSubplot.clear()
+        self.derivativeSubplot.grid(True)
         if draw_canvas:
-            self.canvas.draw()
+            self.canvas.draw_idle()
 
-    def __setOneButtonStyle(self, input_series):
+    def __setOneButtonStyle(self, state):
         """
         Helper function that applies a color and state to one button
         To be used in setButtonsStyle/setButtonsStyleAccordingToNormalizedData
+
+        Parameters
+        ----------
+        state : ButtonState
         """
-        button = input_series["Button"]
-        color = input_series["Color"]
-        tooltip = input_series["Tooltip"]
-        if color is not None:
-            styleString = (
-                "QPushButton {  border-width: 2px; border-color: white; background-color: "
-                + matplotlib.colors.to_hex(color, keep_alpha=False)
-                + "} QPushButton:checked { border-color:  black; border-style: inset;}"
-            )
-            enabled = True
-        else:
-            styleString = "QPushButton {  border-width: 2px; border-color: white; background-color: gray } QPushButton:checked { border-color:  black; border-style: inset;}"
-            enabled = False
-        button.setEnabled(enabled)
-        button.setStyleSheet(styleString)
+        button = state.button
+        color = state.color
+        tooltip = state.tooltip
+        # NOTE only buttons with a color (i.e. with results) are enabled
+        button.setEnabled(color is not None)
+        button.setStyleSheet(heatmapButtonStyle(color))
         if tooltip is not None:
             button.setToolTip(tooltip)
 
     def createButtonArray(self, hbox):
         ## \brief self.buttons attribute contains all information related to samples selected in the GUI heatmap and their plots
-        # index is alphanumeric ID's (similar to mp.MoltenProtFit.plate_results), but columns contain the info on the state of the GUI:
-        # Visible (bool) - whether the button should be displayed at all - can be fetched from the button object
-        # Selected (bool) - whether the user clicked on the button - can be fetched from the button object
-        # Color (str) - matplotlib-compatible color for the curve
-        # Button - reference to the respective GUI button
-        # Tooltip - information displayed when mouse is over a button
-        # Line2D - reference to the matplotlib object of the experimental line; if None, then the curve was not plotted!
-        # LineColor - the color used for the line (e.g. from colorsafe list, or the same color as the button)
-        self.buttons = pd.DataFrame(
-            index=core.alphanumeric_index,
-            columns=("Button", "Color", "Tooltip", "Line2D", "LineColor",),
-        )
-        self.buttons.index.name = "ID"
+        # keys are alphanumeric ID's (similar to mp.MoltenProtFit.plate_results) in the order of core.alphanumeric_index,
+        # values are ButtonState objects with the state of the GUI (see ButtonState)
+        # NOTE whether the button is visible or selected can be fetched from the button object
+        buttonStates = {}
 
         # constants for the button generation
         buttonSize = 40
         letters = ["A", "B", "C", "D", "E", "F", "G", "H"]
 
-        # populate the buttons DataFrame with actual buttons
+        # create the actual buttons
         for j in range(self.colsCount):
             right_vbox = QVBoxLayout()
             for i in range(self.rowsCount):
@@ -2380,19 +2776,23 @@ class MoltenProtMainWindow(QMainWindow):
                 # borrowed [here](https://eli.thegreenplace.net/2011/04/25/passing-extra-arguments-to-pyqt-slot)
                 button.clicked.connect(partial(self.on_show, button_name))
                 right_vbox.addWidget(button)
-                # add button to buttons df
-                self.buttons.at[button_name, "Button"] = button
+                buttonStates[button_name] = ButtonState(button)
             right_vbox.addStretch(1)
             hbox.addLayout(right_vbox)
         hbox.addStretch(1)
+        # the buttons are created column-wise, but ordered row-wise (A1, A2, ...)
+        self.buttons = {
+            button_id: buttonStates[button_id] for button_id in core.alphanumeric_index
+        }
 
     def showOnlyValidButtons(self):
         # shows a button only if it is found in the raw data
-        for button_id in core.alphanumeric_index:
-            if self.moltenProtFit.testWellID(button_id, ignore_results=True):
-                self.buttons.at[button_id, "Button"].show()
-            else:
-                self.buttons.at[button_id, "Button"].hide()
+        # NOTE same as testWellID(button_id, ignore_results=True), but with a single set of all recorded wells
+        validIds = set(self.moltenProtFit.plate_raw.columns)
+        self.dockButtonsFrame.setUpdatesEnabled(False)
+        for button_id, state in self.buttons.items():
+            state.button.setVisible(button_id in validIds)
+        self.dockButtonsFrame.setUpdatesEnabled(True)
 
     def actionsSetVisible(self, show):
         # show/hide buttons that require a dataset to be loaded
@@ -2420,27 +2820,124 @@ class MoltenProtMainWindow(QMainWindow):
         Event filter to handle additional button events (clicks are handled via method on_show)
         """
         button_id = object.objectName()  # get button ID
-        if event.type() == QEvent.HoverMove or event.type()==QEvent.Enter:
+        eventType = event.type()
+        if eventType == QEvent.HoverMove or eventType == QEvent.Enter:
+            # HoverMove is sent continuously while the cursor stays on the same button
+            if button_id == self.lastHoverId:
+                return False
+            self.lastHoverId = button_id
             # NOTE handling non-existing/gray samples is in method plotFigAny
             if self.fileLoaded:
-                # plot new lines only if not registered
-                if self.buttons.at[button_id, "Line2D"] is np.nan:
-                    self.plotFigAny(button_id)
-                    self.canvas.draw()
+                # plot new lines only if not registered (lines is None)
+                if self.buttons[button_id].lines is None:
+                    self.hoverPlotTimer.start()
             # TODO highlight the curve if it has already been selected
             if object.isChecked():
                 pass
 
-        if event.type() == QEvent.HoverLeave or event.type()==QEvent.Leave:
+        if eventType == QEvent.HoverLeave or eventType == QEvent.Leave:
+            if button_id == self.lastHoverId:
+                # the curves of this button have not been plotted yet and are not needed anymore
+                self.hoverPlotTimer.stop()
+                self.lastHoverId = None
             if not object.isChecked():
-                if self.buttons.at[button_id, "Line2D"] is not np.nan:
+                if self.buttons[button_id].lines is not None:
                     # NOTE when draw_canvas is false, then the curve will be only removed when a new one is plotted, this makes hovering more smooth, however, creates "undeletable" plots
                     self.removeButtonLine2D(button_id)
 
         return False
 
+    @pyqtSlot()
+    def plotHoveredButton(self):
+        """
+        Plot the curves of the currently hovered button (if not plotted yet), see eventFilter
+        """
+        if self.lastHoverId is not None and self.fileLoaded:
+            state = self.buttons[self.lastHoverId]
+            if state.lines is None:
+                self.plotFigAny(self.lastHoverId)
+                if not self.blitArtists(state.lines):
+                    self.canvas.draw_idle()
+
+    def axesLimits(self):
+        """
+        Return the x and y limits of the visible plot axes (main and derivative)
+        """
+        return [
+            ax.get_xlim() + ax.get_ylim()
+            for ax in (self.axes, self.axesDerivative)
+            if ax is not None
+        ]
+
+    def on_canvasDrawn(self, event):
+        """
+        Cache the image of the canvas after every full draw, see blitArtists
+        """
+        self.canvasBackground = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.canvasBackgroundLimits = self.axesLimits()
+
+    def blitArtists(self, artists):
+        """
+        Paint newly plotted artists over the cached image of the canvas instead of redrawing the whole figure
+
+        NOTE this is only possible when the axes limits are the same as in the cached image
+        and there is no legend (which changes with every new curve)
+
+        Parameters
+        ----------
+        artists
+            a list of matplotlib artists that were added after the last full draw
+
+        Returns
+        -------
+        True if the artists were painted, otherwise the canvas must be redrawn
+        """
+        if (
+            self.canvasBackground is None
+            or self.axesLegend is not None
+            or self.axesLimits() != self.canvasBackgroundLimits
+        ):
+            return False
+        self.canvas.restore_region(self.canvasBackground)
+        for artist in artists:
+            artist.axes.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+        return True
+
+    def getBaselines(self, wellID):
+        """
+        Return the temperature range of the current dataset and the values of
+        pre- and post-transition baselines of a well at its ends
+
+        The baselines of all wells are computed at once and cached until
+        the fit results of the current dataset change
+
+        Parameters
+        ----------
+        wellID
+            a string with the alphanumeric well id (must have fit results)
+
+        Returns
+        -------
+        tuple of three arrays: (xmin, xmax) and the respective values of the baselines
+        """
+        results = self.moltenProtFit.plate_results
+        if self.baselineCacheSource is not results:
+            xmin_xmax = np.array(
+                (self.moltenProtFit.plate.index.min(), self.moltenProtFit.plate.index.max())
+            )
+            self.baselineCache = {
+                well: (xmin_xmax, kN * xmin_xmax + bN, kU * xmin_xmax + bU)
+                for well, (kN, bN, kU, bU) in zip(
+                    results.index,
+                    results[["kN_fit", "bN_fit", "kU_fit", "bU_fit"]].to_numpy(),
+                )
+            }
+            self.baselineCacheSource = results
+        return self.baselineCache[wellID]
+
     ## \brief This method plots a curve from a single well on the axes using the curve* set of settings and the processing status (raw or after analysis)
-    def plotFigAny(self, wellID):
+    def plotFigAny(self, wellID, color=None, update_axes=True):
         """
         Plot a curve from a single well on the axes
         using the curve* set of settings and the processing status (raw or after analysis)
@@ -2449,19 +2946,23 @@ class MoltenProtMainWindow(QMainWindow):
         ----------
         wellID
             a string with the alphanumeric well id; non-existent ID's are also handled
+        color
+            the color for the curves (default: self.currentCurveColor); ignored if heatmap colors are used
+        update_axes
+            update the axes labels, limits and the legend (see updateAxes);
+            can be skipped when many curves are plotted at once
         """
-        # some starting settings
-        # NOTE MoltenProt internally uses K, but in future chemical denaturants can be here, too
-        xlabel = "Temperature, K"
-        ylabel = self.moltenProtFit.readout_type
         # variable to have only one legend entry for exp/fit plots
         sample_label = False
 
+        if color is None:
+            color = self.currentCurveColor
         # set the color of all curves to be plotted
         if self.curveHeatmapColorCheckBoxIsChecked:
-            current_color = self.buttons.at[wellID, "Color"]
+            # NOTE the heatmap colors arrive asynchronously (see applyButtonsStyle), until then the curve color is used
+            current_color = self.buttons[wellID].color or color
         else:
-            current_color = self.currentCurveColor
+            current_color = color
 
         # a list of all plotted lines
         lines = []
@@ -2499,11 +3000,11 @@ class MoltenProtMainWindow(QMainWindow):
                             or self.curveViewComboboxCurrentText == "Datapoints + Fit"
                         ):
                             lines += self.axes.plot(
-                                self.moltenProtFit.plate[wellID].index.values,
-                                self.moltenProtFit.plate[wellID],
+                                *self.markedDatapoints(
+                                    self.moltenProtFit.plate[wellID]
+                                ),
                                 lw=0,
                                 marker=".",
-                                markevery=self.curveMarkEverySpinBoxValue,
                                 label=label,
                                 color=current_color,
                             )
@@ -2534,35 +3035,21 @@ class MoltenProtMainWindow(QMainWindow):
 
                         if self.curveBaselineCheckBoxIsChecked:
                             # draw baselines
-                            # calculate polynomials
-                            poly_pre = np.poly1d(
-                                *self.moltenProtFit.plate_results.loc[
-                                    [wellID], ["kN_fit", "bN_fit"]
-                                ].values
-                            )
-                            poly_post = np.poly1d(
-                                *self.moltenProtFit.plate_results.loc[
-                                    [wellID], ["kU_fit", "bU_fit"]
-                                ].values
-                            )
-                            xmin_xmax = (
-                                self.moltenProtFit.plate[wellID].index.min(),
-                                self.moltenProtFit.plate[wellID].index.max(),
-                            )
+                            xmin_xmax, y_pre, y_post = self.getBaselines(wellID)
                             lines += self.axes.plot(
                                 xmin_xmax,
-                                poly_pre(xmin_xmax),
+                                y_pre,
                                 linestyle="--",
                                 color=current_color,
                             )
                             lines += self.axes.plot(
                                 xmin_xmax,
-                                poly_post(xmin_xmax),
+                                y_post,
                                 linestyle="--",
                                 color=current_color,
                             )
                     elif self.curveTypeComboboxCurrentText == "Baseline-corrected":
-                        if "plate_raw_corr" in self.moltenProtFit.__dict__:
+                        if hasattr(self.moltenProtFit, "plate_raw_corr"):
                             """
                             NOTE In this plotting mode no fit data exists
                             """
@@ -2572,14 +3059,12 @@ class MoltenProtMainWindow(QMainWindow):
                                 == "Datapoints + Fit"
                             ):
                                 lines += self.axes.plot(
-                                    self.moltenProtFit.plate_raw_corr[
-                                        wellID
-                                    ].index.values,
-                                    self.moltenProtFit.plate_raw_corr[wellID],
+                                    *self.markedDatapoints(
+                                        self.moltenProtFit.plate_raw_corr[wellID]
+                                    ),
                                     lw=0,
                                     # linestyle=":",
                                     marker=".",
-                                    markevery=self.curveMarkEverySpinBoxValue,
                                     label=label,
                                     color=current_color,
                                 )
@@ -2624,9 +3109,6 @@ class MoltenProtMainWindow(QMainWindow):
                             )
                         self.axesDerivative.set_xlabel("Temperature")
                         self.axesDerivative.set_ylabel("1st Deriv.")
-                        # rescale axes
-                        self.axesDerivative.relim()
-                        self.axesDerivative.autoscale_view()
                     # skip raw data plotting
                     plot_raw = False
 
@@ -2638,19 +3120,56 @@ class MoltenProtMainWindow(QMainWindow):
                     sourcedf[wellID].index.values,
                     sourcedf[wellID],
                     label=wellID,
-                    color=self.currentCurveColor,
+                    color=color,
                 )
         else:
             print("Debug: non-existent well ID called: {}".format(wellID))
 
+        if update_axes:
+            self.updateAxes()
+        # if plotting was successful, record the line color and line list for future reference
+        self.buttons[wellID].line_color = current_color
+        self.buttons[wellID].lines = lines
+
+    def markedDatapoints(self, series):
+        """
+        Return the temperatures and values of a sample thinned out according to curveMarkEverySpinBoxValue
+
+        NOTE the datapoints are plotted without lines, so slicing the arrays looks the same as
+        using markevery, but matplotlib does not have to transform the skipped points
+
+        Parameters
+        ----------
+        series
+            pd.Series with the signal of one sample (temperature as index)
+
+        Returns
+        -------
+        tuple of two numpy arrays: temperatures and signal values
+        """
+        step = max(1, self.curveMarkEverySpinBoxValue or 1)
+        return series.index.values[::step], series.values[::step]
+
+    def updateAxes(self):
+        """
+        Set the axes labels and limits to fit the plotted curves and re-create the legend
+        """
+        # some starting settings
+        # NOTE MoltenProt internally uses K, but in future chemical denaturants can be here, too
+        xlabel = "Temperature, K"
+        ylabel = self.moltenProtFit.readout_type
+
         # set labels for axes
         self.axes.set_xlabel(xlabel)
         self.axes.set_ylabel(ylabel)
         # set xlim for axes based on the respective MoltenProt instance
         self.axes.set(xlim=self.moltenProtFit.xlim)
-        # rescale axes
+        # rescale axes; x is fixed above (and shared with the derivative axes), so only y is autoscaled
         self.axes.relim()
-        self.axes.autoscale_view()
+        self.axes.autoscale_view(scalex=False)
+        if self.axesDerivative is not None:
+            self.axesDerivative.relim()
+            self.axesDerivative.autoscale_view(scalex=False)
 
         # create legend (if respective axes already exists)
         if (
@@ -2669,9 +3188,6 @@ class MoltenProtMainWindow(QMainWindow):
                 ncol=ncol,
                 mode="expand",
             )
-        # if plotting was successful, record the line color and line list for future reference
-        self.buttons.at[wellID, "LineColor"] = current_color
-        self.buttons.at[wellID, "Line2D"] = lines
 
     def plotVlines(self, wellID, current_color):
         """
@@ -2694,60 +3210,29 @@ class MoltenProtMainWindow(QMainWindow):
         """
         out = []
         if self.curveVlinesCheckBoxIsChecked:
+            results = self.moltenProtFit.plate_results
+            # vertical lines do not change the y limits, so the text position is the same for all lines
+            ymin, ymax = self.axes.get_ylim()
+            text_y = ymin + 0.05 * (ymax - ymin)
             for parameter_name in self.moltenProtFit.plotlines:
+                value = results.at[wellID, parameter_name]
                 # NOTE lines are not labeled so that they are not listed in the legend
                 out.append(
-                    self.axes.axvline(
-                        self.moltenProtFit.plate_results[parameter_name][wellID],
-                        ls="dotted",
-                        c=current_color,
-                        lw=3,
-                    )
+                    self.axes.axvline(value, ls="dotted", c=current_color, lw=3)
                 )
                 # add text with the parameter used to generate the line
-                out.append(
-                    self.axes.text(
-                        self.moltenProtFit.plate_results[parameter_name][wellID],
-                        self.axes.get_ylim()[0]
-                        + 0.05 * (self.axes.get_ylim()[1] - self.axes.get_ylim()[0]),
-                        " " + parameter_name,
-                    )
-                )
+                out.append(self.axes.text(value, text_y, " " + parameter_name))
         return out
 
     ## \brief this method creates subplots for derivative and/or legend
     def manageSubplots(self):
         if self.dataProcessed:
             self.getPlotSettings()
-            self.fig.clear()
-            if (
-                self.curveDerivativeCheckBoxIsChecked
-                and self.curveLegendComboboxCurrentText != "None"
-            ):
-                self.axes = self.fig.add_subplot(3, 1, 1)
-                # TODO hide ticks for main plot when deriv plot is on
-                self.axesDerivative = self.fig.add_subplot(3, 1, 2, sharex=self.axes)
-                self.axesLegend = self.fig.add_subplot(3, 1, 3)
-            elif self.curveDerivativeCheckBoxIsChecked:
-                self.axes = self.fig.add_subplot(2, 1, 1)
-                self.axesDerivative = self.fig.add_subplot(2, 1, 2, sharex=self.axes)
-                self.axesLegend = None
-            elif self.curveLegendComboboxCurrentText != "None":
-                self.axes = self.fig.add_subplot(2, 1, 1)
-                self.axesDerivative = None
-                self.axesLegend = self.fig.add_subplot(2, 1, 2)
-            else:
-                # nothing checked - just keep the main plot
-                self.axes = self.fig.add_subplot(1, 1, 1)
-                self.axesDerivative = None
-                self.axesLegend = None
-            # remove spines from legend subplot
-            if self.axesLegend != None:
-                self.axesLegend.axis("off")
-            # set axes grids
-            self.axes.grid(True)
-            if self.axesDerivative is not None:
-                self.axesDerivative.grid(True)
+            # TODO hide ticks for main plot when deriv plot is on
+            self.arrangeSubplots(
+                derivative=self.curveDerivativeCheckBoxIsChecked,
+                legend=self.curveLegendComboboxCurrentText != "None",
+            )
         else:
             # without complete analysis most visualizations are not possible
             self.status_text.setText(
@@ -2758,25 +3243,43 @@ class MoltenProtMainWindow(QMainWindow):
     @pyqtSlot()
     def on_legendChecked(self):
         self.getPlotSettings()
-        self.fig.clear()
-        if self.curveLegendComboboxCurrentText != "None":
-            # create a dedicated subplot for holding the legend
-            if self.axesDerivative != None:
-                self.axes = self.fig.add_subplot(3, 1, 1)
-                self.axesDerivative = self.fig.add_subplot(3, 1, 2)
-                self.axesLegend = self.fig.add_subplot(3, 1, 3)
-            else:
-                self.axes = self.fig.add_subplot(2, 1, 1)
-                # self.axesDerivative = self.fig.add_subplot(2,1,2)
-                self.axesLegend = self.fig.add_subplot(2, 1, 2)
-        else:
-            # remove existing legend
-            if self.axesLegend is not None:
-                if self.axesDerivative != None:
-                    self.axes = self.fig.add_subplot(2, 1, 1)
-                    self.axesDerivative = self.fig.add_subplot(2, 1, 2)
-                else:
-                    self.axes = self.fig.add_subplot(1, 1, 1)
+        # a dedicated subplot holds the legend
+        self.arrangeSubplots(
+            derivative=self.axesDerivative is not None,
+            legend=self.curveLegendComboboxCurrentText != "None",
+        )
+
+    def arrangeSubplots(self, derivative, legend):
+        """
+        Show or hide the derivative and legend subplots and split the figure height
+        between the visible ones
+
+        NOTE the subplots are created once in createMatplotlibStuff and only moved around here,
+        so that toggling does not re-create the figure; self.axesDerivative and self.axesLegend
+        are None when the respective subplot is hidden
+
+        Parameters
+        ----------
+        derivative : bool
+            show the subplot with the 1st derivative
+        legend : bool
+            show the subplot holding the legend
+        """
+        self.axesDerivative = self.derivativeSubplot if derivative else None
+        self.axesLegend = self.legendSubplot if legend else None
+        visible = [
+            ax
+            for ax in (self.axes, self.axesDerivative, self.axesLegend)
+            if ax is not None
+        ]
+        grid = GridSpec(len(visible), 1, figure=self.fig)
+        for position, ax in enumerate(visible):
+            ax.set_subplotspec(grid[position])
+        self.derivativeSubplot.set_visible(derivative)
+        self.legendSubplot.set_visible(legend)
+        # the legend is drawn by the main axes, so it must be removed explicitly
+        if not legend and self.axes.get_legend() is not None:
+            self.axes.get_legend().remove()
 
     @pyqtSlot()
     def on_curveBaselineCheckBoxChecked(self):
@@ -2791,9 +3294,23 @@ class MoltenProtMainWindow(QMainWindow):
     def createMatplotlibStuff(self):
         self.main_frame = QWidget()
         self.fig = Figure()
-        self.axes = self.fig.add_subplot()
+        # NOTE all subplots are created once and are then shown/hidden by arrangeSubplots
+        self.axes = self.fig.add_subplot(3, 1, 1)
         self.axes.grid(True)
+        self.derivativeSubplot = self.fig.add_subplot(3, 1, 2, sharex=self.axes)
+        self.derivativeSubplot.grid(True)
+        self.legendSubplot = self.fig.add_subplot(3, 1, 3)
+        # remove spines from legend subplot
+        self.legendSubplot.axis("off")
+        self.arrangeSubplots(derivative=False, legend=False)
+        # NOTE the Qt canvas only re-renders the figure in paintEvent if a draw is pending,
+        # otherwise it copies the cached Agg buffer; so changes must request canvas.draw_idle()
+        # and the figure is never rendered on repaints (e.g. resizing docks) without changes
         self.canvas = FigureCanvas(self.fig)
+        # the image of the canvas after the last full draw, used to paint hovered curves quickly (see blitArtists)
+        self.canvasBackground = None
+        self.canvasBackgroundLimits = None
+        self.canvas.mpl_connect("draw_event", self.on_canvasDrawn)
         # print(type(self.canvas),  currentframe().f_lineno,  cfFilename)
         self.canvas.setParent(self.main_frame)
         # Create matplolib toolbar as a Qt object
@@ -2804,37 +3321,10 @@ class MoltenProtMainWindow(QMainWindow):
         self.main_frame.setLayout(left_vbox)
 
     def addDerivativeSublot(self):
-        self.axesDerivative = self.fig.add_subplot(2, 1, 2)
-
-    ## \brief This method is no unused.
-    def createMatplotlibContextMenu(self):
-        # show context menu of matplolib window, show/hide legend, show/hide derivative plot
-        self.main_frame.setContextMenuPolicy(Qt.ActionsContextMenu)
-
-        # show/hide legend
-        # self.showLegendAction = QAction("Show legend",  self.main_frame)
-        # self.showLegendAction.setCheckable(True)
-        # Show or hide the legend.
-        # self.showLegendAction.triggered.connect(self.on_legendChecked)
-        # Create matplotlib - show/hide the derivative.
-        # self.showDerivativeSubplotAction = QAction("Show derivative subplot",  self.main_frame)
-        # self.showDerivativeSubplotAction.setCheckable(True)
-        # Hide the derivative window.
-        # self.showDerivativeSubplotAction.setVisible(False)
-        # actions after using the checkbox
-        # add matplolib actions to Qt context menu
-        # self.main_frame.addAction(self.showLegendAction)
-        # self.main_frame.addAction(self.showDerivativeSubplotAction)
+        self.arrangeSubplots(derivative=True, legend=self.axesLegend is not None)
 
     ## \brief This method assignes to  the stackable window heatmap.
     def createHeatmapDockWidget(self, heatmapTitle="Heatmap"):
-        """
-        heatmapDockWidget = QDockWidget(self)
-        heatmapDockWidget.setWindowTitle(heatmapTitle)
-        heatmapDockWidget.setAllowedAreas(Qt.LeftDockWidgetArea|Qt.RightDockWidgetArea)
-        heatmapDockWidget.setObjectName("heatmapDockWidget")
-        self.addDockWidget(Qt.DockWidgetArea(1), heatmapDockWidget)
-        """
         heatmapDockWidget = self.mainWindow.heatmapDockWidget
         return heatmapDockWidget
 
@@ -2850,13 +3340,14 @@ class MoltenProtMainWindow(QMainWindow):
         ## \brief  This attribute holds the sortScoreComboBox.
         self.sortScoreComboBox = QComboBox()
         self.sortScoreComboBox.setToolTip("Select sort score")
-        self.sortScoreComboBox.currentIndexChanged.connect(
+        # NOTE the current text is passed to the slots, so that it is not queried again
+        self.sortScoreComboBox.currentTextChanged.connect(
             self.setButtonsStyleAccordingToNormalizedData
         )
         ## \brief  This attribute holds the datasetComboBox.
         self.datasetComboBox = QComboBox()
         self.datasetComboBox.setToolTip("Select a dataset for viewing")
-        self.datasetComboBox.currentIndexChanged.connect(self.on_changeInputTable)
+        self.datasetComboBox.currentTextChanged.connect(self.on_changeInputTable)
         self.heatmapMultipleListView = QListView(self.datasetComboBox)
         self.datasetComboBox.setView(self.heatmapMultipleListView)
         self.datasetComboBoxAction = self.mainWindow.actionToolBar.addWidget(
@@ -2868,13 +3359,18 @@ class MoltenProtMainWindow(QMainWindow):
         self.moltenProtToolBox.ui.colormapForPlotLabel.hide()
         self.colorMapComboBox.hide()
         self.colorMapComboBox.insertItems(1, self.colorMapNames)
-        index = int(
-            self.settings.value(
-                "toolbox/miscSettingsPage/colormapForPlotComboBoxIndex", 0
-            )
+        # NOTE the toolbox has already read its settings, the combobox was still empty then
+        index = self.moltenProtToolBox.settingsValues[
+            "miscSettingsPage/colormapForPlotComboBoxIndex"
+        ]
+        # NOTE the stored index is applied before connecting the slot: at startup there is
+        # nothing to deselect or restyle, so only the colormap attributes have to be updated
+        self.colorMapComboBox.setCurrentIndex(index)
+        self.currentColorMapIndex = self.colorMapComboBox.currentIndex()
+        self.currentColorMap = self.colorMapNames[self.currentColorMapIndex]
+        self.colorMapComboBox.currentIndexChanged.connect(
+            self.on_changeColorMap, Qt.UniqueConnection
         )
-        self.colorMapComboBox.currentIndexChanged.connect(self.on_changeColorMap)
-        self.moltenProtToolBox.ui.colormapForPlotComboBox.setCurrentIndex(index)
 
     @pyqtSlot()
     def on_changeColorMap(self):
@@ -2891,8 +3387,16 @@ class MoltenProtMainWindow(QMainWindow):
             self.sortScoreCombBoxAction = self.mainWindow.actionToolBar.addWidget(
                 self.sortScoreComboBox
             )
-        self.sortScoreComboBox.clear()
-        self.sortScoreComboBox.insertItems(1, self.moltenProtFit.getResultsColumns())
+        # NOTE signals are blocked while the list is refilled, otherwise clear() and insertItems()
+        # would each request a restyle of the heatmap; the callers restyle the buttons once afterwards
+        self.sortScoreComboBox.blockSignals(True)
+        try:
+            self.sortScoreComboBox.clear()
+            self.sortScoreComboBox.insertItems(
+                1, self.moltenProtFit.getResultsColumns()
+            )
+        finally:
+            self.sortScoreComboBox.blockSignals(False)
         width = self.sortScoreComboBox.minimumSizeHint().width()
         self.sortScoreComboBox.setMinimumWidth(width)
         self.sortScoreCombBoxAction.setVisible(True)
@@ -2907,10 +3411,7 @@ class MoltenProtMainWindow(QMainWindow):
         self.fileLoaded = False
         self.dataProcessed = False
         self.createMatplotlibStuff()
-        uifile = QFile(":/main.ui")
-        uifile.open(QFile.ReadOnly)
-        self.mainWindow = uic.loadUi(uifile, self)
-        uifile.close()
+        self.mainWindow = setupUiForm(self, ":/main.ui")
         self.setCentralWidget(self.main_frame)
         self.createComboBoxesForActionToolBar()
         self.mainWindow.actionToolBar.setVisible(False)
@@ -2923,14 +3424,18 @@ class MoltenProtMainWindow(QMainWindow):
         self.mainWindow.tableDockWidget.hide()
         self.tableDockWidget = self.mainWindow.tableDockWidget
         tableWidget = self.mainWindow.tableWidget
-        tableWidget.setColumnCount(5)  # ATTENTION has to be set dynamically
-        header = tableWidget.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)
-        tableWidget.setSortingEnabled(True)
-        tableWidget.setAlternatingRowColors(True)
-        tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
         tableWidget.hide()
+        # the table view is configured when it is shown for the first time, see initializeTable
+        self.tableInitialized = False
+        # all table items are cloned from a centered prototype (see addTableRows)
+        self.tableItemPrototype = QTableWidgetItem()
+        self.tableItemPrototype.setTextAlignment(Qt.AlignCenter)
+        tableWidget.setItemPrototype(self.tableItemPrototype)
         self.tableWidget = tableWidget
+        # ID column items of the table rows, keyed by button_id (see updateTable/on_show)
+        self.tableItemsById = {}
+        # the column titles currently shown in the table (see addTableRows)
+        self.tableColumnLabels = None
         self.mainWindow.heatmapDockWidget.setMinimumWidth(560)
         # Hide the Protocol DockWidget
         self.mainWindow.protocolDockWidget.setVisible(False)
@@ -3011,6 +3516,11 @@ class MoltenProtMainWindow(QMainWindow):
                 else:
                     event.ignore()
 
+        # write the settings that are still pending in settingsSyncTimer
+        if event.isAccepted():
+            self.settingsSyncTimer.stop()
+            self.settings.sync()
+
     @pyqtSlot()
     def on_actionShowHideProtocol(self):
         self.mainWindow.protocolDockWidget.setVisible(
@@ -3055,10 +3565,25 @@ class MoltenProtMainWindow(QMainWindow):
             directory=self.lastDir,
             filter="png Files (*.png)",
         )[0]
+        if not filename:
+            # the dialog was cancelled
+            return
         # add PNG suffix if needed
         if filename[-4:] != ".png":
             filename += ".png"
-        pixMap.save(filename, "PNG")
+        # PNG encoding of the whole window is done in a worker thread
+        worker = ImageSaveWorker(pixMap.toImage(), filename, "PNG")
+        worker.signals.result.connect(self.on_imageSaved)
+        worker.signals.error.connect(self.on_imageSaveError)
+        self.threadpool.start(worker)
+
+    @pyqtSlot(object)
+    def on_imageSaved(self, filename):
+        self.status_text.setText("Screenshot saved to {}".format(filename))
+
+    @pyqtSlot(tuple)
+    def on_imageSaveError(self, error):
+        self.status_text.setText(str(error[1]))
 
     def setExpertMode(self):
         if showVersionInformation:
@@ -9,11 +9,15 @@ External NPARC runner
 """
 
 import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 import importlib.util
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from scipy.optimize import curve_fit
 from scipy.stats import mannwhitneyu
 from scipy.special import expit  # numerically stable sigmoid
@@ -28,39 +32,48 @@ def _four_pl_loglogistic(c, a, d, ec50, b):
     """
     c = np.asarray(c, dtype=float)
     # keep values in a sane numeric range and avoid log(0)
-    c_safe = np.clip(c, 1e-12, 1e12)
-    ec50_safe = float(np.clip(ec50, 1e-12, 1e12))
+    # NOTE this runs for every residual and finite-difference evaluation of curve_fit; np.minimum/np.maximum
+    # and the builtins give the same values as np.clip at a fraction of its call overhead
+    c_safe = np.minimum(np.maximum(c, 1e-12), 1e12)
+    ec50_safe = min(max(float(ec50), 1e-12), 1e12)
     # work in log space; clip z to prevent overflow in extreme tails
     z = b * (np.log(c_safe) - np.log(ec50_safe))
-    z = np.clip(z, -500.0, 500.0)
+    z = np.minimum(np.maximum(z, -500.0), 500.0)
     return d + (a - d) * expit(-z)
 
+# NOTE both fits expect finite x and y: the callers mask the non-finite points once before calling them
+
 def _fit_null_const(x, y):
-    mask = np.isfinite(x) & np.isfinite(y)
-    if mask.sum() < 2:
+    if len(y) < 2:
         return np.nan, np.array([]), np.array([])
-    yv = np.asarray(y)[mask]
-    yhat = np.full_like(yv, np.nanmean(yv))
-    rss = np.nansum((yv - yhat) ** 2.0)
+    yv = np.asarray(y)
+    yhat = np.full_like(yv, np.mean(yv))
+    rss = np.sum((yv - yhat) ** 2.0)
     return rss, yv, yhat
 
 def _fit_4pl(x, y):
-    mask = np.isfinite(x) & np.isfinite(y)
-    if mask.sum() < 3:
+    if len(y) < 3:
         return np.nan, np.array([]), np.array([]), None
-    xv = np.asarray(x)[mask]
-    yv = np.asarray(y)[mask]
-    ymin, ymax = np.nanmin(yv), np.nanmax(yv)
+    xv = np.asarray(x)
+    yv = np.asarray(y)
+    ymin, ymax = np.min(yv), np.max(yv)
     a0, d0 = ymax, ymin
-    ec500 = np.nanmedian(xv[xv > 0]) if np.any(xv > 0) else 1.0
+    ec500 = np.median(xv[xv > 0]) if np.any(xv > 0) else 1.0
     b0 = 1.0  # or estimate sign from data if you like
     p0 = [float(a0), float(d0), float(ec500), float(b0)]
     bounds = ([-np.inf, -np.inf, 1e-12, -8.0],  # allow both up/down curves
               [np.inf, np.inf, 1e+12, 8.0])  # but keep slope magnitude reasonable
+    # the concentrations are fixed during a fit: take their log once instead of in every model evaluation
+    log_xv = np.log(np.minimum(np.maximum(xv.astype(float), 1e-12), 1e12))
+
+    def model(_c, a, d, ec50, b):
+        """_four_pl_loglogistic evaluated at xv; expit saturates cleanly on its own, so the z clamp is left out."""
+        return d + (a - d) * expit(b * (np.log(min(max(float(ec50), 1e-12), 1e12)) - log_xv))
+
     try:
-        popt, _ = curve_fit(_four_pl_loglogistic, xv, yv, p0=p0, bounds=bounds, maxfev=20000)
-        yhat = _four_pl_loglogistic(xv, *popt)
-        rss = np.nansum((yv - yhat) ** 2.0)
+        popt, _ = curve_fit(model, xv, yv, p0=p0, bounds=bounds, maxfev=20000)
+        yhat = model(xv, *popt)
+        rss = np.sum((yv - yhat) ** 2.0)
         return rss, yv, yhat, popt
     except Exception:
         return np.nan, np.array([]), np.array([]), None
@@ -77,84 +90,143 @@ def _condition_groups(platemap: pd.DataFrame):
     groups = pm.groupby("Condition")[well_col].apply(list).to_dict()
     return groups
 
-def run_nparc_external(raw_wide_k: pd.DataFrame,
-                       raw_corr_wide_k: pd.DataFrame,
-                       platemap: pd.DataFrame,
-                       value: str = "BaselineCorrected"):
-    assert value in ("Raw", "BaselineCorrected")
-    wide_k = raw_corr_wide_k if value == "BaselineCorrected" else raw_wide_k
-    temps_c = _temperatures_from_wide(wide_k)
-    groups = _condition_groups(platemap)
-    rows, summaries = [], []
+def _nparc_one_condition(cond, wells, blocks, conc_by_well):
+    """{value: (RSS columns, Mann-Whitney input)} of one condition for every (Y_all, col_index, temps_c) block."""
+    conc_vals = np.array([conc_by_well[w] for w in dict.fromkeys(wells) if w in conc_by_well], dtype=float)
+    # distinct counts through a set: no sort, same rounding as the np.unique in _nparc_one_block
+    if len(set(np.round(conc_vals[np.isfinite(conc_vals)], 12).tolist())) < 3:
+        return {value: (None, None) for value in blocks}  # need ≥3 distinct concentrations
+    return {value: _nparc_one_block(cond, wells, Y_all, col_index, conc_by_well, temps_c, value)
+            for value, (Y_all, col_index, temps_c) in blocks.items()}
 
-    for cond, wells in groups.items():
-        sub = platemap.loc[platemap.index.intersection(wells)].copy()
-        if "Concentration" not in sub.columns:
+def _nparc_one_block(cond, wells, Y_all, col_index, conc_by_well, temps_c, value):
+    """RSS columns of one condition plus its (condition, RSS null, RSS alt) Mann-Whitney input, None if untested."""
+    kept, rss_alt_list = [], []
+
+    # (temperature x well) block of the condition; wells without data would be masked out anyway
+    wells_present = [w for w in wells if w in col_index]
+    x_all = np.array([conc_by_well.get(w, np.nan) for w in wells_present], dtype=float)
+    Y = Y_all[:, [col_index[w] for w in wells_present]]
+    M = np.isfinite(Y) & np.isfinite(x_all)[None, :]
+    n_points = M.sum(axis=1)
+    # distinct concentrations per temperature through a (well x distinct concentration) indicator
+    x_levels, x_codes = np.unique(np.round(x_all, 12), return_inverse=True)
+    indicator = np.zeros((len(x_all), len(x_levels)))
+    indicator[np.arange(len(x_all)), x_codes] = 1.0
+    n_distinct = ((M @ indicator) > 0).sum(axis=1)
+    # null model (constant) for all temperatures at once
+    Y0 = np.where(M, Y, 0.0)
+    y_mean = Y0.sum(axis=1) / np.maximum(n_points, 1)
+    rss_null = np.where(M, Y - y_mean[:, None], 0.0) ** 2
+    rss_null = rss_null.sum(axis=1)
+
+    for ti, tC in enumerate(temps_c):
+        if n_points[ti] < 3 or n_distinct[ti] < 2:
             continue
-        conc_map = sub["Concentration"].astype(float).to_dict()
-        conc_vals = pd.Series(conc_map, dtype=float).dropna().values
-        if len(np.unique(np.round(conc_vals, 12))) < 3:
-            continue  # need ≥3 distinct concentrations
-
-        rss_null_list, rss_alt_list = [], []
-
-        for ti, tC in enumerate(temps_c):
-            x, y = [], []
-            for w in wells:
-                yv = wide_k.iloc[ti][w] if w in wide_k.columns else np.nan
-                xv = conc_map.get(w, np.nan)
-                x.append(xv); y.append(yv)
-            x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
-            m = np.isfinite(x) & np.isfinite(y)
-            x, y = x[m], y[m]
-            if len(x) < 3 or len(np.unique(np.round(x, 12))) < 2:
-                continue
-            rss0, yv0, _ = _fit_null_const(x, y)
-            rss1, yv1, _, _ = _fit_4pl(x, y)
-            if np.isfinite(rss0) and np.isfinite(rss1):
-                rows.append({
-                    "Condition": cond,
-                    "Temperature_C": float(tC),
-                    "RSS_null": float(rss0),
-                    "RSS_alt": float(rss1),
-                    "N_points": int(len(yv0)),
-                    "value_type": value
-                })
-                rss_null_list.append(rss0); rss_alt_list.append(rss1)
-
-        rss0 = np.asarray(rss_null_list, dtype=float)
-        rss1 = np.asarray(rss_alt_list, dtype=float)
-        m = np.isfinite(rss0) & np.isfinite(rss1)
-        rss0, rss1 = rss0[m], rss1[m]
-        if len(rss0) >= 5:
-            try:
-                U, p = mannwhitneyu(rss1, rss0, alternative="less", method="auto")
-            except Exception:
-                U, p = np.nan, np.nan
-            summaries.append({
-                "Condition": cond,
-                "n_temperatures": int(len(rss0)),
-                "U_stat": float(U) if np.isfinite(U) else np.nan,
-                "p_value": float(p) if np.isfinite(p) else np.nan,
-                "median_RSS_null": float(np.nanmedian(rss0)) if len(rss0) else np.nan,
-                "median_RSS_alt": float(np.nanmedian(rss1)) if len(rss1) else np.nan,
-                "frac_alt_better": float(np.mean(rss1 < rss0)) if len(rss1) else np.nan,
-                "value_type": value
-            })
-
-    rss_long = pd.DataFrame(rows)
+        m = M[ti]
+        rss1, _, _, _ = _fit_4pl(x_all[m], Y[ti, m])
+        if np.isfinite(rss_null[ti]) and np.isfinite(rss1):
+            kept.append(ti); rss_alt_list.append(rss1)
+
+    # one array per rss_long column instead of a dict per temperature
+    kept = np.asarray(kept, dtype=np.intp)
+    rss0 = rss_null[kept]
+    rss1 = np.asarray(rss_alt_list, dtype=float)
+    columns = {
+        "Temperature_C": np.asarray(temps_c, dtype=float)[kept],
+        "RSS_null": rss0,
+        "RSS_alt": rss1,
+        "N_points": n_points[kept].astype(np.int64),
+    }
+    return columns, ((cond, rss0, rss1) if len(rss0) >= 5 else None)
+
+def _nparc_summary(tested, value):
+    """Mann-Whitney summary rows for the tested (condition, RSS null, RSS alt) triples of one value type."""
+    if not tested:
+        return []
+    # one Mann-Whitney call for all conditions: rows padded with NaN, which nan_policy="omit" drops per row
+    width = max(len(r0) for _, r0, _ in tested)
+    RSS0 = np.full((len(tested), width), np.nan)
+    RSS1 = np.full((len(tested), width), np.nan)
+    for i, (_, r0, r1) in enumerate(tested):
+        RSS0[i, :len(r0)] = r0
+        RSS1[i, :len(r1)] = r1
+    try:
+        U_all, p_all = mannwhitneyu(RSS1, RSS0, alternative="less", method="auto", axis=1, nan_policy="omit")
+    except Exception:
+        U_all = p_all = np.full(len(tested), np.nan)
+    summaries = []
+    for (cond, rss0, rss1), U, p in zip(tested, np.atleast_1d(U_all), np.atleast_1d(p_all)):
+        summaries.append({
+            "Condition": cond,
+            "n_temperatures": int(len(rss0)),
+            "U_stat": float(U) if np.isfinite(U) else np.nan,
+            "p_value": float(p) if np.isfinite(p) else np.nan,
+            "median_RSS_null": float(np.nanmedian(rss0)) if len(rss0) else np.nan,
+            "median_RSS_alt": float(np.nanmedian(rss1)) if len(rss1) else np.nan,
+            "frac_alt_better": float(np.mean(rss1 < rss0)) if len(rss1) else np.nan,
+            "value_type": value
+        })
+    return summaries
+
+def _run_nparc(raw_wide_k: pd.DataFrame,
+               raw_corr_wide_k: pd.DataFrame,
+               platemap: pd.DataFrame,
+               values: tuple,
+               n_jobs: int = 1):
+    """NPARC for the given value types in one pass over the conditions; results are stacked in `values` order."""
+    groups = _condition_groups(platemap)
+
+    # well lookups and the full (temperature x well) matrix per value type, built once for all conditions
+    if "Concentration" in platemap.columns:
+        conc_by_well = dict(zip(platemap.index, pd.to_numeric(platemap["Concentration"], errors="coerce")))
+    else:
+        conc_by_well, groups = {}, {}
+    blocks = {}
+    for value in values:
+        wide_k = raw_corr_wide_k if value == "BaselineCorrected" else raw_wide_k
+        blocks[value] = (wide_k.to_numpy(dtype=float), {w: i for i, w in enumerate(wide_k.columns)}, _temperatures_from_wide(wide_k))
+
+    one = partial(_nparc_one_condition, blocks=blocks, conc_by_well=conc_by_well)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(groups))
+    # worker processes must be able to re-import this module by name; otherwise stay serial
+    if n_jobs <= 1 or sys.modules.get(__name__) is None:
+        results = [one(cond, wells) for cond, wells in groups.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(one, groups.keys(), groups.values()))
+
+    conds, value_types, parts, summaries = [], [], [], []
+    for value in values:
+        tested = []
+        for cond, res in zip(groups, results):
+            columns, test = res[value]
+            if columns is not None and len(columns["RSS_alt"]):
+                conds.extend([cond] * len(columns["RSS_alt"]))
+                value_types.extend([value] * len(columns["RSS_alt"]))
+                parts.append(columns)
+            if test is not None:
+                tested.append(test)
+        summaries.extend(_nparc_summary(tested, value))
+
+    rss_long = pd.DataFrame({"Condition": np.asarray(conds, dtype=object)} | {
+        col: (np.concatenate([p[col] for p in parts]) if parts else np.array([], dtype=dtype))
+        for col, dtype in (("Temperature_C", float), ("RSS_null", float), ("RSS_alt", float), ("N_points", np.int64))
+    } | {"value_type": np.asarray(value_types, dtype=object)})
     summary = pd.DataFrame(summaries)
     # BH-FDR within each value_type
     if not summary.empty and summary["p_value"].notna().any():
         out = []
-        for vt, subdf in summary.groupby("value_type", dropna=False):
-            pv = subdf["p_value"].to_numpy()
+        for vt, subdf in summary.groupby("value_type", dropna=False, sort=False):
+            pv = subdf["p_value"].to_numpy(dtype=float)
             m = len(pv)
             order = np.argsort(pv)
-            ranks = np.empty_like(order); ranks[order] = np.arange(1, m+1)
-            q = pv * m / ranks
-            q_sorted = np.minimum.accumulate(q[order][::-1])[::-1]
-            q_adj = np.empty_like(q); q_adj[order] = q_sorted
+            # p * m / rank in sorted order, then the running minimum from the largest p downwards
+            # (which also keeps q <= max(p) <= 1)
+            q_sorted = np.minimum.accumulate((pv[order] * m / np.arange(1, m+1))[::-1])[::-1]
+            q_adj = np.empty_like(pv); q_adj[order] = q_sorted
             s2 = subdf.copy(); s2["p_adj_BH"] = q_adj
             out.append(s2)
         summary = pd.concat(out, ignore_index=True)
@@ -163,6 +235,22 @@ def run_nparc_external(raw_wide_k: pd.DataFrame,
 
     return {"rss_long": rss_long, "summary": summary}
 
+def run_nparc_external(raw_wide_k: pd.DataFrame,
+                       raw_corr_wide_k: pd.DataFrame,
+                       platemap: pd.DataFrame,
+                       value: str = "BaselineCorrected",
+                       n_jobs: int = 1):
+    """NPARC per condition; n_jobs > 1 fits that many conditions in parallel processes (< 1 = all cores)."""
+    assert value in ("Raw", "BaselineCorrected")
+    return _run_nparc(raw_wide_k, raw_corr_wide_k, platemap, (value,), n_jobs=n_jobs)
+
+def run_nparc_external_both(raw_wide_k: pd.DataFrame,
+                            raw_corr_wide_k: pd.DataFrame,
+                            platemap: pd.DataFrame,
+                            n_jobs: int = 1):
+    """BaselineCorrected and Raw NPARC in one pass; same as stacking the two run_nparc_external results."""
+    return _run_nparc(raw_wide_k, raw_corr_wide_k, platemap, ("BaselineCorrected", "Raw"), n_jobs=n_jobs)
+
 def export_nparc_plots(nparc_rss_long: pd.DataFrame,
                        raw_wide_k: pd.DataFrame,
                        raw_corr_wide_k: pd.DataFrame,
@@ -173,41 +261,43 @@ def export_nparc_plots(nparc_rss_long: pd.DataFrame,
     wide_k = raw_corr_wide_k if value == "BaselineCorrected" else raw_wide_k
     temps_c = _temperatures_from_wide(wide_k)
     groups = _condition_groups(platemap)
+    # NumPy lookups once; the dose-response panels below only index into them
+    conc_by_well = (dict(zip(platemap.index, pd.to_numeric(platemap["Concentration"], errors="coerce")))
+                    if "Concentration" in platemap.columns else {})
+    col_index = {w: i for i, w in enumerate(wide_k.columns)}
+    Y_all = wide_k.to_numpy(dtype=float)
 
     for cond, wells in groups.items():
         dfc = nparc_rss_long[nparc_rss_long["Condition"] == cond]
         if dfc.empty:
             continue
         # RSS vs T
-        fig, ax = plt.subplots(figsize=(6,4), dpi=150)
+        fig = Figure(figsize=(6,4), dpi=150); ax = fig.subplots()
         dfc_sorted = dfc.sort_values("Temperature_C")
         ax.plot(dfc_sorted["Temperature_C"], dfc_sorted["RSS_null"], label="RSS null")
         ax.plot(dfc_sorted["Temperature_C"], dfc_sorted["RSS_alt"], label="RSS alt (4pLL)")
         ax.set_xlabel("Temperature (°C)"); ax.set_ylabel("Residual sum of squares")
         ax.set_title(f"NPARC RSS — {cond} [{value}]"); ax.legend(loc="best", fontsize=8)
-        fig.tight_layout(); fig.savefig(outdir / f"{cond.replace('/','-')}__RSS_vs_T.png"); plt.close(fig)
+        fig.tight_layout(); fig.savefig(outdir / f"{cond.replace('/','-')}__RSS_vs_T.png")
 
         # Representative temperatures
         used_T = dfc_sorted["Temperature_C"].to_numpy()
         if used_T.size == 0:
             continue
+        # wells without data would be masked out below anyway
+        wells_present = [w for w in wells if w in col_index]
+        cond_concs = np.array([conc_by_well.get(w, np.nan) for w in wells_present], dtype=float)
+        cond_cols = [col_index[w] for w in wells_present]
         for q in [0.25, 0.5, 0.75]:
             Tsel = float(np.quantile(used_T, q))
             ti = int(np.argmin(np.abs(temps_c - Tsel)))
             Tactual = float(temps_c[ti])
             # dose-response data at Tactual
-            concs, ys = [], []
-            for w in wells:
-                c = platemap.loc[w, "Concentration"] if w in platemap.index else np.nan
-                y = wide_k.iloc[ti][w] if w in wide_k.columns else np.nan
-                concs.append(float(c) if pd.notna(c) else np.nan)
-                ys.append(float(y) if pd.notna(y) else np.nan)
-            concs = np.asarray(concs, dtype=float); ys = np.asarray(ys, dtype=float)
+            concs, ys = cond_concs, Y_all[ti, cond_cols]
             m = np.isfinite(concs) & np.isfinite(ys)
             concs, ys = concs[m], ys[m]
-            if concs.size < 3 or len(np.unique(np.round(concs,12))) < 2:
+            if concs.size < 3 or len(set(np.round(concs, 12).tolist())) < 2:
                 continue
-            _, _, _ = _fit_null_const(concs, ys)
             _, _, _, popt = _fit_4pl(concs, ys)
             # Plot only within the measured concentration range, using log-spacing
             x_valid = concs[(concs > 0) & np.isfinite(concs)]
@@ -216,7 +306,7 @@ def export_nparc_plots(nparc_rss_long: pd.DataFrame,
             xmin = float(np.nanmin(x_valid))
             xmax = float(np.nanmax(x_valid))
             xgrid = np.geomspace(xmin, xmax, 200)
-            fig, ax = plt.subplots(figsize=(6,4), dpi=150)
+            fig = Figure(figsize=(6,4), dpi=150); ax = fig.subplots()
             ax.scatter(concs, ys, s=12, label="data")
             ax.hlines(np.nanmean(ys), xmin=np.nanmin(concs), xmax=np.nanmax(concs), linestyles="--", label="null const")
             if popt is not None:
@@ -228,7 +318,7 @@ def export_nparc_plots(nparc_rss_long: pd.DataFrame,
             ax.legend(loc="best", fontsize=8)
             fig.tight_layout()
             outname = f"{cond.replace('/','-')}__DR_at_{Tactual:.1f}C.png".replace(".", "p")
-            fig.savefig(outdir / outname); plt.close(fig)
+            fig.savefig(outdir / outname)
 
 # ---------------- Runner ----------------
 
@@ -241,6 +331,7 @@ def main():
     ap.add_argument("--tmax", type=float, default=90.0)
     ap.add_argument("--out", required=True, help="Excel output path (NPARC sheets will be (re)written)")
     ap.add_argument("--plots", help="Directory for NPARC plots (optional)")
+    ap.add_argument("--jobs", type=int, default=-1, help="Parallel processes for the MoltenProt and NPARC fits (-1 = all cores).")
     args = ap.parse_args()
 
     PYRT = Path(args.pyrt)
@@ -255,28 +346,28 @@ def main():
 
     # Run original pipeline
     mp_core = pc._import_moltenprot(Path(args.pyrt).parent)
-    analysis = pc.run_analysis(plate_wide_c, platemap_df, model="santoro1988", mp_core=mp_core)
+    analysis = pc.run_analysis(plate_wide_c, platemap_df, model="santoro1988", mp_core=mp_core, n_jobs=args.jobs)
 
     # Compute NPARC (Raw + BaselineCorrected)
-    nparc_bc = run_nparc_external(analysis["raw_wide"], analysis["raw_corr_wide"], platemap_df, value="BaselineCorrected")
-    nparc_raw = run_nparc_external(analysis["raw_wide"], analysis["raw_corr_wide"], platemap_df, value="Raw")
-    summary = pd.concat([nparc_bc["summary"], nparc_raw["summary"]], ignore_index=True, sort=False)
-    rss_long = pd.concat([nparc_bc["rss_long"], nparc_raw["rss_long"]], ignore_index=True, sort=False)
+    nparc = run_nparc_external_both(analysis["raw_wide"], analysis["raw_corr_wide"], platemap_df, n_jobs=args.jobs)
+    summary, rss_long = nparc["summary"], nparc["rss_long"]
 
-    # Ensure base workbook exists (write it if not)
+    nparc_sheets = {"NPARC summary": summary, "NPARC RSS (long)": rss_long}
     out_xlsx = Path(args.out)
     if not out_xlsx.exists():
+        # new workbook: analysis and NPARC sheets in a single write
         pc.write_analysis_with_platemap(
             analysis, platemap_df, out_xlsx,
             include_all_wells=True,
             input_wide_c=plate_wide_c,
             matrix_debug=(dbg if isinstance(dbg, dict) else None),
+            extra_sheets=nparc_sheets,
         )
-
-    # Append/replace NPARC sheets
-    with pd.ExcelWriter(out_xlsx, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        summary.to_excel(writer, sheet_name="NPARC summary", index=False)
-        rss_long.to_excel(writer, sheet_name="NPARC RSS (long)", index=False)
+    else:
+        # existing workbook: only the NPARC sheets are (re)written, which needs openpyxl's append mode
+        with pd.ExcelWriter(out_xlsx, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            for sheet_name, df in nparc_sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
 
     print(f"Wrote NPARC sheets to {out_xlsx}")
     print(f"NPARC summary rows: {len(summary)}; RSS rows: {len(rss_long)}")
@@ -0,0 +1,103 @@
+"""
+Copyright 2018-2021 Vadim Kotov, Thomas C. Marlovits
+
+    This file is part of MoltenProt.
+
+    MoltenProt is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    MoltenProt is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with MoltenProt.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# NOTE this module must stay free of numpy/scipy/pandas/matplotlib: the CLI builds its
+# parser and answers --help and --citation from it without importing core
+
+import sys
+
+### Citation
+# a simple dict with strings that provide different citation formatting
+citation = {
+    "long": "\nIf you found MoltenProt helpful in your work, please cite:\nKotov et al., Protein Science (2021)\ndoi: 10.1002/pro.3986\n",
+    "html": """<p>If you found MoltenProt helpful in your work, please cite: </p> 
+                      <p>Kotov et al., Protein Science (2021)</p>
+                      <p><a href="https://dx.doi.org/10.1002/pro.3986">doi: 10.1002/pro.3986</a></p>""",
+    "short": "Citation: Kotov et al., Protein Science (2021) doi: 10.1002/pro.3986",
+}
+
+### PyInstaller
+# check if running from a PyInstaller bundle
+if hasattr(sys, "frozen") and hasattr(sys, "_MEIPASS"):
+    # print("Running from a PyInstaller bundle")
+    from_pyinstaller = True
+else:
+    from_pyinstaller = False
+
+### Default settings
+# dictionary holding the default values and and their description for CLI interface/tooltips
+# dictionary key is the name of the option, each entry contains a tuple of default parameter value and its descriptions
+# NOTE for mfilt the default value is only used when the option is supplied in the CLI
+
+# default data preparation parameters
+prep_defaults = {
+    "blanks": [],
+    "blanks_h": "Input the sample ID's with buffer-only control",  # subtract blanks in prep step
+    "exclude": [],
+    "exclude_h": 'Specify the well(s) to omit during analysis; this option is intended for simple removal of some bad wells; if many samples must be excluded, use a layout and add "Ignore" to the annotation of the sample',
+    "invert": False,  # DELETE?
+    "invert_h": "Invert the curve",
+    "mfilt": None,
+    "mfilt_h": "Apply median filter with specificed window size (in temperature units) to remove spikes; 4 degrees is a good starting value",
+    "shrink": None,
+    "shrink_h": "Average the data points to a given degree step;\n may help to make trends more apparent and speeds up the computation;\n typical values 0.5-3.0",
+    "trim_max": 0,
+    "trim_max_h": "Decrease the finishing temperature by this value",
+    "trim_min": 0,
+    "trim_min_h": "Increase the starting temperature by this value",
+}
+
+# default analysis parameters
+analysis_defaults = {
+    "model": "santoro1988",
+    # NOTE the model names are listed here, so that --help does not need to import core
+    "model_h": "Select a model for describing the experimental data (santoro1988, santoro1988i, santoro1988d, santoro1988di, irrev, lumry_eyring, skip)",
+    "baseline_fit": 10,
+    "baseline_fit_h": "The length of the input data (in temperature degrees) for initial estimation of pre- and post-transition baselines",
+    "baseline_bounds": 3,
+    "baseline_bounds_h": "Baseline bounds are set as multiples of stdev of baseline parameters obtained in the pre-fitting routine; this should stabilize the fit and speed up convergence; set to 0 to remove any bounds for baselines",
+    "dCp": 0,
+    "dCp_h": "Heat capacity change of unfolding for all samples (in J/mol/K), used only in equilibrium models; this value overrides the respective column in the layout",
+    "onset_threshold": 0.01,
+    "onset_threshold_h": "Percent unfolded to define the onset of unfolding",
+    "savgol": 10,
+    "savgol_h": "Set window size (in temperature units) for Savitzky-Golay filter used to calculate the derivative",
+}
+
+# all other settings for MoltenProtFit
+defaults = {
+    "debug": False,  # currently not exposed in the CLI
+    "debug_h": "Print developer information to the console",
+    "dec": ".",
+    "dec_h": "CSV decimal separator, enclosed in quotes",
+    "denaturant": "C",
+    "denaturant_h": "For plain CSV input only; specify temperature scale that drives denaturation, in K or C",
+    "j": 1,  # TODO not related to the core functions, supply to respective methods (output etc)
+    "j_h": "Number of jobs to be spawned by parallelized parts of the code; should not be higher than the amount of CPU's in the computer; for most recent laptops a value of 3 is recommended",
+    "layout": None,  # TODO should not be set in SetAnalysisOptions, but rather in __init__
+    "layout_h": "CSV file with layout",
+    "sep": ",",
+    "sep_h": "CSV separator, enclosed in quotes",
+    "readout": "Signal",
+    "readout_h": "For plain CSV input only; specify type of input signal",
+    "spectrum": False,
+    "spectrum_h": "If true, columns in the input CSV will be treated as separate wavelengths of a spectrum",
+    "heatmap_cmap": "coolwarm_r",  # a color-safe heatmap color with red being "bad" (low value)
+    "heatmap_cmap_h": "Matplotlib code for colormap that would be used to color-code heatmaps in reports or images",
+}
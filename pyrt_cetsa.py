@@ -3,10 +3,26 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 import string, re, sys, os, json
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.cm import get_cmap
+import importlib, importlib.util
+from functools import lru_cache, partial
+
+# ------------------------ Lazy heavy imports ------------------------
+class _LazyModule:
+    """Import a module on first attribute access, so that e.g. `--help` does not load pandas/matplotlib."""
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+np = _LazyModule("numpy")
+pd = _LazyModule("pandas")
+plt = _LazyModule("matplotlib.pyplot")
+mpl_cm = _LazyModule("matplotlib.cm")
+mpl_figure = _LazyModule("matplotlib.figure")
 
 # ------------------------ MoltenProt import ------------------------
 def _import_moltenprot(base_dir: Path):
@@ -15,17 +31,16 @@ def _import_moltenprot(base_dir: Path):
         return mp_core
     except Exception:
         pass
-    core_py = base_dir / "core.py"
-    models_py = base_dir / "models.py"
-    if core_py.exists() and models_py.exists():
+    # core.py imports its defaults from options.py, so all three modules are needed
+    module_files = [base_dir / name for name in ("core.py", "models.py", "options.py")]
+    if all(module_py.exists() for module_py in module_files):
         pkg_dir = base_dir / "moltenprot"
         pkg_dir.mkdir(exist_ok=True)
         (pkg_dir / "__init__.py").write_text("# MoltenProt package\n")
         (pkg_dir / "VERSION").write_text("git")
-        if not (pkg_dir / "core.py").exists():
-            (pkg_dir / "core.py").write_bytes(core_py.read_bytes())
-        if not (pkg_dir / "models.py").exists():
-            (pkg_dir / "models.py").write_bytes(models_py.read_bytes())
+        for module_py in module_files:
+            if not (pkg_dir / module_py.name).exists():
+                (pkg_dir / module_py.name).write_bytes(module_py.read_bytes())
         if str(base_dir) not in sys.path:
             sys.path.insert(0, str(base_dir))
         from moltenprot import core as mp_core  # type: ignore
@@ -34,60 +49,91 @@ def _import_moltenprot(base_dir: Path):
     return mp_core
 
 # ------------------------ Helpers ------------------------
-def all_well_ids_384():
+@lru_cache(maxsize=1)
+def all_well_ids_384() -> tuple[str, ...]:
+    """All 384 well IDs in row-major order (A1..P24); cached, hence an immutable tuple."""
     rows = list(string.ascii_uppercase[:16])  # A..P
-    return [f"{r}{c}" for r in rows for c in range(1, 25)]
+    return tuple(f"{r}{c}" for r in rows for c in range(1, 25))
 
 def well_id_from_rowcol(row_no: int, col_no: int) -> str:
     letters = list(string.ascii_uppercase)[:16]  # A..P
     return f"{letters[int(row_no)-1]}{int(col_no)}"
 
+_WELL_RE = re.compile(r"^([A-P])0*([1-9]|1[0-9]|2[0-4])$")
+
+@lru_cache(maxsize=1024)
 def normalize_well_id(x: str) -> str:
     x = str(x).strip().upper()
-    m = re.match(r"^([A-P])0*([1-9]|1[0-9]|2[0-4])$", x)
+    m = _WELL_RE.match(x)
     return f"{m.group(1)}{int(m.group(2))}" if m else x
 
+def well_ids_from_rowcol(row_nos, col_nos) -> list[str]:
+    """Vectorized well_id_from_rowcol for arrays of 1-based row and column numbers."""
+    letters = np.array(list(string.ascii_uppercase))[np.asarray(row_nos).astype(int) - 1]
+    return np.char.add(letters, np.asarray(col_nos).astype(int).astype(str)).tolist()
+
 def _grid_to_series(df: pd.DataFrame, value_name: str) -> pd.DataFrame:
     """Convert a 16x24 grid to a Series indexed by well ID with a given column name."""
     row_no_col = df.columns[0]
-    rows = []
-    for _, row in df.iterrows():
-        row_no = int(row[row_no_col])
-        row_letter = string.ascii_uppercase[row_no - 1]
-        for col in df.columns[1:]:
-            try:
-                col_no = int(str(col).strip())
-            except Exception:
-                continue
-            wid = f"{row_letter}{col_no}"
-            rows.append({"ID": normalize_well_id(wid), value_name: row[col]})
-    out = pd.DataFrame(rows).set_index("ID")
-    out.index.name = "ID"
+    # plate columns are the headers that parse as integers, others are skipped
+    grid_cols, col_nos = [], []
+    for col in df.columns[1:]:
+        try:
+            col_nos.append(str(int(str(col).strip())))
+        except Exception:
+            continue
+        grid_cols.append(col)
+    # row-major order (A1, A2, ..., B1, ...) with one vectorized pass over the grid
+    letters = np.array(list(string.ascii_uppercase))[df[row_no_col].astype(int).to_numpy() - 1]
+    ids = np.char.add(np.repeat(letters, len(col_nos)), np.tile(np.array(col_nos, dtype=str), len(df)))
+    values = df[grid_cols].to_numpy(dtype=object).ravel()
+    out = pd.DataFrame({value_name: values}, index=pd.Index(ids.astype(object), name="ID")).infer_objects()
     return out
 
 # ------------------------ Platemap ------------------------
+# sheet name patterns for auto-detection in load_platemap_384
+_SAMPLE_SHEET_RE = re.compile(r"(sample|id|map|layout)", re.I)
+_CONC_SHEET_RE = re.compile(r"(conc|concentration)", re.I)
+
+@lru_cache(maxsize=1)
+def _excel_engine() -> str | None:
+    """The native calamine reader if installed and known to pandas (>= 2.2), otherwise None (pandas default)."""
+    if importlib.util.find_spec("python_calamine") is None:
+        return None
+    major, minor = (int(v) for v in pd.__version__.split(".")[:2])
+    return "calamine" if (major, minor) >= (2, 2) else None
+
+def _read_excel(path: Path, **kwargs) -> pd.DataFrame:
+    """pd.read_excel with the fastest available engine."""
+    return pd.read_excel(path, engine=_excel_engine(), **kwargs)
+
+def _open_excel(path: Path) -> pd.ExcelFile:
+    """Open a workbook once for reading several sheets, with the fastest available engine."""
+    return pd.ExcelFile(path, engine=_excel_engine())
+
 def load_platemap_384(path: Path, sample_sheet: str | None, conc_sheet: str | None) -> pd.DataFrame:
-    xls = pd.ExcelFile(path)
-    sheets = xls.sheet_names
-    if sample_sheet is None:
-        cand = [s for s in sheets if re.search(r"(sample|id|map|layout)", s, re.I)]
-        sample_sheet = cand[0] if cand else sheets[0]
-    if conc_sheet is None:
-        conc = [s for s in sheets if re.search(r"(conc|concentration)", s, re.I)]
-        conc_sheet = conc[0] if conc else None
-
-    sample_df = pd.read_excel(path, sheet_name=sample_sheet)
+    # the workbook is opened once for both sheets and closed again right after reading them
+    with _open_excel(path) as xls:
+        sheets = xls.sheet_names
+        if sample_sheet is None:
+            cand = [s for s in sheets if _SAMPLE_SHEET_RE.search(s)]
+            sample_sheet = cand[0] if cand else sheets[0]
+        if conc_sheet is None:
+            conc = [s for s in sheets if _CONC_SHEET_RE.search(s)]
+            conc_sheet = conc[0] if conc else None
+        sample_df = xls.parse(sample_sheet)
+        conc_df = xls.parse(conc_sheet) if conc_sheet is not None else None
+
     sample_ser = _grid_to_series(sample_df, "Condition")
+    # both grids cover the same plate, so they are aligned to the well order instead of joined
+    pm = sample_ser.reindex(all_well_ids_384())
 
-    if conc_sheet is not None:
-        conc_df = pd.read_excel(path, sheet_name=conc_sheet)
+    if conc_df is not None:
         conc_ser = _grid_to_series(conc_df, "Concentration")
-        pm = sample_ser.join(conc_ser, how="outer")
+        pm["Concentration"] = conc_ser["Concentration"].reindex(pm.index).to_numpy()
     else:
-        pm = sample_ser
         pm["Concentration"] = np.nan
 
-    pm = pm.reindex(all_well_ids_384())
     return pm
 
 # ------------------------ Plate data (°C input) ------------------------
@@ -96,12 +142,21 @@ def build_uniform_temperature_grid(n_points: int, t_min_c: float, t_max_c: float
 
 def load_plate_long(path: Path, t_min_c: float, t_max_c: float) -> pd.DataFrame:
     """Long-form: col1=row(1..16), col2=col(1..24), rest=signal steps. Index in °C."""
-    df = pd.read_excel(path, header=None)
+    df = _read_excel(path, header=None)
     if df.shape[1] < 3:
         raise ValueError("Expected at least 3 columns: row, col, and one or more measurement columns.")
-    r = pd.to_numeric(df.iloc[:,0], errors="coerce")
-    c = pd.to_numeric(df.iloc[:,1], errors="coerce")
-    data = df.iloc[:, 2:].apply(pd.to_numeric, errors="coerce")
+    data = df.iloc[:, 2:]
+    # only columns that were not read as numbers need the (column by column) conversion
+    non_numeric = [col for col, dtype in data.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+    if non_numeric:
+        block = data[non_numeric].to_numpy()
+        try:
+            block = block.astype(np.float64)
+        except (TypeError, ValueError):
+            # text or empty cells: one to_numeric pass over all of them instead of one per column
+            block = pd.to_numeric(pd.Series(block.ravel()), errors="coerce").to_numpy(dtype=np.float64).reshape(block.shape)
+        data = data.copy()
+        data[non_numeric] = block
 
     # 0/1 aware normalization
     # Accept both 0- and 1-based inputs; convert to 1-based
@@ -118,40 +173,40 @@ def load_plate_long(path: Path, t_min_c: float, t_max_c: float) -> pd.DataFrame:
     if n_points < 2:
         raise ValueError("Fewer than 2 measurement columns; cannot build a temperature grid.")
     temp_grid_c = build_uniform_temperature_grid(n_points, t_min_c, t_max_c)
-    well_ids = [normalize_well_id(well_id_from_rowcol(rv, cv)) for rv, cv in zip(r, c)]
-    wide = pd.DataFrame(data.to_numpy().T, index=temp_grid_c, columns=well_ids).T
-    wide = wide.T  # Temperature(°C) x well
-    wide.index.name = "Temperature"
-    for wid in all_well_ids_384():
-        if wid not in wide.columns:
-            wide[wid] = np.nan
+    well_ids = well_ids_from_rowcol(r.to_numpy(), c.to_numpy())
+    # Temperature(°C) x well; wells without data are added as NaN columns by the reindex
+    wide = pd.DataFrame(data.to_numpy().T, index=pd.Index(temp_grid_c, name="Temperature"), columns=well_ids)
     return wide.reindex(columns=all_well_ids_384())
 
-def _score_header_pair(row_hdr: pd.Series, col_hdr: pd.Series) -> int:
-    """Score how well two header rows look like row=1..16 repeated, col=1..24 repeating. Return count of valid positions up to 384."""
-    try:
-        row_vals = pd.to_numeric(row_hdr, errors="coerce").astype("Int64")
-        col_vals = pd.to_numeric(col_hdr, errors="coerce").astype("Int64")
-    except Exception:
-        return -1
-    valid = ((row_vals >= 1) & (row_vals <= 16) & (col_vals >= 1) & (col_vals <= 24)).fillna(False)
-    return int(valid.sum())
+def _score_header_windows(row_hdr: pd.Series, col_hdr: pd.Series, starts: np.ndarray) -> np.ndarray:
+    """Score how well two header rows look like row=1..16 repeated, col=1..24 repeating, for every 384-wide window in starts.
+    Each score is the count of valid positions up to 384, or -1 if the window holds non-integer numbers."""
+    row_vals = pd.to_numeric(row_hdr, errors="coerce").to_numpy(dtype=float)
+    col_vals = pd.to_numeric(col_hdr, errors="coerce").to_numpy(dtype=float)
+    valid = (row_vals >= 1) & (row_vals <= 16) & (col_vals >= 1) & (col_vals <= 24)
+    fractional = np.zeros(len(valid), dtype=bool)
+    for vals in (row_vals, col_vals):
+        fractional |= ~np.isnan(vals) & (np.mod(vals, 1) != 0)
+    # window sums from prefix sums, one pass per header pair instead of one slice per window
+    valid_cs = np.concatenate(([0], np.cumsum(valid)))
+    fractional_cs = np.concatenate(([0], np.cumsum(fractional)))
+    scores = valid_cs[starts + 384] - valid_cs[starts]
+    scores[fractional_cs[starts + 384] > fractional_cs[starts]] = -1
+    return scores
 
 def load_plate_matrix_auto(df: pd.DataFrame, t_min_c: float, t_max_c: float, search_max_start: int = 20) -> (pd.DataFrame, dict):
     """Auto-detect header offsets across a wider window. Returns (dataframe, debug)."""
     best = None
     ncols = df.shape[1]
     row_pairs = [(0,1), (1,2), (2,3), (3,4)]
-    for r1, r2 in row_pairs:
-        for start in range(0, min(search_max_start, max(1, ncols-384))+1):
-            end = start + 384
-            if end > ncols:
-                break
-            row_hdr = df.iloc[r1, start:end]
-            col_hdr = df.iloc[r2, start:end]
-            score = _score_header_pair(row_hdr, col_hdr)
-            if score > (best[4] if best else -1):
-                best = (r1, r2, start, end, score)
+    starts = np.arange(0, min(search_max_start, max(1, ncols-384))+1)
+    starts = starts[starts + 384 <= ncols]
+    for r1, r2 in (row_pairs if len(starts) else []):
+        scores = _score_header_windows(df.iloc[r1], df.iloc[r2], starts)
+        i = int(np.argmax(scores))  # first best start, as in a left-to-right scan
+        if scores[i] > (best[4] if best else -1):
+            start = int(starts[i])
+            best = (r1, r2, start, start + 384, int(scores[i]))
     if not best or best[4] < 300:
         raise ValueError(f"Could not auto-detect 384-well window (best score={best[4] if best else 'NA'}).")
     r1, r2, start, end, score = best
@@ -164,22 +219,19 @@ def load_plate_matrix_auto(df: pd.DataFrame, t_min_c: float, t_max_c: float, sea
         row_nums = row_nums + 1
         col_nums = col_nums + 1
 
-    row_letters = [string.ascii_uppercase[int(r)-1] for r in row_nums]
-    well_ids = [normalize_well_id(f"{r}{int(c)}") for r, c in zip(row_letters, col_nums)]
+    well_ids = well_ids_from_rowcol(row_nums.to_numpy(), col_nums.to_numpy())
     data = df.iloc[r2+1:, start:end].copy()
     n_points = data.shape[0]
     temps_c = build_uniform_temperature_grid(n_points, t_min_c, t_max_c)
     data.index = temps_c
     data.index.name = "Temperature"
     data.columns = well_ids
-    for wid in all_well_ids_384():
-        if wid not in data.columns:
-            data[wid] = np.nan
+    # wells outside the detected window are added as NaN columns by the reindex
     data = data.reindex(columns=all_well_ids_384())
     return data, dbg
 
 def load_plate_matrix(path: Path, sheet: str, t_min_c: float, t_max_c: float) -> (pd.DataFrame, dict):
-    df = pd.read_excel(path, sheet_name=sheet, header=None)
+    df = _read_excel(path, sheet_name=sheet, header=None)
     return load_plate_matrix_auto(df, t_min_c, t_max_c)
 
 def load_plate_auto(path: Path, t_min_c: float, t_max_c: float, matrix_sheet: str | None) -> (pd.DataFrame, dict):
@@ -191,43 +243,80 @@ def load_plate_auto(path: Path, t_min_c: float, t_max_c: float, matrix_sheet: st
 
 # ------------------------ Analysis ------------------------
 def to_long_with_platemap(wide_k_df: pd.DataFrame, platemap: pd.DataFrame, value_name: str) -> pd.DataFrame:
-    long = wide_k_df.reset_index().melt(id_vars=["Temperature"], var_name="ID", value_name=value_name)
-    long = long.join(platemap, on="ID")
-    long["Temperature"] = long["Temperature"] - 273.15
+    # same layout as reset_index().melt(): all temperatures of the first well, then the next well, ...
+    n_temps, n_wells = wide_k_df.shape
+    long = pd.DataFrame({
+        "Temperature": np.tile(wide_k_df.index.to_numpy(), n_wells) - 273.15,
+        "ID": np.repeat(wide_k_df.columns.to_numpy(dtype=object), n_temps),
+        value_name: wide_k_df.to_numpy().ravel(order="F"),
+    })
+    # platemap columns are repeated per well instead of a row-wise join on ID
+    pm = platemap.reindex(wide_k_df.columns)
+    for col in pm.columns:
+        long[col] = np.repeat(pm[col].to_numpy(), n_temps)
     return long
 
-def ensure_complete_wells_wide(wide_df: pd.DataFrame, well_order: list[str]) -> pd.DataFrame:
-    out = wide_df.copy()
-    for w in well_order:
-        if w not in out.columns:
-            out[w] = np.nan
-    out = out.reindex(columns=well_order)
-    return out
+def ensure_complete_wells_wide(wide_df: pd.DataFrame, well_order: list[str] | tuple[str, ...]) -> pd.DataFrame:
+    # reindex returns a new frame and adds the missing wells as NaN columns
+    return wide_df.reindex(columns=well_order)
+
+def run_analysis(plate_wide_c: pd.DataFrame, platemap_df: pd.DataFrame, model: str, mp_core, n_jobs: int = 1) -> dict:
+    """Fit all wells with MoltenProt; n_jobs > 1 fits that many column blocks of the plate in parallel (< 1 = all cores)."""
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    # NOTE MoltenProt runs one process per dataset, so the wells are split into one dataset per job.
+    # Each well is fitted on its own, except for the background subtraction of "Blank" wells, which needs them all.
+    has_blanks = platemap_df["Condition"].astype(str).eq("Blank").any()
+    n_blocks = 1 if has_blanks else max(1, min(n_jobs, plate_wide_c.shape[1]))
+    blocks = np.array_split(np.arange(plate_wide_c.shape[1]), n_blocks)
+    names = ["Signal"] if n_blocks == 1 else [f"Signal_{i}" for i in range(n_blocks)]
 
-def run_analysis(plate_wide_c: pd.DataFrame, platemap_df: pd.DataFrame, model: str, mp_core) -> dict:
     mpfm = mp_core.MoltenProtFitMultiple(scan_rate=None, denaturant="C", layout=platemap_df, source="plate")
-    mpfm.AddDataset(plate_wide_c, "Signal")
+    for name, cols in zip(names, blocks):
+        # MoltenProt relabels the index of the frame it is given to Kelvin, so it never gets the caller's frame
+        mpfm.AddDataset(plate_wide_c.iloc[:, cols] if n_blocks > 1 else plate_wide_c.copy(deep=False), name)
     mpfm.SetAnalysisOptions(which="all", printout=False, model=model)
-    mpfm.PrepareAndAnalyseAll(n_jobs=1)
-    mpf = mpfm.datasets["Signal"]
+    mpfm.PrepareAndAnalyseAll(n_jobs=n_blocks)
+    fits = [mpfm.datasets[name] for name in names]
+
+    def joined(attr: str, axis: int) -> pd.DataFrame:
+        frames = [getattr(mpf, attr) for mpf in fits]
+        return frames[0] if len(frames) == 1 else pd.concat(frames, axis=axis)
+
+    params = joined("plate_results", axis=0)
+    params_stdev = joined("plate_results_stdev", axis=0)
+    if n_blocks > 1:
+        # restore the row order of a single-dataset run: well order, then MoltenProt's ranking
+        params = params.iloc[np.argsort(plate_wide_c.columns.get_indexer(params.index), kind="stable")]
+        sortby = getattr(mp_core.avail_models.get(model), "sortby", None)
+        if sortby is not None:
+            params = params.sort_values(by=sortby, ascending=False)
+        # some models return the stdev rows sorted by ID (see CalculateThermodynamic)
+        if all(mpf.plate_results_stdev.index.is_monotonic_increasing for mpf in fits):
+            params_stdev = params_stdev.sort_index()
+    # the fit objects are local to this call, so their frames can be handed out without copying
     return {
-        "params": mpf.plate_results.copy(),
-        "params_stdev": mpf.plate_results_stdev.copy(),
-        "raw_wide": mpf.plate_raw.copy(),          # K index
-        "preproc_wide": mpf.plate.copy(),          # K index
-        "fit_wide": mpf.plate_fit.copy(),          # K index
-        "raw_corr_wide": mpf.plate_raw_corr.copy() # K index
+        "params": params,
+        "params_stdev": params_stdev,
+        "raw_wide": joined("plate_raw", axis=1),          # K index
+        "preproc_wide": joined("plate", axis=1),          # K index
+        "fit_wide": joined("plate_fit", axis=1),          # K index
+        "raw_corr_wide": joined("plate_raw_corr", axis=1) # K index
     }
 
-# ------------------------ Plotting ------------------------
 def _to_celsius_index(df_k: pd.DataFrame) -> pd.DataFrame:
     try:
-        return df_k.rename_axis("Temperature").rename_axis(None, axis=1).rename(index=lambda k: k - 273.15)
+        # shallow copy with new axis labels: the data is shared, the input frame stays untouched
+        df_c = df_k.copy(deep=False)
+        df_c.index = pd.Index(df_k.index.to_numpy() - 273.15, name="Temperature")
+        df_c.columns = df_k.columns.rename(None)
+        return df_c
     except Exception:
         return df_k
 
 def _first_derivative(y: np.ndarray, x: np.ndarray) -> np.ndarray:
-    return np.gradient(y, x)
+    """dy/dx along the first axis; y is a single curve or a (temperature x well) block."""
+    return np.gradient(y, x, axis=0)
 
 def _sanitize(name: str) -> str:
     keep = "-_.()[]{} "
@@ -238,6 +327,52 @@ def _group_mask(platemap: pd.DataFrame, pattern: str | None):
         return pd.Series(False, index=platemap.index)
     return platemap["Condition"].fillna("").str.contains(pattern, case=False, regex=True)
 
+def _group_stats(wide_df: pd.DataFrame, mask: pd.Series):
+    """Per-temperature mean and SD over the wells selected by mask, (None, None) if none of them are in wide_df."""
+    wells = [w for w in mask.index[mask].tolist() if w in wide_df.columns]
+    if not wells:
+        return None, None
+    Y = wide_df[wells].to_numpy(dtype=float)
+    return np.nanmean(Y, axis=1), np.nanstd(Y, axis=1)
+
+# diagnostic plots: 100 dpi and fast zlib settings keep the PNG encoding cheap
+_PLOT_DPI = 100
+_PNG_SAVE_KWARGS = {"pil_kwargs": {"compress_level": 1}}
+
+def _render_well(task: dict, temps: np.ndarray, controls: dict, pos_label: str | None, neg_label: str | None, outdir: Path):
+    """Write the raw, baseline-corrected and derivative PNGs of one well.
+    Module-level and fed with plain arrays only, so it can run in a worker process. The figures are not
+    managed by pyplot, so no GUI backend is involved in the workers."""
+    wid, title_suffix, tm_c, y_fit = task["wid"], task["title_suffix"], task["tm_c"], task["fit"]
+    panels = (
+        # (file suffix, curve, curve label, y label, title prefix, control key)
+        ("raw", task["raw"], "Raw", "Signal (raw)", "Raw + Fit", "raw"),
+        ("baseline", task["corr"], "Baseline-corrected", "Signal (baseline-corr)", "Baseline-corrected + Fit", "cor"),
+        ("derivative", task["deriv"], "d/dT (corrected)", "d Signal / dT", "First derivative", None),
+    )
+    for suffix, y, label, ylabel, title, control_key in panels:
+        fig = mpl_figure.Figure(figsize=(6,4), dpi=_PLOT_DPI)
+        ax = fig.add_subplot()
+        ax.plot(temps, y, label=label)
+        if control_key is not None and y_fit is not None:
+            ax.plot(temps, y_fit, linestyle="--", label="Fit")
+        if tm_c is not None:
+            ax.axvline(tm_c, linestyle=":", label=f"Tm={tm_c:.2f}°C")
+        if control_key is not None:
+            pos_mu, pos_sd, neg_mu, neg_sd = controls[control_key]
+            if pos_mu is not None:
+                ax.plot(temps, pos_mu, alpha=0.75, label=f"{pos_label} μ")
+                ax.fill_between(temps, pos_mu-pos_sd, pos_mu+pos_sd, alpha=0.15, label=f"{pos_label} ±σ")
+            if neg_mu is not None:
+                ax.plot(temps, neg_mu, alpha=0.75, label=f"{neg_label} μ")
+                ax.fill_between(temps, neg_mu-neg_sd, neg_mu+neg_sd, alpha=0.15, label=f"{neg_label} ±σ")
+        ax.set_xlabel("Temperature (°C)")
+        ax.set_ylabel(ylabel)
+        ax.set_title(f"{title} | {title_suffix}")
+        ax.legend(loc="best", fontsize=8)
+        fig.tight_layout()
+        fig.savefig(outdir / f"{_sanitize(wid)}_{suffix}.png", **_PNG_SAVE_KWARGS)
+
 def export_well_plots(raw_wide_k: pd.DataFrame,
                       raw_corr_wide_k: pd.DataFrame,
                       fit_wide_k: pd.DataFrame,
@@ -246,7 +381,9 @@ def export_well_plots(raw_wide_k: pd.DataFrame,
                       outdir: Path,
                       pos_label: str | None,
                       neg_label: str | None,
-                      limit_wells: int | None = None):
+                      limit_wells: int | None = None,
+                      n_jobs: int = 1):
+    """Three PNGs per well; n_jobs > 1 renders the wells in that many processes (< 1 = all cores)."""
     outdir.mkdir(parents=True, exist_ok=True)
     raw_c = _to_celsius_index(raw_wide_k)
     corr_c = _to_celsius_index(raw_corr_wide_k)
@@ -257,22 +394,12 @@ def export_well_plots(raw_wide_k: pd.DataFrame,
     pos_mask = _group_mask(platemap, pos_label)
     neg_mask = _group_mask(platemap, neg_label)
 
-    def mean_sd(wide_df: pd.DataFrame, mask: pd.Series):
-        wells = [w for w in mask.index[mask].tolist() if w in wide_df.columns]
-        Y = wide_df[wells].to_numpy(dtype=float, copy=True) if wells else np.empty((len(wide_df), 0))
-        mu = np.nanmean(Y, axis=1) if Y.size else None
-        sd = np.nanstd(Y, axis=1) if Y.size else None
-        return mu, sd
-
-    pos_mu_raw, pos_sd_raw = mean_sd(raw_c, pos_mask)
-    neg_mu_raw, neg_sd_raw = mean_sd(raw_c, neg_mask)
-    pos_mu_cor, pos_sd_cor = mean_sd(corr_c, pos_mask)
-    neg_mu_cor, neg_sd_cor = mean_sd(corr_c, neg_mask)
-
-    d_cor = corr_c.apply(lambda col: _first_derivative(col.to_numpy(dtype=float), temps), axis=0, result_type="expand")
-    d_cor.index = corr_c.index
-    pos_mu_d, pos_sd_d = mean_sd(d_cor, pos_mask)
-    neg_mu_d, neg_sd_d = mean_sd(d_cor, neg_mask)
+    # all wells in one call; the per-well plots below reuse these columns
+    d_cor = pd.DataFrame(_first_derivative(corr_c.to_numpy(dtype=float), temps), index=corr_c.index, columns=corr_c.columns)
+    controls = {
+        "raw": _group_stats(raw_c, pos_mask) + _group_stats(raw_c, neg_mask),
+        "cor": _group_stats(corr_c, pos_mask) + _group_stats(corr_c, neg_mask),
+    }
 
     wells = list(raw_c.columns)
     if limit_wells:
@@ -286,72 +413,40 @@ def export_well_plots(raw_wide_k: pd.DataFrame,
             except Exception:
                 pass
 
-    for wid in wells:
+    def curves(wide_df: pd.DataFrame) -> np.ndarray:
+        """(well x temperature) block of the plotted wells, NaN for wells missing in wide_df.
+        One reindex per frame instead of a Series per well; each well's curve is a contiguous row."""
+        return np.ascontiguousarray(wide_df.reindex(columns=wells).to_numpy(dtype=float).T)
+
+    raw_y, corr_y, deriv_y, fit_y = curves(raw_c), curves(corr_c), curves(d_cor), curves(fit_c)
+    tasks = []
+    for i, wid in enumerate(wells):
         cond = platemap.loc[wid, "Condition"] if wid in platemap.index else ""
         conc = platemap.loc[wid, "Concentration"] if wid in platemap.index else np.nan
-        title_suffix = f"{wid} | {cond} | {conc:g}" if pd.notna(conc) else f"{wid} | {cond}"
-
-        # Raw + Fit
-        fig, ax = plt.subplots(figsize=(6,4), dpi=150)
-        y = raw_c.get(wid, pd.Series(index=raw_c.index, dtype=float)).to_numpy(dtype=float)
-        ax.plot(temps, y, label="Raw")
-        if wid in fit_c.columns:
-            ax.plot(temps, fit_c[wid].to_numpy(dtype=float), linestyle="--", label="Fit")
-        tm_c = tm_lookup.get(wid)
-        if tm_c is not None:
-            ax.axvline(tm_c, linestyle=":", label=f"Tm={tm_c:.2f}°C")
-        if pos_mu_raw is not None:
-            ax.plot(temps, pos_mu_raw, alpha=0.75, label=f"{pos_label} μ")
-            ax.fill_between(temps, pos_mu_raw-pos_sd_raw, pos_mu_raw+pos_sd_raw, alpha=0.15, label=f"{pos_label} ±σ")
-        if neg_mu_raw is not None:
-            ax.plot(temps, neg_mu_raw, alpha=0.75, label=f"{neg_label} μ")
-            ax.fill_between(temps, neg_mu_raw-neg_sd_raw, neg_mu_raw+neg_sd_raw, alpha=0.15, label=f"{neg_label} ±σ")
-        ax.set_xlabel("Temperature (°C)")
-        ax.set_ylabel("Signal (raw)")
-        ax.set_title(f"Raw + Fit | {title_suffix}")
-        ax.legend(loc="best", fontsize=8)
-        fig.tight_layout()
-        fig.savefig(outdir / f"{_sanitize(wid)}_raw.png")
-        plt.close(fig)
-
-        # Baseline-corrected + Fit
-        fig, ax = plt.subplots(figsize=(6,4), dpi=150)
-        y = corr_c.get(wid, pd.Series(index=corr_c.index, dtype=float)).to_numpy(dtype=float)
-        ax.plot(temps, y, label="Baseline-corrected")
-        if wid in fit_c.columns:
-            ax.plot(temps, fit_c[wid].to_numpy(dtype=float), linestyle="--", label="Fit")
-        tm_c = tm_lookup.get(wid)
-        if tm_c is not None:
-            ax.axvline(tm_c, linestyle=":", label=f"Tm={tm_c:.2f}°C")
-        if pos_mu_cor is not None:
-            ax.plot(temps, pos_mu_cor, alpha=0.75, label=f"{pos_label} μ")
-            ax.fill_between(temps, pos_mu_cor-pos_sd_cor, pos_mu_cor+pos_sd_cor, alpha=0.15, label=f"{pos_label} ±σ")
-        if neg_mu_cor is not None:
-            ax.plot(temps, neg_mu_cor, alpha=0.75, label=f"{neg_label} μ")
-            ax.fill_between(temps, neg_mu_cor-neg_sd_cor, neg_mu_cor+neg_sd_cor, alpha=0.15, label=f"{neg_label} ±σ")
-        ax.set_xlabel("Temperature (°C)")
-        ax.set_ylabel("Signal (baseline-corr)")
-        ax.set_title(f"Baseline-corrected + Fit | {title_suffix}")
-        ax.legend(loc="best", fontsize=8)
-        fig.tight_layout()
-        fig.savefig(outdir / f"{_sanitize(wid)}_baseline.png")
-        plt.close(fig)
-
-        # First derivative
-        fig, ax = plt.subplots(figsize=(6,4), dpi=150)
-        y = corr_c.get(wid, pd.Series(index=corr_c.index, dtype=float)).to_numpy(dtype=float)
-        yd = np.gradient(y, temps)
-        ax.plot(temps, yd, label="d/dT (corrected)")
-        tm_c = tm_lookup.get(wid)
-        if tm_c is not None:
-            ax.axvline(tm_c, linestyle=":", label=f"Tm={tm_c:.2f}°C")
-        ax.set_xlabel("Temperature (°C)")
-        ax.set_ylabel("d Signal / dT")
-        ax.set_title(f"First derivative | {title_suffix}")
-        ax.legend(loc="best", fontsize=8)
-        fig.tight_layout()
-        fig.savefig(outdir / f"{_sanitize(wid)}_derivative.png")
-        plt.close(fig)
+        tasks.append({
+            "wid": wid,
+            "title_suffix": f"{wid} | {cond} | {conc:g}" if pd.notna(conc) else f"{wid} | {cond}",
+            "tm_c": tm_lookup.get(wid),
+            "raw": raw_y[i],
+            "corr": corr_y[i],
+            "deriv": deriv_y[i],
+            "fit": fit_y[i] if wid in fit_c.columns else None,
+        })
+
+    render = partial(_render_well, temps=temps, controls=controls, pos_label=pos_label, neg_label=neg_label, outdir=outdir)
+    if n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(tasks))
+    # workers look _render_well up by module name, which fails if this file was loaded by path without registering it
+    if n_jobs <= 1 or sys.modules.get(__name__) is None:
+        for task in tasks:
+            render(task)
+        return
+    # imported here: it loads multiprocessing, which --help and serial runs do not need
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        # list() re-raises the first worker error here
+        list(executor.map(render, tasks, chunksize=8))
 
 def export_compound_plots(raw_wide_k: pd.DataFrame,
                           raw_corr_wide_k: pd.DataFrame,
@@ -380,8 +475,14 @@ def export_compound_plots(raw_wide_k: pd.DataFrame,
     pos_mask = _group_mask(platemap, pos_label)
     neg_mask = _group_mask(platemap, neg_label)
 
-    cond_groups = platemap.reset_index().groupby("Condition")["ID"].apply(list)
-    conditions = [c for c in cond_groups.index if pd.notna(c) and str(c).strip() != ""]
+    # the control overlays are the same on every compound plot
+    pos_mu, pos_sd = _group_stats(raw_c, pos_mask)
+    neg_mu, neg_sd = _group_stats(raw_c, neg_mask)
+
+    # positional indices of every condition in one pass, in the sorted order of groupby
+    well_ids = platemap.index.to_numpy()
+    cond_groups = {cond: well_ids[idx].tolist() for cond, idx in platemap.groupby("Condition").indices.items()}
+    conditions = [c for c in cond_groups if pd.notna(c) and str(c).strip() != ""]
     if limit_compounds:
         conditions = conditions[:int(limit_compounds)]
 
@@ -396,28 +497,22 @@ def export_compound_plots(raw_wide_k: pd.DataFrame,
         conc_sorted  = list(concs.to_numpy()[order])
 
         n = max(2, len(wells_sorted))
-        cmap = get_cmap(cmap_name)
+        cmap = mpl_cm.get_cmap(cmap_name)
         colors = [cmap(i/(n-1)) for i in range(n)]
 
-        fig, (ax_top, ax_bot) = plt.subplots(2, 1, figsize=(7,8), dpi=150, sharex=True)
+        fig, (ax_top, ax_bot) = plt.subplots(2, 1, figsize=(7,8), dpi=_PLOT_DPI, sharex=True)
 
         # Top: raw + control overlays
         for idx, wid in enumerate(wells_sorted):
             y = raw_c.get(wid, pd.Series(index=raw_c.index, dtype=float)).to_numpy(dtype=float)
             lbl = f"{wid} | {conc_sorted[idx]:g}" if pd.notna(conc_sorted[idx]) else wid
             ax_top.plot(temps, y, label=lbl, color=colors[idx])
-        pos_wells = [w for w in pos_mask.index[pos_mask].tolist() if w in raw_c.columns]
-        if pos_wells:
-            Y = raw_c[pos_wells].to_numpy(dtype=float)
-            mu = np.nanmean(Y, axis=1); sd = np.nanstd(Y, axis=1)
-            ax_top.plot(temps, mu, color="black", alpha=0.9, linewidth=1.5, label=f"{pos_label} μ")
-            ax_top.fill_between(temps, mu-sd, mu+sd, color="black", alpha=0.15, label=f"{pos_label} ±σ")
-        neg_wells = [w for w in neg_mask.index[neg_mask].tolist() if w in raw_c.columns]
-        if neg_wells:
-            Y = raw_c[neg_wells].to_numpy(dtype=float)
-            mu = np.nanmean(Y, axis=1); sd = np.nanstd(Y, axis=1)
-            ax_top.plot(temps, mu, color="gray", alpha=0.9, linewidth=1.5, label=f"{neg_label} μ")
-            ax_top.fill_between(temps, mu-sd, mu+sd, color="gray", alpha=0.15, label=f"{neg_label} ±σ")
+        if pos_mu is not None:
+            ax_top.plot(temps, pos_mu, color="black", alpha=0.9, linewidth=1.5, label=f"{pos_label} μ")
+            ax_top.fill_between(temps, pos_mu-pos_sd, pos_mu+pos_sd, color="black", alpha=0.15, label=f"{pos_label} ±σ")
+        if neg_mu is not None:
+            ax_top.plot(temps, neg_mu, color="gray", alpha=0.9, linewidth=1.5, label=f"{neg_label} μ")
+            ax_top.fill_between(temps, neg_mu-neg_sd, neg_mu+neg_sd, color="gray", alpha=0.15, label=f"{neg_label} ±σ")
         ax_top.set_ylabel("Signal (raw)")
         ax_top.set_title(f"{cond} — Raw curves (colored by concentration)")
         ax_top.legend(loc="best", fontsize=7)
@@ -441,11 +536,11 @@ def export_compound_plots(raw_wide_k: pd.DataFrame,
         handles1, labels1 = ax_bot.get_legend_handles_labels()
         ax_bot.legend(handles1, [f"{cond} {lab}" for lab in labels1], fontsize=7, loc="best")
         fig.tight_layout()
-        fig.savefig(outdir / f"{_sanitize(cond)}.png")
+        fig.savefig(outdir / f"{_sanitize(cond)}.png", **_PNG_SAVE_KWARGS)
         plt.close(fig)
 
 # ------------------------ Output writer ------------------------
-def write_analysis_with_platemap(analysis: dict, platemap_df: pd.DataFrame, outfile: Path, include_all_wells: bool, input_wide_c: pd.DataFrame | None = None, matrix_debug: dict | None = None):
+def write_analysis_with_platemap(analysis: dict, platemap_df: pd.DataFrame, outfile: Path, include_all_wells: bool, input_wide_c: pd.DataFrame | None = None, matrix_debug: dict | None = None, long_sheets: bool = True, extra_sheets: dict | None = None):
     params = analysis["params"]
     params_stdev = analysis["params_stdev"]
     raw_wide = analysis["raw_wide"]
@@ -460,8 +555,10 @@ def write_analysis_with_platemap(analysis: dict, platemap_df: pd.DataFrame, outf
         fit_wide = ensure_complete_wells_wide(fit_wide, well_order)
         raw_corr_wide = ensure_complete_wells_wide(raw_corr_wide, well_order)
 
-    raw_long = to_long_with_platemap(raw_wide, platemap_df, "Raw")
-    rawcorr_long = to_long_with_platemap(raw_corr_wide, platemap_df, "BaselineCorrected")
+    # the two long-form sheets are by far the largest; they are only built when requested
+    if long_sheets:
+        raw_long = to_long_with_platemap(raw_wide, platemap_df, "Raw")
+        rawcorr_long = to_long_with_platemap(raw_corr_wide, platemap_df, "BaselineCorrected")
 
     p = params.copy()
     if "ID" not in p.columns:
@@ -469,7 +566,14 @@ def write_analysis_with_platemap(analysis: dict, platemap_df: pd.DataFrame, outf
     pm = platemap_df.reset_index()  # ID, Condition, Concentration
     merged = pm.merge(p, on="ID", how="left")
 
-    with pd.ExcelWriter(outfile) as writer:
+    # xlsxwriter serializes large sheets considerably faster than openpyxl
+    # NOTE its constant_memory mode cannot be used: pandas writes the cells column by column
+    try:
+        import xlsxwriter  # noqa: F401
+        engine = "xlsxwriter"
+    except ImportError:
+        engine = None
+    with pd.ExcelWriter(outfile, engine=engine) as writer:
         if input_wide_c is not None:
             input_wide_c.to_excel(writer, sheet_name="Input (wide, C)")
         if matrix_debug:
@@ -482,8 +586,12 @@ def write_analysis_with_platemap(analysis: dict, platemap_df: pd.DataFrame, outf
         preproc_wide.to_excel(writer, sheet_name="Preproc (wide, K)")
         fit_wide.to_excel(writer, sheet_name="Fit (wide, K)")
         raw_corr_wide.to_excel(writer, sheet_name="Baseline-corr (wide, K)")
-        raw_long.to_excel(writer, sheet_name="Raw+Map (long, C)", index=False)
-        rawcorr_long.to_excel(writer, sheet_name="BaselineCorrected+Map (C)", index=False)
+        if long_sheets:
+            raw_long.to_excel(writer, sheet_name="Raw+Map (long, C)", index=False)
+            rawcorr_long.to_excel(writer, sheet_name="BaselineCorrected+Map (C)", index=False)
+        # further {sheet name: frame} tables (e.g. NPARC) in the same pass instead of reopening the workbook
+        for sheet_name, df in (extra_sheets or {}).items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
 
 # ------------------------ Diagnostics ------------------------
 def diagnose_well_coverage(plate_wide_c: pd.DataFrame, out_csv: Path | None):
@@ -505,8 +613,10 @@ def main():
     parser.add_argument("--tmax", type=float, default=90.0, help="Maximum temperature (°C).")
 
     parser.add_argument("--model", default="santoro1988", help="Thermodynamic model name.")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel processes for the curve fits and the per-well plots (-1 = all cores).")
     parser.add_argument("--out", default="analysis_384.xlsx", help="Output Excel path.")
     parser.add_argument("--include-all-wells", action="store_true", help="Include all 384 wells even if data is missing (values will be NaN).")
+    parser.add_argument("--long-sheets", action="store_true", help="Also write the long-form sheets (raw and baseline-corrected signal per well and temperature, with the platemap).")
 
     parser.add_argument("--make-plots", action="store_true", help="Export per-well and per-compound plots.")
     parser.add_argument("--plots-outdir", default="plots", help="Directory to write plot PNGs.")
@@ -538,17 +648,19 @@ def main():
         counts = diagnose_well_coverage(plate_wide_c, Path(args.diagnose_csv))
         print(f"Diagnosis written to {args.diagnose_csv}. A1 non-null points: {a1_non_null}")
 
-    analysis = run_analysis(plate_wide_c, platemap_df, model=args.model, mp_core=mp_core)
+    analysis = run_analysis(plate_wide_c, platemap_df, model=args.model, mp_core=mp_core, n_jobs=args.jobs)
     write_analysis_with_platemap(analysis, platemap_df, Path(args.out), include_all_wells=True,
                                  input_wide_c=(plate_wide_c if args.dump_input else None),
-                                 matrix_debug=(dbg if isinstance(dbg, dict) else None))
+                                 matrix_debug=(dbg if isinstance(dbg, dict) else None),
+                                 long_sheets=args.long_sheets)
     print(f"Wrote Excel: {args.out}")
 
     if args.make_plots:
         outdir = Path(args.plots_outdir)
         export_well_plots(analysis["raw_wide"], analysis["raw_corr_wide"], analysis["fit_wide"],
                           analysis["params"], platemap_df, outdir / "wells",
-                          pos_label=args.pos_label, neg_label=args.neg_label, limit_wells=args.limit_wells)
+                          pos_label=args.pos_label, neg_label=args.neg_label, limit_wells=args.limit_wells,
+                          n_jobs=args.jobs)
         export_compound_plots(analysis["raw_wide"], analysis["raw_corr_wide"], analysis["fit_wide"],
                               analysis["params"], platemap_df, outdir / "compounds",
                               cmap_name=args.cmap, pos_label=args.pos_label, neg_label=args.neg_label,
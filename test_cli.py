@@ -0,0 +1,80 @@
+"""
+Tests for the multi-file dispatch of the command-line interface
+
+With several input files and jobs the files are processed in a process pool, except for
+inputs that share a result folder: those must run serially after the pool.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def cli(moltenprot_dir):
+    from moltenprot import __main__ as cli
+
+    return cli
+
+
+def test_split_by_result_folder(cli, tmp_path):
+    files = [
+        str(tmp_path / "d1" / "a.csv"),
+        str(tmp_path / "d2" / "b.csv"),
+        str(tmp_path / "d1" / "a.xlsx"),
+        str(tmp_path / "d1" / "c.csv"),
+    ]
+    # next to the input files only a.csv and a.xlsx share a folder
+    assert cli._split_by_result_folder(files, None) == (
+        [files[0], files[1], files[3]],
+        [files[2]],
+    )
+    # with -o the folder is named after the file, so d1/a.csv and d2/a.csv would collide
+    files.append(str(tmp_path / "d2" / "a.csv"))
+    assert cli._split_by_result_folder(files, str(tmp_path / "out")) == (
+        [files[0], files[1], files[3]],
+        [files[2], files[4]],
+    )
+
+
+def test_split_by_result_folder_relative_paths(cli, tmp_path, monkeypatch):
+    # the same folder written as relative and absolute path is still one folder
+    monkeypatch.chdir(tmp_path)
+    files = ["a.csv", str(tmp_path / "a.json")]
+    assert cli._split_by_result_folder(files, None) == (["a.csv"], [str(tmp_path / "a.json")])
+
+
+def test_shared_result_folder_runs_serially(moltenprot_dir, plate_wide_c, tmp_path):
+    # two inputs with the same name in different folders end up in one result folder with -o
+    first_wells = ["A1", "A2", "A3", "A4"]
+    second_wells = ["B1", "B2", "B3", "B4"]
+    inputs = []
+    for folder, wells in (("d1", first_wells), ("d2", second_wells), ("d3", None)):
+        (tmp_path / folder).mkdir()
+        name = "other.csv" if wells is None else "a.csv"
+        data = plate_wide_c[wells or first_wells].rename_axis("Temperature")
+        data.to_csv(tmp_path / folder / name)
+        inputs.append(str(tmp_path / folder / name))
+
+    env = dict(os.environ, PYTHONPATH=str(moltenprot_dir))
+    result = subprocess.run(
+        [sys.executable, "-m", "moltenprot", "-i", *inputs, "-o", str(tmp_path / "out"), "-j", "2", "--json"],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=600,
+    )
+    assert result.returncode == 0, result.stderr
+    # the first input owns the folder, the duplicate is refused as in a serial run
+    assert result.stderr.count("a folder with the same name already exists") == 1
+    assert "failed" not in result.stderr
+    assert (tmp_path / "out" / "other" / "MP_session.json").exists()
+
+    from moltenprot import core
+
+    session = core.mp_from_json(str(tmp_path / "out" / "a" / "MP_session.json"))
+    dataset = session.datasets[session.GetDatasets()[0]]
+    assert list(dataset.plate_raw.columns) == first_wells
@@ -0,0 +1,83 @@
+"""
+Regression check of the NPARC results against the original implementation
+
+nparc_reference_summary.csv and nparc_reference_rss.csv hold the output of the original
+nparc_analysis.py (before the speed-ups) for the wells of five compounds of the example plate.
+The current code must reproduce them within these tolerances:
+
+- RSS and medians: rtol 1e-12. The constant model is evaluated for all temperatures at
+  once, which changes RSS_null in the last digit (up to ~1e-15 relative); RSS_alt is unchanged.
+- p-values (raw and BH-adjusted): rtol 1e-5. A last-digit change can break a tie between two
+  RSS values, which changes the tie correction of the Mann-Whitney test (up to ~4e-6 relative
+  on this plate); U statistics are unaffected.
+- counts and U statistics: exact.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent
+
+CONDITIONS = [
+    "NCGC00355875-03",
+    "NCGC00355887-02",
+    "NCGC00356705-02",
+    "NCGC00371904-01",
+    "NCGC00420737-13",
+]
+KEYS_SUMMARY = ["Condition", "value_type"]
+KEYS_RSS = ["Condition", "Temperature_C", "value_type"]
+
+
+@pytest.fixture(scope="module")
+def nparc_results(pc, mp_core, platemap, plate_wide_c):
+    spec = importlib.util.spec_from_file_location("nparc_analysis", str(REPO_DIR / "nparc_analysis.py"))
+    nparc = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(nparc)
+    layout = platemap[platemap["Condition"].isin(CONDITIONS)]
+    plate = plate_wide_c[[well for well in plate_wide_c.columns if well in layout.index]]
+    analysis = pc.run_analysis(plate, layout, model="santoro1988", mp_core=mp_core)
+    return nparc.run_nparc_external_both(analysis["raw_wide"], analysis["raw_corr_wide"], layout)
+
+
+def _read_reference(name):
+    return pd.read_csv(REPO_DIR / name, float_precision="round_trip")
+
+
+def _compare(result, reference, keys, exact, tolerances):
+    result = result.sort_values(keys, ignore_index=True)
+    reference = reference.sort_values(keys, ignore_index=True)
+    pd.testing.assert_frame_equal(
+        result[keys + exact], reference[keys + exact], check_dtype=False, check_exact=True
+    )
+    for column, rtol in tolerances.items():
+        np.testing.assert_allclose(result[column], reference[column], rtol=rtol, atol=0, err_msg=column)
+
+
+def test_rss_matches_reference(nparc_results):
+    _compare(
+        nparc_results["rss_long"],
+        _read_reference("nparc_reference_rss.csv"),
+        KEYS_RSS,
+        exact=["N_points"],
+        tolerances={"RSS_null": 1e-12, "RSS_alt": 1e-12},
+    )
+
+
+def test_summary_matches_reference(nparc_results):
+    _compare(
+        nparc_results["summary"],
+        _read_reference("nparc_reference_summary.csv"),
+        KEYS_SUMMARY,
+        exact=["n_temperatures", "U_stat", "frac_alt_better"],
+        tolerances={
+            "median_RSS_null": 1e-12,
+            "median_RSS_alt": 1e-12,
+            "p_value": 1e-5,
+            "p_adj_BH": 1e-5,
+        },
+    )
@@ -0,0 +1,43 @@
+"""
+Tests for the block-parallel MoltenProt fits of pyrt_cetsa.run_analysis
+
+A parallel run must give the same tables as a serial run, including the row order of
+params and params_stdev, also when "Blank" wells force a single dataset.
+"""
+
+import pandas as pd
+import pytest
+
+# a few wells of the example plate (controls and compound series from two rows); they are
+# not in well ID order, so the blocks cannot be put back in order by concatenation alone
+WELLS = ["B3", "A1", "A5", "B1", "A7", "A2", "B5", "A4", "B2", "A3", "B4", "A6"]
+
+
+def _assert_same_analysis(serial, parallel):
+    assert serial.keys() == parallel.keys()
+    for key in serial:
+        pd.testing.assert_frame_equal(serial[key], parallel[key], check_exact=True, obj=key)
+
+
+@pytest.mark.parametrize("model", ["santoro1988", "santoro1988d"])
+def test_parallel_matches_serial(pc, mp_core, platemap, plate_wide_c, model):
+    plate = plate_wide_c[WELLS]
+    serial = pc.run_analysis(plate, platemap, model=model, mp_core=mp_core, n_jobs=1)
+    parallel = pc.run_analysis(plate, platemap, model=model, mp_core=mp_core, n_jobs=3)
+    _assert_same_analysis(serial, parallel)
+
+
+def test_parallel_matches_serial_with_blanks(pc, mp_core, platemap, plate_wide_c):
+    plate = plate_wide_c[WELLS]
+    layout = platemap.copy()
+    layout.loc[["A1", "B1"], "Condition"] = "Blank"
+    serial = pc.run_analysis(plate, layout, model="santoro1988", mp_core=mp_core, n_jobs=1)
+    parallel = pc.run_analysis(plate, layout, model="santoro1988", mp_core=mp_core, n_jobs=3)
+    _assert_same_analysis(serial, parallel)
+
+
+def test_input_frame_is_not_modified(pc, mp_core, platemap, plate_wide_c):
+    plate = plate_wide_c[WELLS].copy()
+    before = plate.copy()
+    pc.run_analysis(plate, platemap, model="santoro1988", mp_core=mp_core, n_jobs=3)
+    pd.testing.assert_frame_equal(plate, before, check_exact=True)